@@ -0,0 +1,163 @@
+"""Throughput and peak-memory benchmarks for the collector parsers.
+
+Usage (from the repo root, with toposcope installed):
+
+    python benchmarks/parsers.py                    # compare against baseline.json
+    python benchmarks/parsers.py --scale 2048       # bigger inputs
+    python benchmarks/parsers.py --save-baseline    # record new baselines
+
+Each parser runs on synthetic input at `scale` and at `scale / 4`; the ratio
+gives an empirical complexity exponent, so a parser that turns quadratic is
+flagged even on a machine whose absolute timings differ from the baseline.
+Exits 1 on any regression.
+"""
+from __future__ import annotations
+
+import argparse
+import json
+import math
+import sys
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+import synth  # noqa: E402
+
+from toposcope.collect import linux  # noqa: E402
+
+BASELINE_PATH = Path(__file__).resolve().parent / "baseline.json"
+
+# name -> (input generator, parser, scale divisor). The divisor maps the
+# global scale to a realistic element count for that tool (e.g. 512 PCI
+# functions but 48 DIMMs).
+PARSERS: Dict[str, Tuple[Callable[[int], str], Callable[[str], Any], int]] = {
+    "lspci_vmm": (synth.lspci_vmm, linux._parse_lspci_vmm, 1),
+    "lspci_vv": (synth.lspci_vv, linux._parse_lspci_vv_links, 1),
+    "lscpu_json": (synth.lscpu_json, linux._parse_lscpu_json, 4),
+    "dmidecode_memory": (synth.dmidecode_memory, linux._parse_dmidecode_memory, 8),
+    "rocm_smi_json": (synth.rocm_smi_json, linux._parse_rocm_smi_json, 32),
+    "lsblk_json": (synth.lsblk_json, linux._parse_lsblk_json, 4),
+    "lsusb": (synth.lsusb, linux._parse_lsusb, 4),
+    "ip_link_brief": (synth.ip_link_brief, linux._parse_ip_link_brief, 1),
+}
+
+
+def _time(parse: Callable[[str], Any], data: str, repeat: int) -> float:
+    best = math.inf
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        parse(data)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def _peak_kb(parse: Callable[[str], Any], data: str) -> float:
+    tracemalloc.start()
+    try:
+        parse(data)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+    return peak / 1024.0
+
+
+def run(scale: int, repeat: int) -> Dict[str, Dict[str, float]]:
+    results: Dict[str, Dict[str, float]] = {}
+    for name, (gen, parse, divisor) in PARSERS.items():
+        n = max(4, scale // divisor)
+        small_n = max(1, n // 4)
+        data = gen(n)
+        small = gen(small_n)
+        seconds = _time(parse, data, repeat)
+        small_seconds = _time(parse, small, repeat)
+        # Empirical exponent k in t ~ size^k between the two input sizes
+        ratio = len(data) / max(1, len(small))
+        exponent = math.log(max(seconds, 1e-9) / max(small_seconds, 1e-9)) / math.log(ratio)
+        results[name] = {
+            "elements": n,
+            "input_kb": round(len(data) / 1024.0, 1),
+            "seconds": seconds,
+            "mb_per_s": round(len(data) / 1e6 / max(seconds, 1e-9), 2),
+            "peak_kb": round(_peak_kb(parse, data), 1),
+            "exponent": round(exponent, 2),
+        }
+    return results
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Any],
+    threshold: float,
+    max_exponent: float,
+) -> List[str]:
+    """Return human-readable regressions (empty when everything is in budget)."""
+    problems: List[str] = []
+    base = baseline.get("parsers", {}) if baseline.get("scale") else {}
+    for name, res in results.items():
+        if res["exponent"] > max_exponent:
+            problems.append(f"{name}: scales as n^{res['exponent']} (limit n^{max_exponent})")
+        ref = base.get(name)
+        if not ref:
+            continue
+        if res["seconds"] > ref["seconds"] * threshold:
+            problems.append(f"{name}: {res['seconds'] * 1e3:.2f} ms vs baseline {ref['seconds'] * 1e3:.2f} ms")
+        if res["peak_kb"] > ref["peak_kb"] * threshold:
+            problems.append(f"{name}: peak {res['peak_kb']:.0f} KiB vs baseline {ref['peak_kb']:.0f} KiB")
+    return problems
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--scale", type=int, default=512, help="PCI functions / interfaces; other inputs scale from it")
+    ap.add_argument("--repeat", type=int, default=5, help="timing repetitions (best of)")
+    ap.add_argument("--baseline", type=Path, default=BASELINE_PATH)
+    ap.add_argument("--save-baseline", action="store_true", help="write results as the new baseline")
+    ap.add_argument("--threshold", type=float, default=2.0, help="allowed slowdown/memory factor vs baseline")
+    ap.add_argument("--max-exponent", type=float, default=1.5, help="flag parsers scaling worse than n^k")
+    args = ap.parse_args(argv)
+
+    results = run(args.scale, args.repeat)
+    console = Console()
+    table = Table(title=f"Parser benchmarks (scale={args.scale})")
+    for col in ("parser", "elements", "input KiB", "time ms", "MB/s", "peak KiB", "n^k"):
+        table.add_column(col, justify="left" if col == "parser" else "right")
+    for name, res in results.items():
+        table.add_row(
+            name,
+            str(res["elements"]),
+            f"{res['input_kb']:.1f}",
+            f"{res['seconds'] * 1e3:.2f}",
+            f"{res['mb_per_s']:.2f}",
+            f"{res['peak_kb']:.1f}",
+            f"{res['exponent']:.2f}",
+        )
+    console.print(table)
+
+    if args.save_baseline:
+        args.baseline.write_text(
+            json.dumps({"scale": args.scale, "parsers": results}, indent=2) + "\n", encoding="utf-8"
+        )
+        console.print(f"[green]Saved baseline to[/green] {args.baseline}")
+        return 0
+
+    baseline: Dict[str, Any] = {}
+    if args.baseline.exists():
+        baseline = json.loads(args.baseline.read_text(encoding="utf-8"))
+        if baseline.get("scale") != args.scale:
+            console.print(f"[yellow]Baseline was recorded at scale {baseline.get('scale')}; skipping absolute comparison[/yellow]")
+            baseline = {}
+    problems = compare(results, baseline, args.threshold, args.max_exponent)
+    for p in problems:
+        console.print(f"[red]REGRESSION[/red] {p}")
+    if not problems:
+        console.print("[green]All parsers within budget[/green]")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
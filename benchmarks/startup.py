@@ -0,0 +1,120 @@
+"""Startup-time budget and lazy-import checks for the toposcope CLI.
+
+Usage (from the repo root, with toposcope installed):
+
+    python benchmarks/startup.py                 # check budgets, exit 1 on regression
+    python benchmarks/startup.py --repeat 20     # steadier numbers
+
+Two kinds of check:
+
+* `-X importtime` per invocation: modules that a command must not load
+  (e.g. collectors for `--help`, http.server for `scan`) are reported by
+  name, which holds on any machine.
+* Wall-clock time over the bare interpreter, best of `--repeat`, against a
+  millisecond budget per command.
+"""
+from __future__ import annotations
+
+import argparse
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List, Tuple
+
+from rich.console import Console
+from rich.table import Table
+
+# Runs the CLI the way the console script does, with argv taken from the command line
+_LAUNCH = "import sys; sys.argv[0] = 'toposcope'; from toposcope.cli import app; app()"
+
+# Only our own imports are policed; typer/click bring subprocess, tempfile etc. themselves
+_SERVE_ONLY = ["toposcope.server", "http.server", "socketserver", "webbrowser"]
+_COLLECTORS = ["toposcope.collect.linux", "toposcope.collect.engine", "toposcope.collect.hostio"]
+
+# command name -> (argv, modules that must stay unloaded, budget ms over bare python)
+COMMANDS: Dict[str, Tuple[List[str], List[str], float]] = {
+    "import": ([], _SERVE_ONLY + _COLLECTORS + ["rich.console", "importlib.metadata"], 120.0),
+    # typer renders help with rich, which dominates this one
+    "--help": (["--help"], _SERVE_ONLY + _COLLECTORS, 400.0),
+    "scan --demo": (["scan", "--demo", "--out", "{tmp}/demo.json"], _SERVE_ONLY + _COLLECTORS, 200.0),
+    "scan": (["scan", "--out", "{tmp}/graph.json"], _SERVE_ONLY, 1500.0),
+}
+
+
+def _cmd(argv: List[str], tmp: str, importtime: bool = False) -> List[str]:
+    flags = ["-X", "importtime"] if importtime else []
+    if not argv:
+        return [sys.executable, *flags, "-c", "import toposcope.cli"]
+    return [sys.executable, *flags, "-c", _LAUNCH, *[a.format(tmp=tmp) for a in argv]]
+
+
+def _wall(cmd: List[str], repeat: int) -> float:
+    best = float("inf")
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL, check=False)
+        best = min(best, time.perf_counter() - t0)
+    return best
+
+
+def imported_modules(cmd: List[str]) -> Dict[str, int]:
+    """Module -> cumulative import time in microseconds, from `-X importtime`."""
+    proc = subprocess.run(cmd, stdout=subprocess.DEVNULL, stderr=subprocess.PIPE, text=True, check=False)
+    mods: Dict[str, int] = {}
+    for line in proc.stderr.splitlines():
+        if not line.startswith("import time:"):
+            continue
+        parts = line[len("import time:"):].split("|")
+        if len(parts) != 3 or not parts[1].strip().isdigit():
+            continue  # header line
+        mods[parts[2].strip()] = int(parts[1])
+    return mods
+
+
+def main(argv: List[str]) -> int:
+    ap = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    ap.add_argument("--repeat", type=int, default=7, help="wall-clock repetitions (best of)")
+    ap.add_argument("--scale", type=float, default=1.0, help="multiply every budget, e.g. for slow CI machines")
+    ap.add_argument("--skip-scan", action="store_true", help="skip the live `scan` command (non-Linux hosts)")
+    args = ap.parse_args(argv)
+
+    console = Console()
+    problems: List[str] = []
+    bare = _wall([sys.executable, "-c", "pass"], args.repeat)
+    table = Table(title=f"CLI startup (bare interpreter {bare * 1e3:.1f} ms)")
+    for col in ("command", "wall ms", "over bare ms", "budget ms", "cli import ms", "modules"):
+        table.add_column(col, justify="left" if col == "command" else "right")
+
+    with tempfile.TemporaryDirectory(prefix="toposcope-startup-") as tmp:
+        for name, (cmd_argv, forbidden, budget) in COMMANDS.items():
+            if name == "scan" and (args.skip_scan or not sys.platform.startswith("linux")):
+                continue
+            mods = imported_modules(_cmd(cmd_argv, tmp, importtime=True))
+            for mod in forbidden:
+                if mod in mods:
+                    problems.append(f"{name}: imports {mod} ({mods[mod] / 1e3:.1f} ms)")
+            wall = _wall(_cmd(cmd_argv, tmp), args.repeat)
+            over = (wall - bare) * 1e3
+            limit = budget * args.scale
+            if over > limit:
+                problems.append(f"{name}: {over:.0f} ms over bare python (budget {limit:.0f} ms)")
+            table.add_row(
+                name,
+                f"{wall * 1e3:.1f}",
+                f"{over:.1f}",
+                f"{limit:.0f}",
+                f"{mods.get('toposcope.cli', 0) / 1e3:.1f}",
+                str(len(mods)),
+            )
+    console.print(table)
+
+    for p in problems:
+        console.print(f"[red]REGRESSION[/red] {p}")
+    if not problems:
+        console.print("[green]Startup within budget[/green]")
+    return 1 if problems else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main(sys.argv[1:]))
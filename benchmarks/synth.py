@@ -0,0 +1,185 @@
+from __future__ import annotations
+
+import json
+from typing import Dict, List
+
+# Synthetic tool outputs shaped like the real thing, scaled by element count.
+# Values vary per element so parsers cannot benefit from degenerate input.
+
+_GPU_CLASSES = ["3D controller [0302]", "VGA compatible controller [0300]"]
+_OTHER_CLASSES = [
+    "Ethernet controller [0200]",
+    "Non-Volatile memory controller [0108]",
+    "PCI bridge [0604]",
+    "Host bridge [0600]",
+]
+
+
+def _bdf(i: int) -> str:
+    return f"0000:{(i >> 5) & 0xFF:02x}:{i & 0x1F:02x}.{i % 8}"
+
+
+def lspci_vmm(n: int) -> str:
+    """`lspci -Dvmmnnk` with n functions (every 16th a GPU)."""
+    blocks: List[str] = []
+    for i in range(n):
+        cls = _GPU_CLASSES[i % 2] if i % 16 == 0 else _OTHER_CLASSES[i % len(_OTHER_CLASSES)]
+        blocks.append(
+            f"Slot:\t{_bdf(i)}\n"
+            f"Class:\t{cls}\n"
+            f"Vendor:\tVendor {i % 7} Corporation [{0x8086 + i % 7:04x}]\n"
+            f"Device:\tDevice model {i} [{0x1000 + i:04x}]\n"
+            f"SVendor:\tSubsystem vendor [{0x1028:04x}]\n"
+            f"SDevice:\tSubsystem device [{0x2000 + i % 64:04x}]\n"
+            f"Rev:\t{i % 4:02x}\n"
+            f"Driver:\tdriver{i % 5}\n"
+            f"Module:\tdriver{i % 5}\n"
+        )
+    return "\n".join(blocks)
+
+
+def lspci_vv(n: int) -> str:
+    """`lspci -vv` with n functions, each with a realistic capability dump."""
+    out: List[str] = []
+    for i in range(n):
+        slot = _bdf(i)[5:]
+        out.append(f"{slot} Ethernet controller: Vendor {i % 7} Corporation Device model {i} (rev 01)")
+        out.append("\tSubsystem: Subsystem vendor Device 2000")
+        out.append("\tControl: I/O- Mem+ BusMaster+ SpecCycle- MemWINV- VGASnoop- ParErr- Stepping- SERR- FastB2B- DisINTx+")
+        out.append("\tStatus: Cap+ 66MHz- UDF- FastB2B- ParErr- DEVSEL=fast >TAbort- <TAbort- <MAbort- >SERR- <PERR- INTx-")
+        out.append(f"\tRegion 0: Memory at {0xa0000000 + i * 0x100000:x} (64-bit, prefetchable) [size=1M]")
+        out.append("\tCapabilities: [70] Express (v2) Endpoint, MSI 00")
+        out.append("\t\tDevCap:\tMaxPayload 512 bytes, PhantFunc 0, Latency L0s <512ns, L1 <64us")
+        out.append("\t\tLnkCap:\tPort #0, Speed 16GT/s, Width x16, ASPM not supported")
+        out.append(f"\t\tLnkSta:\tSpeed {(8, 16, 32)[i % 3]}GT/s (ok), Width x{(4, 8, 16)[i % 3]} (ok)")
+        for cap in range(12):
+            out.append(f"\tCapabilities: [{0x100 + cap * 0x10:x} v1] Extended capability {cap}")
+        out.append("\tKernel driver in use: driver")
+        out.append("")
+    return "\n".join(out)
+
+
+def lscpu_json(n: int) -> str:
+    """`lscpu -J` with the usual fields plus n flag-like entries."""
+    fields: List[Dict[str, object]] = [
+        {"field": "Architecture:", "data": "x86_64"},
+        {"field": "CPU(s):", "data": str(n)},
+        {"field": "Vendor ID:", "data": "GenuineIntel", "children": [
+            {"field": "Model name:", "data": "Intel(R) Xeon(R) Platinum 8480+", "children": [
+                {"field": "CPU family:", "data": "6"},
+                {"field": "Model:", "data": "143"},
+                {"field": "Thread(s) per core:", "data": "2"},
+                {"field": "Core(s) per socket:", "data": "56"},
+                {"field": "Socket(s):", "data": "2"},
+                {"field": "Stepping:", "data": "8"},
+                {"field": "CPU max MHz:", "data": "3800.0000"},
+                {"field": "CPU min MHz:", "data": "800.0000"},
+            ]},
+        ]},
+        {"field": "Caches (sum of all):", "data": None, "children": [
+            {"field": "L1d:", "data": "5.3 MiB (112 instances)"},
+            {"field": "L2:", "data": "224 MiB (112 instances)"},
+        ]},
+    ]
+    fields.append({"field": "NUMA:", "data": None, "children": [
+        {"field": f"NUMA node{i} CPU(s):", "data": f"{i * 8}-{i * 8 + 7}"} for i in range(n)
+    ]})
+    return json.dumps({"lscpu": fields})
+
+
+def dmidecode_memory(n: int) -> str:
+    """`dmidecode -t memory` with one array and n populated DIMMs."""
+    out = [
+        "# dmidecode 3.4",
+        "",
+        "Handle 0x1000, DMI type 16, 23 bytes",
+        "Physical Memory Array",
+        "\tLocation: System Board Or Motherboard",
+        "\tError Correction Type: Multi-bit ECC",
+        f"\tNumber Of Devices: {n}",
+        "",
+    ]
+    for i in range(n):
+        out += [
+            f"Handle 0x{0x1100 + i:04X}, DMI type 17, 92 bytes",
+            "Memory Device",
+            "\tArray Handle: 0x1000",
+            "\tTotal Width: 72 bits",
+            "\tData Width: 64 bits",
+            "\tSize: 64 GB",
+            "\tForm Factor: DIMM",
+            f"\tLocator: DIMM_{chr(65 + i % 26)}{i // 26}",
+            f"\tBank Locator: P{i % 2}_Node{i % 4}_Channel{i % 8}_Dimm0",
+            "\tType: DDR5",
+            "\tSpeed: 4800 MT/s",
+            "\tManufacturer: Samsung",
+            f"\tSerial Number: {0x80000000 + i:08X}",
+            "\tPart Number: M321R8GA0BB0-CQKZJ",
+            "\tRank: 2",
+            "\tConfigured Memory Speed: 4400 MT/s",
+            "",
+        ]
+    return "\n".join(out)
+
+
+def rocm_smi_json(n: int) -> str:
+    """`rocm-smi --showall --json` for n cards."""
+    cards: Dict[str, Dict[str, str]] = {}
+    for i in range(n):
+        card = {
+            "Device Name": "AMD Instinct MI300X",
+            "Card Series": "AMD Instinct MI300X",
+            "PCI Bus": _bdf(i * 8),
+            "Driver version": "6.7.0",
+            "VBIOS version": "113-M3000100-102",
+            "Temperature (Sensor junction) (C)": str(40 + i % 20),
+            "Temperature (Sensor memory) (C)": str(35 + i % 20),
+            "Current Socket Graphics Package Power (W)": f"{150 + i}.0",
+            "Max Graphics Package Power (W)": "750.0",
+            "GPU use (%)": str(i % 100),
+            "VRAM Total Memory (B)": str(206141652992),
+            "Serial Number": f"SN{i:08d}",
+            "pcie_link_width (Lanes)": "16",
+            "pcie_link_speed (0.1 GT/s)": "320",
+        }
+        for fw in ("ASD", "CE", "DMCU", "MC", "ME", "MEC", "MEC2", "PFP", "RLC", "SDMA", "SDMA2", "SMC", "SOS", "TA RAS", "TA XGMI", "UVD", "VCE", "VCN"):
+            card[f"{fw} firmware version"] = f"0x{i + 0x100:08x}"
+        cards[f"card{i}"] = card
+    return json.dumps(cards)
+
+
+def lsblk_json(n: int) -> str:
+    """`lsblk -J -o NAME,TYPE,SIZE,ROTA,TRAN,MODEL,SERIAL` with n disks (and partitions)."""
+    devs = []
+    for i in range(n):
+        devs.append({
+            "name": f"sd{chr(97 + i % 26)}{i // 26 or ''}",
+            "type": "disk",
+            "size": "7.3T",
+            "rota": i % 2 == 0,
+            "tran": "sas",
+            "model": "ST8000NM017B",
+            "serial": f"ZA{i:06d}",
+            "children": [
+                {"name": f"part{i}-{p}", "type": "part", "size": "1T", "rota": True, "tran": None, "model": None, "serial": None}
+                for p in range(2)
+            ],
+        })
+    return json.dumps({"blockdevices": devs})
+
+
+def lsusb(n: int) -> str:
+    """`lsusb` with n devices."""
+    return "\n".join(
+        f"Bus {1 + i // 127:03d} Device {1 + i % 127:03d}: ID {0x8087 + i % 3:04x}:{i:04x} Vendor {i % 3} Device {i}"
+        for i in range(n)
+    )
+
+
+def ip_link_brief(n: int) -> str:
+    """`ip -br link` with n interfaces (mostly veth, as on container hosts)."""
+    lines = ["lo               UNKNOWN        00:00:00:00:00:00 <LOOPBACK,UP,LOWER_UP>"]
+    for i in range(n - 1):
+        mac = ":".join(f"{(i >> s) & 0xFF:02x}" for s in (40, 32, 24, 16, 8, 0))
+        lines.append(f"veth{i:05x}@if{i + 3}    UP             {mac} <BROADCAST,MULTICAST,UP,LOWER_UP>")
+    return "\n".join(lines)
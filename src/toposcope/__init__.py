@@ -1,8 +1,16 @@
-from importlib.metadata import PackageNotFoundError, version as _pkg_version
-
 __all__ = ["__version__"]
 
-try:
-    __version__ = _pkg_version("toposcope")
-except PackageNotFoundError:
-    __version__ = "0.0.0"
+
+def __getattr__(name: str) -> str:
+    # Resolved on first access: importlib.metadata costs tens of milliseconds
+    # at startup and most invocations never ask for the version.
+    if name != "__version__":
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    from importlib.metadata import PackageNotFoundError, version as _pkg_version
+
+    try:
+        value = _pkg_version("toposcope")
+    except PackageNotFoundError:
+        value = "0.0.0"
+    globals()["__version__"] = value
+    return value
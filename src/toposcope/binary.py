@@ -0,0 +1,340 @@
+from __future__ import annotations
+
+import struct
+import sys
+import zlib
+from array import array
+from itertools import accumulate, islice, repeat
+from typing import IO, Any, Dict, List, Optional, Tuple
+
+from .model import Graph
+
+# Layout: BINARY_MAGIC, version (u8), token typecode (b"H" or b"I"), then one
+# zlib stream holding, little-endian:
+#   counts     7 x u32: strings, string bytes, scalars, ints, floats, shape words, tokens
+#   strings    u32 length (in code points) each, then their UTF-8 concatenation
+#   scalars    u8 code each (None, False, True, int, float), then the i64 ints
+#              and f64 floats in order
+#   shapes     u32 words per shape: kind, size, nested count, rows (1 + the
+#              shape shared by all members when they are containers of one
+#              shape, else 0), nested positions (only when some but not all
+#              members are containers), key string indices (dicts)
+#   tokens     the graph, depth first
+# A container is its shape's index followed by its members: a scalar is its
+# index in the string-then-scalar table, a nested container recurses, and
+# members sharing a shape (rows) are written as one list per column. Every
+# string is stored once, every dict's key sequence once, and edge ids of the
+# conventional `e:<source>-><target>` form not at all. Knowing from the shape
+# which members are scalars, and storing rows by column, lets the loader
+# build runs of values in one call rather than one per token.
+BINARY_MAGIC = b"TSGB"
+BINARY_VERSION = 1
+
+_COUNTS = struct.Struct("<7I")
+_NONE, _FALSE, _TRUE, _INT, _FLOAT = range(5)
+# Shape kinds; an _EDGE dict gets `id` back, first, from its source and target
+_DICT, _EDGE, _LIST = range(3)
+_CONTAINERS = (dict, list, tuple)
+
+
+def is_binary(head: bytes) -> bool:
+    return head.startswith(BINARY_MAGIC)
+
+
+def _little(a: array) -> bytes:
+    if sys.byteorder == "big":
+        a = array(a.typecode, a)
+        a.byteswap()
+    return a.tobytes()
+
+
+def _unpack(typecode: str, data: memoryview, pos: int, count: int) -> Tuple[array, int]:
+    a = array(typecode)
+    end = pos + count * a.itemsize
+    if end > len(data):
+        raise ValueError("binary graph is truncated")
+    a.frombytes(data[pos:end])
+    if sys.byteorder == "big":
+        a.byteswap()
+    return a, end
+
+
+class _Encoder:
+    def __init__(self) -> None:
+        self.strings: Dict[str, int] = {}
+        # Keyed on type too, so 1, 1.0 and True stay apart
+        self.scalars: Dict[Tuple[type, Any], int] = {}
+        self.codes = array("B")
+        self.ints = array("q")
+        self.floats = array("d")
+        self.shapes: Dict[Tuple[int, ...], int] = {}
+        self.shape_words = array("I")
+        self.tokens: List[int] = []
+        # Tokens of non-string scalars, offset by the string count at the end
+        self.after_strings: List[int] = []
+
+    def string(self, s: str) -> int:
+        i = self.strings.get(s)
+        if i is None:
+            i = self.strings[s] = len(self.strings)
+        return i
+
+    def scalar(self, v: Any) -> None:
+        if isinstance(v, str):
+            self.tokens.append(self.string(v))
+            return
+        key = (type(v), v)
+        i = self.scalars.get(key)
+        if i is None:
+            i = self.scalars[key] = len(self.codes)
+            if v is None:
+                self.codes.append(_NONE)
+            elif v is True or v is False:
+                self.codes.append(_TRUE if v else _FALSE)
+            elif isinstance(v, int):
+                if not -(1 << 63) <= v < (1 << 63):
+                    raise ValueError(f"integer out of range for the binary graph format: {v}")
+                self.codes.append(_INT)
+                self.ints.append(v)
+            elif isinstance(v, float):
+                self.codes.append(_FLOAT)
+                self.floats.append(v)
+            else:
+                raise TypeError(f"cannot encode {type(v).__name__} in a graph")
+        self.after_strings.append(len(self.tokens))
+        self.tokens.append(i)
+
+    def _parts(self, v: Any) -> Tuple[int, Tuple[int, ...], List[Any]]:
+        """(kind, key string indices, values) of a container."""
+        if not isinstance(v, dict):
+            return _LIST, (), list(v)
+        names = list(v)
+        kind = _DICT
+        if (
+            names[:1] == ["id"]
+            and isinstance(v.get("source"), str)
+            and isinstance(v.get("target"), str)
+            and v["id"] == f"e:{v['source']}->{v['target']}"
+        ):
+            kind = _EDGE
+            names = names[1:]
+        for k in names:
+            if not isinstance(k, str):
+                raise TypeError(f"graph keys must be strings, not {type(k).__name__}")
+        return kind, tuple(self.string(k) for k in names), [v[k] for k in names]
+
+    def _shape(self, words: Tuple[int, ...]) -> int:
+        shape = self.shapes.get(words)
+        if shape is None:
+            shape = self.shapes[words] = len(self.shapes)
+            self.shape_words.extend(words)
+        return shape
+
+    def container(self, v: Any, parts: Optional[Tuple[int, Tuple[int, ...], List[Any]]] = None) -> None:
+        kind, keys, values = parts or self._parts(v)
+        nested = [i for i, x in enumerate(values) if isinstance(x, _CONTAINERS)]
+        members: List[Tuple[int, Tuple[int, ...], List[Any]]] = []
+        rows = 0
+        if len(nested) > 1 and len(nested) == len(values):
+            members = [self._parts(x) for x in values]
+            first = members[0]
+            if all(m[0] == first[0] and m[1] == first[1] and len(m[2]) == len(first[2]) for m in members):
+                # Members of one shape (nodes, edges, layout positions) are
+                # written column by column; a column is itself a list
+                rows = 1 + self._shape((first[0], len(first[2]), 0, 0, *first[1]))
+        positions = tuple(nested) if 0 < len(nested) < len(values) else ()
+        self.tokens.append(self._shape((kind, len(values), len(nested), rows, *positions, *keys)))
+        if rows:
+            for j in range(len(members[0][2])):
+                self.container([m[2][j] for m in members])
+            return
+        for i, x in enumerate(values):
+            if not isinstance(x, _CONTAINERS):
+                self.scalar(x)
+            else:
+                self.container(x, members[i] if members else None)
+
+    def payload(self) -> Tuple[str, bytes]:
+        tokens = self.tokens
+        offset = len(self.strings)
+        for i in self.after_strings:
+            tokens[i] += offset
+        typecode = "H" if max(tokens, default=0) < (1 << 16) else "I"
+        if typecode == "I" and max(tokens) >= (1 << 32):
+            raise ValueError("graph too large for the binary graph format")
+        strings = list(self.strings)
+        text = "".join(strings).encode("utf-8", "surrogatepass")
+        parts = [
+            _COUNTS.pack(
+                len(strings),
+                len(text),
+                len(self.codes),
+                len(self.ints),
+                len(self.floats),
+                len(self.shape_words),
+                len(tokens),
+            ),
+            _little(array("I", [len(s) for s in strings])),
+            text,
+            self.codes.tobytes(),
+            _little(self.ints),
+            _little(self.floats),
+            _little(self.shape_words),
+            _little(array(typecode, tokens)),
+        ]
+        return typecode, b"".join(parts)
+
+
+def dumps_binary(graph: Graph, level: int = 6) -> bytes:
+    """`graph` in the compact binary format; loads_binary gives it back exactly, key order included."""
+    if not isinstance(graph, dict):
+        raise TypeError("a graph is a dict")
+    enc = _Encoder()
+    enc.container(graph)
+    typecode, payload = enc.payload()
+    return BINARY_MAGIC + bytes([BINARY_VERSION]) + typecode.encode() + zlib.compress(payload, level)
+
+
+def write_binary(graph: Graph, f: IO[bytes]) -> None:
+    f.write(dumps_binary(graph))
+
+
+# Decoded shape: kind, size, keys (dicts), the members as runs of (scalars,
+# then one container or not) (None when all are scalars, () when all are
+# containers), and the shape shared by members written as columns
+_Shape = Tuple[int, int, Optional[Tuple[str, ...]], Optional[Tuple[Tuple[int, bool], ...]], Any]
+
+
+def _shapes(words: array, table: List[Any]) -> List[_Shape]:
+    shapes: List[_Shape] = []
+    i = 0
+    while i < len(words):
+        kind, size, n_nested, rows = words[i : i + 4]
+        i += 4
+        runs: Optional[Tuple[Tuple[int, bool], ...]]
+        if n_nested == 0:
+            runs = None
+        elif n_nested == size:
+            runs = ()
+        else:
+            out = []
+            prev = 0
+            for p in words[i : i + n_nested]:
+                out.append((p - prev, True))
+                prev = p + 1
+            out.append((size - prev, False))
+            runs = tuple(out)
+            i += n_nested
+        keys = None
+        if kind != _LIST:
+            keys = tuple(table[k] for k in words[i : i + size])
+            i += size
+        shapes.append((kind, size, keys, runs, shapes[rows - 1] if rows else None))
+    return shapes
+
+
+def _rows(shape: _Shape, columns: List[List[Any]], count: int) -> List[Any]:
+    """Members of one shape from their columns, without a call per member."""
+    kind, _, keys, _, _ = shape
+    if any(len(c) != count for c in columns):
+        raise ValueError("binary graph is damaged")
+    rows = zip(*columns) if columns else repeat((), count)
+    if keys is None:
+        return list(map(list, rows))
+    dicts = list(map(dict, map(zip, repeat(keys), rows)))
+    if kind == _EDGE:
+        return [{"id": f"e:{d['source']}->{d['target']}", **d} for d in dicts]
+    return dicts
+
+
+def loads_binary(data: bytes) -> Graph:
+    """Decode dumps_binary output. Raises ValueError for anything else, or a damaged file."""
+    if not is_binary(data) or len(data) < len(BINARY_MAGIC) + 2:
+        raise ValueError("not a binary graph")
+    version, typecode = data[len(BINARY_MAGIC)], chr(data[len(BINARY_MAGIC) + 1])
+    if version != BINARY_VERSION:
+        raise ValueError(f"unsupported binary graph version {version}")
+    if typecode not in ("H", "I"):
+        raise ValueError("binary graph header is damaged")
+    try:
+        payload = memoryview(zlib.decompress(data[len(BINARY_MAGIC) + 2 :]))
+    except zlib.error as ex:
+        raise ValueError(f"binary graph is damaged: {ex}") from None
+    if len(payload) < _COUNTS.size:
+        raise ValueError("binary graph is truncated")
+    n_strings, n_text, n_scalars, n_ints, n_floats, n_words, n_tokens = _COUNTS.unpack_from(payload)
+    pos = _COUNTS.size
+
+    try:
+        lengths, pos = _unpack("I", payload, pos, n_strings)
+        text = bytes(payload[pos : pos + n_text]).decode("utf-8", "surrogatepass")
+        pos += n_text
+        ends = list(accumulate(lengths))
+        if (ends[-1] if ends else 0) != len(text):
+            raise ValueError("binary graph string table is damaged")
+        table: List[Any] = [text[a:b] for a, b in zip([0] + ends, ends)]
+
+        codes, pos = _unpack("B", payload, pos, n_scalars)
+        ints, pos = _unpack("q", payload, pos, n_ints)
+        floats, pos = _unpack("d", payload, pos, n_floats)
+        next_int, next_float = iter(ints), iter(floats)
+        constants = (None, False, True)
+        for code in codes:
+            if code == _INT:
+                table.append(next(next_int))
+            elif code == _FLOAT:
+                table.append(next(next_float))
+            else:
+                table.append(constants[code])
+
+        words, pos = _unpack("I", payload, pos, n_words)
+        shapes = _shapes(words, table)
+        tokens, pos = _unpack(typecode, payload, pos, n_tokens)
+    except (IndexError, StopIteration, UnicodeDecodeError):
+        raise ValueError("binary graph is damaged") from None
+
+    it = iter(tokens)
+    scalars = table.__getitem__
+
+    def container(shape: int) -> Any:
+        kind, size, keys, runs, rows = shapes[shape]
+        if rows is not None:
+            values = _rows(rows, [container(next(it)) for _ in range(rows[1])], size)
+        elif runs is None:
+            values = list(map(scalars, islice(it, size)))
+        elif not runs:
+            values = []
+            for t in islice(it, size):
+                member = shapes[t]
+                if member[0] == _DICT and member[3] is None:
+                    # Flat dicts (properties of varying keys): inline
+                    values.append(dict(zip(member[2], map(scalars, islice(it, member[1])))))  # type: ignore[arg-type]
+                else:
+                    values.append(container(t))
+        else:
+            values = []
+            for scalar_run, nested in runs:
+                if scalar_run:
+                    values.extend(map(scalars, islice(it, scalar_run)))
+                if nested:
+                    values.append(container(next(it)))
+        if len(values) != size:
+            raise ValueError("binary graph is truncated")
+        if keys is None:
+            return values
+        d = dict(zip(keys, values))
+        if kind == _EDGE:
+            return {"id": f"e:{d['source']}->{d['target']}", **d}
+        return d
+
+    try:
+        graph = container(next(it))
+    except (IndexError, KeyError, StopIteration):
+        raise ValueError("binary graph is damaged") from None
+    if not isinstance(graph, dict) or next(it, None) is not None:
+        raise ValueError("binary graph is damaged")
+    return graph  # type: ignore[return-value]
+
+
+def read_binary(f: IO[bytes]) -> Graph:
+    return loads_binary(f.read())
@@ -1,22 +1,26 @@
 from __future__ import annotations
 
-import http.server
 import json
 import os
-import platform
-import shutil
-import socketserver
 import sys
-import tempfile
-import webbrowser
 from pathlib import Path
-from typing import Any, Dict
+from typing import TYPE_CHECKING, Any, Dict, List, Optional
 
 import typer
-from rich import print
 
-from .model import Graph
-from .collect.linux import collect_linux_hardware_graph, generate_demo_graph
+# Keep module import cheap: `toposcope scan` runs from cron on many hosts, so
+# collectors, rich and the serve-only stdlib modules load inside the command
+# that needs them. benchmarks/startup.py guards this.
+if TYPE_CHECKING:
+    from .collect.profile import ScanProfiler
+    from .model import Graph
+
+
+def print(*objects: Any, **kwargs: Any) -> None:
+    """rich's print, imported on first use."""
+    from rich import print as rich_print
+
+    rich_print(*objects, **kwargs)
 
 
 app = typer.Typer(add_completion=False, no_args_is_help=True, help="TopoScope CLI")
@@ -26,28 +30,409 @@ def _ensure_parent_dir(path: Path) -> None:
     path.parent.mkdir(parents=True, exist_ok=True)
 
 
+def _parse_duration(value: str) -> float:
+    """Parse '2s', '500ms', '1m', '6h', '30d' or a bare number of seconds."""
+    v = value.strip().lower()
+    try:
+        if v.endswith("ms"):
+            return float(v[:-2]) / 1000.0
+        if v.endswith("s"):
+            return float(v[:-1])
+        if v.endswith("m"):
+            return float(v[:-1]) * 60.0
+        if v.endswith("h"):
+            return float(v[:-1]) * 3600.0
+        if v.endswith("d"):
+            return float(v[:-1]) * 86400.0
+        return float(v)
+    except ValueError:
+        raise typer.BadParameter(f"invalid duration: {value!r} (use e.g. 2s, 500ms, 1m, 30d)")
+
+
+def _parse_tool_timeouts(values: List[str]) -> Dict[str, float]:
+    timeouts: Dict[str, float] = {}
+    for item in values:
+        tool, sep, dur = item.partition("=")
+        if not sep or not tool.strip():
+            raise typer.BadParameter(f"expected TOOL=DURATION, got {item!r}")
+        timeouts[tool.strip()] = _parse_duration(dur)
+    return timeouts
+
+
+def _print_profile(profiler: ScanProfiler) -> None:
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Scan profile")
+    for col in ("collector", "status", "wall ms", "cmds", "spawn ms", "cmd ms", "parse ms", "KiB out", "nodes"):
+        table.add_column(col, justify="left" if col in ("collector", "status") else "right")
+    for row in sorted(profiler.summary(), key=lambda r: r["wall_s"], reverse=True):
+        table.add_row(
+            row["collector"],
+            row["status"],
+            f"{row['wall_s'] * 1e3:.1f}",
+            str(row["commands"]),
+            f"{row['spawn_s'] * 1e3:.1f}",
+            f"{row['command_s'] * 1e3:.1f}",
+            f"{row['parse_s'] * 1e3:.1f}",
+            f"{row['bytes'] / 1024:.1f}",
+            str(row["nodes"]),
+        )
+    console = Console()
+    console.print(table)
+    slow = profiler.slowest_commands(5)
+    if slow:
+        cmds = Table(title="Slowest commands")
+        for col in ("command", "collector", "wall ms", "KiB out", "rc"):
+            cmds.add_column(col, justify="left" if col in ("command", "collector") else "right")
+        for c in slow:
+            cmds.add_row(
+                " ".join(c["argv"]),
+                c["collector"],
+                f"{c['wall_s'] * 1e3:.1f}",
+                f"{c['bytes'] / 1024:.1f}",
+                "-" if c["returncode"] is None else str(c["returncode"]),
+            )
+        console.print(cmds)
+
+
 @app.command()
 def scan(
     out: Path = typer.Option(Path("graph.json"), help="Output path for the hardware graph JSON"),
     demo: bool = typer.Option(
         False, "--demo", help="Generate a demo graph instead of scanning the host"
     ),
+    jobs: int = typer.Option(
+        0, "--jobs", "-j", help="Max collectors to run concurrently (0 = auto, 1 = serial)"
+    ),
+    deadline: Optional[str] = typer.Option(
+        None, help="Scan-wide time budget (e.g. 2s, 500ms); late collectors are dropped"
+    ),
+    tool_timeout: List[str] = typer.Option(
+        [], "--tool-timeout", help="Per-tool timeout override, e.g. nvidia-smi=3s (repeatable)"
+    ),
+    virtual_ifaces: str = typer.Option(
+        "show", help="Virtual network interfaces: show, skip, or aggregate into one node"
+    ),
+    record: Optional[Path] = typer.Option(
+        None, help="Record every command output and sysfs read of this scan to a tar bundle"
+    ),
+    replay: Optional[Path] = typer.Option(
+        None, help="Rebuild the graph from a recorded bundle instead of the live host"
+    ),
+    replay_realtime: bool = typer.Option(
+        False, "--replay-realtime", help="With --replay, sleep for each command's recorded duration"
+    ),
+    profile: Optional[Path] = typer.Option(
+        None, help="Write a Chrome trace-event JSON of collector/command timings and print a summary"
+    ),
+    fresh: bool = typer.Option(
+        False, "--fresh", help="Ignore cached collector results and re-run every collector"
+    ),
+    cache: bool = typer.Option(
+        True, "--cache/--no-cache", help="Reuse results of collectors whose sources are unchanged"
+    ),
+    telemetry: bool = typer.Option(
+        True, "--telemetry/--no-telemetry", help="Include GPU readings as a per-node telemetry overlay"
+    ),
+    push: Optional[str] = typer.Option(
+        None, help="Also send the graph to a 'serve --watch' viewer, e.g. http://127.0.0.1:8080"
+    ),
+    push_token: Optional[str] = typer.Option(
+        None, help="With --push, the viewer's --push-token (needed when pushing from another host)"
+    ),
+    layout: bool = typer.Option(
+        False, "--layout/--no-layout", help="Embed precomputed viewer layouts (radial, hierarchy, compact); serve computes them on demand otherwise"
+    ),
+    summarize: bool = typer.Option(
+        False, "--summarize", help="Fold near-identical sibling devices (VFs, loop devices, veths, DIMMs) into aggregate nodes"
+    ),
+    history: bool = typer.Option(
+        False, "--history", help="Also store the graph in the local snapshot history (see 'toposcope history')"
+    ),
+    output_format: str = typer.Option(
+        "json",
+        "--format",
+        help="Output format: json, ndjson (one record per line, for streaming readers) "
+        "or binary (compact, for archives and transfer)",
+    ),
 ) -> None:
     """Scan the system (Linux) and write a normalized graph JSON."""
 
+    from .formats import GRAPH_FORMATS
+
+    if record and replay:
+        raise typer.BadParameter("--record and --replay are mutually exclusive")
+    if output_format not in GRAPH_FORMATS:
+        raise typer.BadParameter(f"--format must be one of {', '.join(GRAPH_FORMATS)}")
+
     if demo:
+        from .demo import generate_demo_graph
+
         graph: Graph = generate_demo_graph()
         print("[yellow]Generated demo graph[/yellow]")
     else:
-        if platform.system() != "Linux":
+        import platform
+
+        from .collect.cache import ScanCache
+        from .collect.hostio import HostIO, RecordingIO, ReplayIO
+        from .collect.linux import VIRTUAL_IFACE_MODES, collect_linux_hardware_graph
+        from .collect.profile import ScanProfiler
+
+        if virtual_ifaces not in VIRTUAL_IFACE_MODES:
+            raise typer.BadParameter(
+                f"--virtual-ifaces must be one of {', '.join(VIRTUAL_IFACE_MODES)}"
+            )
+
+        io: Optional[HostIO] = None
+        if replay:
+            try:
+                io = ReplayIO(str(replay), realtime=replay_realtime)
+            except Exception as ex:
+                print(f"[red]Cannot read replay bundle {replay}: {ex}[/red]")
+                raise typer.Exit(code=2)
+        elif platform.system() != "Linux":
             print("[red]Non-Linux OS detected. Use --demo to generate a sample graph.[/red]")
             raise typer.Exit(code=2)
-        graph = collect_linux_hardware_graph()
+        elif record:
+            io = RecordingIO()
+        profiler = ScanProfiler() if profile else None
+        # Recording and replay must see every input, so they bypass the cache
+        scan_cache = ScanCache(fresh=fresh) if cache and io is None else None
+        graph = collect_linux_hardware_graph(
+            max_workers=jobs or None,
+            deadline=_parse_duration(deadline) if deadline else None,
+            tool_timeouts=_parse_tool_timeouts(tool_timeout),
+            virtual_ifaces=virtual_ifaces,
+            io=io,
+            profiler=profiler,
+            cache=scan_cache,
+            telemetry=telemetry,
+        )
+        if profile and profiler:
+            _ensure_parent_dir(profile)
+            profiler.save(str(profile))
+            _print_profile(profiler)
+            print(f"[green]Wrote scan trace to[/green] {profile}")
+        if record and isinstance(io, RecordingIO):
+            _ensure_parent_dir(record)
+            io.save(str(record))
+            print(f"[green]Recorded scan inputs to[/green] {record}")
+        root_props = graph["nodes"][0].get("properties", {})
+        if root_props.get("scan_status") == "partial":
+            late = [
+                k[len("collector_"):]
+                for k, v in root_props.items()
+                if k.startswith("collector_") and v in ("timeout", "partial", "error")
+            ]
+            print(f"[yellow]Partial scan; incomplete collectors:[/yellow] {', '.join(late)}")
+
+    if summarize:
+        from .summarize import summarize_graph
+
+        graph = summarize_graph(graph)
+
+    if layout:
+        from .layout import LayoutCache, layouts_for
+
+        # Keyed by structure, so rescans of unchanged hardware reuse positions
+        graph["layouts"] = layouts_for(graph, LayoutCache())
 
     _ensure_parent_dir(out)
-    with out.open("w", encoding="utf-8") as f:
-        json.dump(graph, f, indent=2)
+    from .formats import dump_graph
+
+    with out.open("wb") as f:
+        dump_graph(graph, f, output_format)
     print(f"[green]Wrote graph to[/green] {out}")
+    if history:
+        from .history import HistoryStore
+
+        with HistoryStore() as store:
+            snap = store.add(graph)
+        print(f"[green]Stored snapshot[/green] {snap['id']} ({snap['new_bytes'] / 1024:.1f} KiB new)")
+    if push:
+        _push_graph(push, graph, token=push_token)
+
+
+def _push_graph(base_url: str, graph: Graph, token: Optional[str] = None) -> None:
+    import urllib.request
+
+    url = base_url.rstrip("/") + "/api/graph"
+    headers = {"Content-Type": "application/json"}
+    if token:
+        headers["Authorization"] = f"Bearer {token}"
+    req = urllib.request.Request(url, data=json.dumps(graph).encode("utf-8"), headers=headers, method="POST")
+    try:
+        with urllib.request.urlopen(req, timeout=10) as res:
+            revision = json.load(res).get("revision")
+    except Exception as ex:
+        print(f"[yellow]Could not push graph to {url}: {ex}[/yellow]")
+        return
+    print(f"[green]Pushed graph to[/green] {url} (revision {revision})")
+
+
+def _write_json_atomic(path: Path, data: Any) -> None:
+    _ensure_parent_dir(path)
+    tmp = path.with_name(f".{path.name}.tmp")
+    with tmp.open("w", encoding="utf-8") as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp, path)
+
+
+@app.command()
+def telemetry(
+    out: Path = typer.Option(Path("telemetry.json"), help="Output path (overlay, or merged graph with --graph)"),
+    graph: Optional[Path] = typer.Option(
+        None, help="Inventory graph to merge readings onto by node id; the output is then a full graph"
+    ),
+    interval: Optional[str] = typer.Option(
+        None, help="Refresh every interval (e.g. 1s, 500ms) until interrupted"
+    ),
+    count: int = typer.Option(0, help="With --interval, stop after this many refreshes (0 = forever)"),
+    deadline: Optional[str] = typer.Option(None, help="Time budget per refresh (e.g. 2s)"),
+    tool_timeout: List[str] = typer.Option(
+        [], "--tool-timeout", help="Per-tool timeout override, e.g. nvidia-smi=3s (repeatable)"
+    ),
+    sample: bool = typer.Option(
+        False, "--sample", help="Sample continuously and write min/avg/max/p95 summaries every --interval"
+    ),
+    sample_ms: int = typer.Option(1000, help="With --sample, milliseconds between samples"),
+    window: int = typer.Option(300, help="With --sample, samples kept per GPU and metric"),
+    nvidia_smi: str = typer.Option(
+        "nvidia-smi", help="With --sample, nvidia-smi command to stream from (e.g. a stub script)"
+    ),
+) -> None:
+    """Collect volatile readings (GPU temperature, power, utilization) without re-scanning inventory."""
+    import platform
+    import shlex
+    import time
+
+    from .collect.linux import collect_linux_telemetry
+    from .model import merge_telemetry
+
+    if platform.system() != "Linux":
+        print("[red]Non-Linux OS detected; telemetry needs a live Linux host.[/red]")
+        raise typer.Exit(code=2)
+    inventory: Optional[Graph] = None
+    if graph is not None:
+        from .formats import load_graph
+
+        try:
+            inventory = load_graph(graph)
+        except Exception as ex:
+            print(f"[red]Cannot read graph {graph}: {ex}[/red]")
+            raise typer.Exit(code=2)
+    period = _parse_duration(interval) if interval else None
+    budget = _parse_duration(deadline) if deadline else None
+    timeouts = _parse_tool_timeouts(tool_timeout)
+
+    samplers: List[Any] = []
+    store = None
+    if sample:
+        from .collect.sampler import NvidiaSmiSampler, RocmPoller, SampleStore
+
+        # Readings are flagged stale after three missed samples and dropped
+        # once a whole window has passed without one
+        sample_s = sample_ms / 1000.0
+        store = SampleStore(capacity=window, stale_after=3 * sample_s, expire_after=window * sample_s)
+        period = period or 10.0
+        for sampler in (
+            NvidiaSmiSampler(store, interval_ms=sample_ms, command=shlex.split(nvidia_smi)),
+            RocmPoller(store, interval_ms=sample_ms),
+        ):
+            if sampler.start():
+                samplers.append(sampler)
+        if not samplers:
+            print("[red]No GPU telemetry source could be started[/red]")
+            raise typer.Exit(code=1)
+
+    done = 0
+    try:
+        while True:
+            started = time.monotonic()
+            if store is not None:
+                time.sleep(period)
+                overlay = store.overlay()
+            else:
+                overlay = collect_linux_telemetry(deadline=budget, tool_timeouts=timeouts)
+            # Written atomically so readers polling `out` never see a partial file
+            _write_json_atomic(out, merge_telemetry(inventory, overlay) if inventory is not None else overlay)
+            done += 1
+            if period is None:
+                print(f"[green]Wrote telemetry for {len(overlay['nodes'])} node(s) to[/green] {out}")
+                break
+            if count and done >= count:
+                break
+            if store is None:
+                time.sleep(max(0.0, period - (time.monotonic() - started)))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        for sampler in samplers:
+            sampler.stop()
+
+
+@app.command()
+def agent(
+    out: Path = typer.Option(Path("graph.json"), help="Graph JSON rewritten on every revision"),
+    fake_events: Optional[Path] = typer.Option(
+        None, help="Replay scripted uevents from a JSON-lines file instead of the kernel socket"
+    ),
+    debounce: str = typer.Option("200ms", help="Coalesce events arriving within this window"),
+    jobs: int = typer.Option(
+        0, "--jobs", "-j", help="Max collectors to run concurrently (0 = auto, 1 = serial)"
+    ),
+    tool_timeout: List[str] = typer.Option(
+        [], "--tool-timeout", help="Per-tool timeout override, e.g. nvidia-smi=3s (repeatable)"
+    ),
+    virtual_ifaces: str = typer.Option(
+        "show", help="Virtual network interfaces: show, skip, or aggregate into one node"
+    ),
+) -> None:
+    """Scan once, then keep the graph current from hotplug (uevent) events."""
+    import platform
+
+    from .collect.agent import FakeEventSource, GraphAgent, default_event_source
+    from .collect.linux import VIRTUAL_IFACE_MODES
+
+    if virtual_ifaces not in VIRTUAL_IFACE_MODES:
+        raise typer.BadParameter(f"--virtual-ifaces must be one of {', '.join(VIRTUAL_IFACE_MODES)}")
+    if platform.system() != "Linux":
+        print("[red]Non-Linux OS detected; the agent needs a live Linux host.[/red]")
+        raise typer.Exit(code=2)
+    try:
+        source: Any = (
+            FakeEventSource.from_file(str(fake_events)) if fake_events else default_event_source()
+        )
+    except (OSError, ValueError) as ex:
+        print(f"[red]Cannot open event source: {ex}[/red]")
+        raise typer.Exit(code=2)
+
+    graph_agent = GraphAgent(
+        virtual_ifaces=virtual_ifaces,
+        max_workers=jobs or None,
+        tool_timeouts=_parse_tool_timeouts(tool_timeout),
+    )
+
+    def publish(change: Optional[Dict[str, Any]] = None) -> None:
+        revision, graph = graph_agent.snapshot()
+        _write_json_atomic(out, graph)
+        if change is None:
+            print(f"[green]Revision {revision}:[/green] {len(graph['nodes'])} nodes written to {out}")
+        else:
+            print(
+                f"[green]Revision {revision}[/green] ({', '.join(change['sections'])}): "
+                f"+{len(change['added'])} -{len(change['removed'])} ~{len(change['changed'])}"
+            )
+
+    graph_agent.build()
+    publish()
+    try:
+        graph_agent.run(source, on_change=publish, debounce=_parse_duration(debounce))
+    except KeyboardInterrupt:
+        pass
+    finally:
+        source.close()
 
 
 @app.command()
@@ -56,9 +441,26 @@ def serve(
         Path("graph.json"), help="Path to a hardware graph JSON produced by 'toposcope scan'"
     ),
     port: int = typer.Option(8080, help="Port for the local viewer web server"),
+    host: str = typer.Option("127.0.0.1", help="Address to listen on"),
     open_browser: bool = typer.Option(True, help="Open browser after server starts"),
+    watch: bool = typer.Option(
+        False, "--watch", help="Stream graph file changes and pushed graphs to open viewers"
+    ),
+    watch_interval: str = typer.Option("500ms", help="With --watch, how often to check the graph file"),
+    summarize: bool = typer.Option(
+        False, "--summarize", help="Serve the graph with near-identical sibling devices folded into aggregate nodes"
+    ),
+    push_token: Optional[str] = typer.Option(
+        None, help="With --watch, accept pushes from other hosts that present this token (loopback needs none)"
+    ),
 ) -> None:
     """Serve a simple viewer for a given graph JSON using a local HTTP server."""
+    import threading
+    import webbrowser
+
+    from .server import FileWatcher, GraphFeed, make_server, read_graph
+    from .summarize import summarize_graph
+
     viewer_dir = Path(__file__).resolve().parent.parent.parent / "viewer"
     if not viewer_dir.exists():
         print(f"[red]Viewer assets not found at {viewer_dir}[/red]")
@@ -68,47 +470,187 @@ def serve(
         print(f"[red]Graph JSON not found:[/red] {graph}")
         raise typer.Exit(code=2)
 
-    # Create a temporary directory containing viewer + graph.json
-    with tempfile.TemporaryDirectory(prefix="toposcope-view-") as tmpdir:
-        tmp_path = Path(tmpdir)
-        for item in viewer_dir.iterdir():
-            dest = tmp_path / item.name
-            if item.is_dir():
-                shutil.copytree(item, dest)
-            else:
-                shutil.copy2(item, dest)
-        shutil.copy2(graph, tmp_path / "graph.json")
-
-        os.chdir(tmp_path)
-        handler = http.server.SimpleHTTPRequestHandler
-        # Reusable server to avoid TIME_WAIT issues after Ctrl-C
-        class ReusableTCPServer(socketserver.TCPServer):
-            allow_reuse_address = True
-
-        try:
-            httpd = ReusableTCPServer(("127.0.0.1", port), handler)
-        except OSError as ex:
-            print(f"[red]Failed to start server on port {port}: {ex}[/red]")
-            raise typer.Exit(code=3)
+    # Assets and the graph are served in place, so a rewritten graph file
+    # (e.g. by `toposcope agent`) is picked up on the viewer's next load
+    feed: Optional[GraphFeed] = None
+    watcher: Optional[FileWatcher] = None
+    if watch:
+        initial = read_graph(graph)
+        if initial is None:
+            print(f"[red]Cannot read graph {graph}[/red]")
+            raise typer.Exit(code=2)
+        # Viewers get deltas between summarized graphs, matching /graph.json
+        feed = GraphFeed(initial, transform=summarize_graph if summarize else None)
+        watcher = FileWatcher(graph, feed, interval=_parse_duration(watch_interval))
+    try:
+        httpd = make_server(viewer_dir, graph, host=host, port=port, feed=feed, summarize=summarize, push_token=push_token)
+    except OSError as ex:
+        print(f"[red]Failed to start server on port {port}: {ex}[/red]")
+        raise typer.Exit(code=3)
+    if watcher is not None:
+        watcher.start()
+    # Lay the graph out before the first viewer asks for it
+    threading.Thread(target=httpd.warm, name="toposcope-warm", daemon=True).start()
 
-        try:
-            actual_port = httpd.server_address[1]
-            url = f"http://127.0.0.1:{actual_port}/index.html"
-            print(f"[green]Serving viewer at[/green] {url}")
-            if open_browser:
-                try:
-                    webbrowser.open_new_tab(url)
-                except Exception:
-                    pass
-            httpd.serve_forever()
-        except KeyboardInterrupt:
-            print("\n[cyan]Shutting down viewer server[/cyan]")
-        finally:
+    try:
+        actual_port = httpd.server_address[1]
+        url = f"http://127.0.0.1:{actual_port}/index.html"
+        print(f"[green]Serving viewer at[/green] {url}")
+        if watch:
+            print(f"[green]Watching {graph}; push graphs with POST[/green] http://127.0.0.1:{actual_port}/api/graph")
+        if open_browser:
             try:
-                httpd.shutdown()
+                webbrowser.open_new_tab(url)
             except Exception:
                 pass
-            httpd.server_close()
+        httpd.serve_forever()
+    except KeyboardInterrupt:
+        print("\n[cyan]Shutting down viewer server[/cyan]")
+    finally:
+        if watcher is not None:
+            watcher.stop()
+        httpd.server_close()
+
+
+@app.command("diff")
+def diff_command(
+    old: Path = typer.Argument(..., help="Earlier graph JSON"),
+    new: Path = typer.Argument(..., help="Later graph JSON"),
+    as_json: bool = typer.Option(False, "--json", help="Print the diff as JSON instead of a table"),
+    ignore: List[str] = typer.Option(
+        [], "--ignore", help="Also ignore properties matching this pattern, e.g. 'fw_*' (repeatable)"
+    ),
+    all_keys: bool = typer.Option(
+        False, "--all-keys", help="Compare volatile keys too (GPU readings, scan status markers)"
+    ),
+    telemetry: bool = typer.Option(False, "--telemetry", help="Also compare node telemetry"),
+    exit_code: bool = typer.Option(False, "--exit-code", help="Exit with status 1 when the graphs differ"),
+) -> None:
+    """Compare two graphs: nodes and edges added, removed and changed, property by property."""
+    from .diff import VOLATILE_KEYS, delta_is_empty, diff_graphs, diff_rows
+    from .formats import load_graph
+
+    graphs = []
+    for path in (old, new):
+        try:
+            graphs.append(load_graph(path))
+        except (OSError, ValueError) as ex:
+            print(f"[red]Cannot read graph {path}: {ex}[/red]")
+            raise typer.Exit(code=2)
+    patterns = list(ignore) + ([] if all_keys else list(VOLATILE_KEYS))
+    result = diff_graphs(graphs[0], graphs[1], ignore=patterns, telemetry=telemetry)
+    same = delta_is_empty(result)
+    if as_json:
+        sys.stdout.write(json.dumps(result, indent=2) + "\n")
+    elif same:
+        print("[green]No differences[/green]")
+    else:
+        from rich.console import Console
+        from rich.table import Table
+        from rich.text import Text
+
+        styles = {"added": "green", "removed": "red", "changed": "yellow"}
+        table = Table(title=f"{old} → {new}")
+        for col in ("change", "id", "field", "old", "new"):
+            table.add_column(col, overflow="fold")
+        for change, section, item_id, field, a, b in diff_rows(result):
+            # Ids like `e:bus:pci->...` must not be read as markup or emoji codes
+            table.add_row(
+                Text(change + ("" if section == "nodes" else " edge"), style=styles[change]),
+                Text(item_id),
+                Text(field),
+                Text("" if a is None else str(a)),
+                Text("" if b is None else str(b)),
+            )
+        Console().print(table)
+    if exit_code and not same:
+        raise typer.Exit(code=1)
+
+
+history_app = typer.Typer(no_args_is_help=True, help="Browse and prune stored scan snapshots (scan --history)")
+app.add_typer(history_app, name="history")
+
+_HISTORY_DB_HELP = "Snapshot database (default: $XDG_STATE_HOME/toposcope/history.sqlite)"
+
+
+def _open_history(db: Optional[Path]) -> Any:
+    from .history import HistoryStore
+
+    return HistoryStore(str(db) if db else None)
+
+
+@history_app.command("list")
+def history_list(
+    host: Optional[str] = typer.Option(None, help="Only snapshots of this host"),
+    limit: int = typer.Option(20, help="Show at most this many snapshots, newest first (0 = all)"),
+    db: Optional[Path] = typer.Option(None, help=_HISTORY_DB_HELP),
+    as_json: bool = typer.Option(False, "--json", help="Print JSON instead of a table"),
+) -> None:
+    """List stored snapshots without loading them."""
+    import datetime
+
+    with _open_history(db) as store:
+        rows = store.list(host=host, limit=limit or None)
+    if as_json:
+        sys.stdout.write(json.dumps(rows, indent=2) + "\n")
+        return
+    from rich.console import Console
+    from rich.table import Table
+
+    table = Table(title="Snapshots")
+    for col in ("id", "taken", "host", "nodes", "edges", "hash", "KiB new"):
+        table.add_column(col, justify="right" if col in ("id", "nodes", "edges", "KiB new") else "left")
+    for r in rows:
+        table.add_row(
+            str(r["id"]),
+            datetime.datetime.fromtimestamp(r["taken_at"]).strftime("%Y-%m-%d %H:%M:%S"),
+            r["host"],
+            str(r["nodes"]),
+            str(r["edges"]),
+            r["hash"][:12],
+            f"{r['new_bytes'] / 1024:.1f}",
+        )
+    Console().print(table)
+
+
+@history_app.command("show")
+def history_show(
+    snapshot: int = typer.Argument(..., help="Snapshot id (see 'history list')"),
+    out: Optional[Path] = typer.Option(None, help="Write the graph here instead of stdout"),
+    db: Optional[Path] = typer.Option(None, help=_HISTORY_DB_HELP),
+) -> None:
+    """Print or write a stored snapshot as graph JSON."""
+    with _open_history(db) as store:
+        graph = store.get(snapshot)
+    if graph is None:
+        print(f"[red]No snapshot {snapshot}[/red]")
+        raise typer.Exit(code=2)
+    if out is None:
+        sys.stdout.write(json.dumps(graph, indent=2) + "\n")
+        return
+    _write_json_atomic(out, graph)
+    print(f"[green]Wrote snapshot {snapshot} to[/green] {out}")
+
+
+@history_app.command("prune")
+def history_prune(
+    keep_last: Optional[int] = typer.Option(None, help="Keep only the newest N snapshots per host"),
+    older_than: Optional[str] = typer.Option(None, help="Drop snapshots older than this (e.g. 90d, 12h)"),
+    host: Optional[str] = typer.Option(None, help="Only prune this host's snapshots"),
+    db: Optional[Path] = typer.Option(None, help=_HISTORY_DB_HELP),
+) -> None:
+    """Drop old snapshots and the sections no remaining snapshot uses."""
+    if keep_last is None and older_than is None:
+        raise typer.BadParameter("give --keep-last and/or --older-than")
+    with _open_history(db) as store:
+        snapshots, blobs = store.prune(
+            keep_last=keep_last,
+            older_than=_parse_duration(older_than) if older_than else None,
+            host=host,
+        )
+        if blobs:
+            store.vacuum()
+    print(f"[green]Removed {snapshots} snapshots and {blobs} unused sections[/green]")
 
 
 if __name__ == "__main__":
@@ -0,0 +1,366 @@
+from __future__ import annotations
+
+import collections
+import heapq
+import json
+import select
+import socket
+import threading
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Deque, Dict, Iterable, List, Mapping, Optional, Set, Tuple
+
+from ..model import Graph, HardwareGraph, NodeRecord
+from .engine import Collector, ScanContext, run_collectors
+from .hostio import HostIO
+from .linux import apply_gpu_results, assemble_linux_graph, linux_collectors
+
+NETLINK_KOBJECT_UEVENT = 15
+UEVENT_KERNEL_GROUP = 1  # raw kernel events; group 2 is udevd's rebroadcast
+
+# uevent SUBSYSTEM -> graph section it affects
+SUBSYSTEM_SECTIONS: Dict[str, str] = {
+    "pci": "pci",
+    "usb": "usb",
+    "block": "block",
+    "nvme": "block",
+    "net": "net",
+}
+
+# graph section -> collectors re-run when it changes. GPU inventory rides on
+# the PCI section because it enriches PCI nodes in place.
+SECTION_COLLECTORS: Dict[str, Tuple[str, ...]] = {
+    "pci": ("pci", "nvidia", "rocm"),
+    "usb": ("usb",),
+    "block": ("nvme", "lsblk"),
+    "net": ("net",),
+}
+
+CHANGE_LOG_SIZE = 64
+
+# Collector statuses whose result describes the hardware as it is now. After
+# any other (error, timeout, partial) the section keeps its previous nodes.
+TRUSTED_STATUSES = ("ok", "cached", "skipped")
+
+
+@dataclass
+class UEvent:
+    action: str
+    devpath: str
+    subsystem: str = ""
+    env: Dict[str, str] = field(default_factory=dict)
+
+
+def parse_uevent(data: bytes) -> Optional[UEvent]:
+    """Parse a kernel uevent datagram: `action@devpath\\0KEY=VALUE\\0...`.
+
+    Returns None for anything else (e.g. udevd's "libudev" messages).
+    """
+    parts = data.split(b"\0")
+    header = parts[0].decode("utf-8", "replace")
+    if "@" not in header:
+        return None
+    action, devpath = header.split("@", 1)
+    env: Dict[str, str] = {}
+    for raw in parts[1:]:
+        key, sep, value = raw.decode("utf-8", "replace").partition("=")
+        if sep:
+            env[key] = value
+    return UEvent(
+        action=env.get("ACTION", action),
+        devpath=env.get("DEVPATH", devpath),
+        subsystem=env.get("SUBSYSTEM", ""),
+        env=env,
+    )
+
+
+class NetlinkUEventSource:
+    """Kernel uevents from the NETLINK_KOBJECT_UEVENT socket (Linux only).
+
+    Needs no privileges to listen. The receive buffer is enlarged because
+    hotplug arrives in bursts (a USB hub plug is dozens of events) and the
+    kernel drops what does not fit.
+    """
+
+    def __init__(self, rcvbuf: int = 1 << 20) -> None:
+        self._sock = socket.socket(socket.AF_NETLINK, socket.SOCK_DGRAM, NETLINK_KOBJECT_UEVENT)
+        try:
+            self._sock.setsockopt(socket.SOL_SOCKET, socket.SO_RCVBUF, rcvbuf)
+        except OSError:
+            pass
+        self._sock.bind((0, UEVENT_KERNEL_GROUP))
+
+    def get(self, timeout: float) -> Optional[UEvent]:
+        """Next event, or None if none arrived within `timeout` seconds."""
+        deadline = time.monotonic() + timeout
+        while True:
+            left = deadline - time.monotonic()
+            if left <= 0:
+                return None
+            ready, _, _ = select.select([self._sock], [], [], left)
+            if not ready:
+                return None
+            try:
+                data = self._sock.recv(65536)
+            except OSError:
+                # ENOBUFS: events were dropped; the next refresh catches up
+                continue
+            event = parse_uevent(data)
+            if event is not None:
+                return event
+
+    def exhausted(self) -> bool:
+        return False
+
+    def close(self) -> None:
+        self._sock.close()
+
+
+class FakeEventSource:
+    """Scripted events for tests and demos, with no real hardware involved.
+
+    Events are `push`ed (optionally delayed) or loaded from a JSON-lines file
+    of `{"action", "devpath", "subsystem", "delay_s"}` objects, where
+    `delay_s` is relative to the previous event. Once closed and drained the
+    source is exhausted and an agent reading from it stops.
+    """
+
+    def __init__(self, events: Iterable[UEvent] = ()) -> None:
+        self._cond = threading.Condition()
+        self._pending: List[Tuple[float, int, UEvent]] = []
+        self._seq = 0
+        self._closed = False
+        for event in events:
+            self.push(event)
+
+    @classmethod
+    def from_file(cls, path: str) -> "FakeEventSource":
+        source = cls()
+        delay = 0.0
+        with open(path, "r", encoding="utf-8") as f:
+            for line in f:
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                obj = json.loads(line)
+                delay += float(obj.get("delay_s", 0.0))
+                event = UEvent(
+                    action=obj.get("action", "change"),
+                    devpath=obj.get("devpath", ""),
+                    subsystem=obj.get("subsystem", ""),
+                    env={str(k): str(v) for k, v in (obj.get("env") or {}).items()},
+                )
+                source.push(event, delay_s=delay)
+        source.close()
+        return source
+
+    def push(self, event: UEvent, delay_s: float = 0.0) -> None:
+        with self._cond:
+            heapq.heappush(self._pending, (time.monotonic() + delay_s, self._seq, event))
+            self._seq += 1
+            self._cond.notify_all()
+
+    def get(self, timeout: float) -> Optional[UEvent]:
+        deadline = time.monotonic() + timeout
+        with self._cond:
+            while True:
+                now = time.monotonic()
+                if self._pending and self._pending[0][0] <= now:
+                    return heapq.heappop(self._pending)[2]
+                if self._closed and not self._pending:
+                    return None
+                wake = deadline if not self._pending else min(deadline, self._pending[0][0])
+                if wake <= now:
+                    return None
+                self._cond.wait(wake - now)
+
+    def exhausted(self) -> bool:
+        with self._cond:
+            return self._closed and not self._pending
+
+    def close(self) -> None:
+        with self._cond:
+            self._closed = True
+            self._cond.notify_all()
+
+
+class GraphAgent:
+    """Keeps a hardware graph current from hotplug events.
+
+    `build` runs a full scan once. Afterwards each event maps to a graph
+    section (pci, usb, block, net); only that section's collectors are re-run
+    and the nodes and edges they own are patched in place: added, replaced
+    when their content changed, or removed. Every effective change bumps
+    `revision`, so readers can tell snapshots apart cheaply. Inventory only;
+    GPU readings come from `toposcope telemetry`. Thread-safe: snapshots may
+    be taken while events are applied.
+    """
+
+    def __init__(
+        self,
+        virtual_ifaces: str = "show",
+        max_workers: Optional[int] = None,
+        tool_timeouts: Optional[Mapping[str, float]] = None,
+        io: Optional[HostIO] = None,
+    ) -> None:
+        self.max_workers = max_workers
+        self.tool_timeouts = tool_timeouts
+        self.io = io
+        self._collectors: Dict[str, Collector] = {
+            c.name: c for c in linux_collectors(virtual_ifaces=virtual_ifaces, telemetry=False)
+        }
+        self._lock = threading.Lock()
+        self.graph = HardwareGraph()
+        self.revision = 0
+        self.results: Dict[str, Any] = {}
+        self.status: Dict[str, str] = {}
+        # section -> ids it contributed, so a refresh knows what disappeared
+        self._owned_nodes: Dict[str, Set[str]] = {}
+        self._owned_edges: Dict[str, Set[str]] = {}
+        self.changes: Deque[Dict[str, Any]] = collections.deque(maxlen=CHANGE_LOG_SIZE)
+
+    def _run(self, names: Iterable[str]) -> Tuple[Dict[str, Any], Dict[str, str], HostIO]:
+        ctx = ScanContext(tool_timeouts=self.tool_timeouts, io=self.io)
+        collectors = [self._collectors[n] for n in names if n in self._collectors]
+        results, status = run_collectors(collectors, max_workers=self.max_workers, ctx=ctx)
+        return results, status, ctx.io
+
+    def _section_graph(self, section: str) -> HardwareGraph:
+        g = HardwareGraph()
+        for name in SECTION_COLLECTORS[section]:
+            result = self.results.get(name)
+            if isinstance(result, dict):
+                g.merge(result)
+        if section == "pci":
+            apply_gpu_results(g, self.results)
+        return g
+
+    def build(self) -> int:
+        """Full scan; returns the new revision."""
+        results, status, io = self._run(self._collectors)
+        with self._lock:
+            self.results, self.status = results, status
+            self.graph = assemble_linux_graph(results, status, io.host())
+            for section in SECTION_COLLECTORS:
+                sg = self._section_graph(section)
+                self._owned_nodes[section] = {n.id for n in sg.nodes()}
+                self._owned_edges[section] = {e.id for e in sg.edges()}
+            self.revision += 1
+            return self.revision
+
+    def _patch_section(self, section: str, change: Dict[str, List[str]]) -> None:
+        new = self._section_graph(section)
+        new_nodes = {n.id for n in new.nodes()}
+        new_edges = {e.id for e in new.edges()}
+        for node_id in sorted(self._owned_nodes.get(section, set()) - new_nodes):
+            if self.graph.remove_node(node_id) is not None:
+                change["removed"].append(node_id)
+        for edge_id in self._owned_edges.get(section, set()) - new_edges:
+            self.graph.remove_edge(edge_id)
+        for node in new.nodes():
+            current = self.graph.node(node.id)
+            if current is None:
+                self.graph.add_node(node)
+                change["added"].append(node.id)
+            elif current.to_dict() != node.to_dict():
+                self.graph.add_node(node, replace=True)
+                change["changed"].append(node.id)
+        for edge in new.edges():
+            current_edge = self.graph.edge(edge.id)
+            if current_edge is None or current_edge.to_dict() != edge.to_dict():
+                self.graph.add_edge(edge, replace=True)
+                change["edges"].append(edge.id)
+        self._owned_nodes[section] = new_nodes
+        self._owned_edges[section] = new_edges
+
+    def _patch_root(self, change: Dict[str, List[str]]) -> None:
+        root = self.graph.node("root")
+        if root is None:
+            return
+        props = dict(root.properties)
+        for name, st in self.status.items():
+            props[f"collector_{name}"] = st
+        incomplete = any(st in ("timeout", "partial", "error") for st in self.status.values())
+        props["scan_status"] = "partial" if incomplete else "complete"
+        if props != root.properties:
+            self.graph.add_node(NodeRecord(root.id, root.kind, root.label, props, root.extra, root.telemetry), replace=True)
+            change["changed"].append(root.id)
+
+    def refresh(self, sections: Iterable[str]) -> Optional[Dict[str, Any]]:
+        """Re-run the collectors of `sections` and patch the graph.
+
+        A section with a failed or timed-out collector is left as it was
+        rather than emptied; the failure shows only in the root's collector
+        statuses. Returns the change record (also appended to `changes`), or
+        None when the graph came out identical and the revision stays put.
+        """
+        sections = [s for s in SECTION_COLLECTORS if s in set(sections)]
+        if not sections:
+            return None
+        names = [n for s in sections for n in SECTION_COLLECTORS[s]]
+        results, status, _ = self._run(names)
+        change: Dict[str, List[str]] = {"added": [], "removed": [], "changed": [], "edges": []}
+        with self._lock:
+            self.status.update(status)
+            for section in sections:
+                names = SECTION_COLLECTORS[section]
+                if any(status.get(n, "skipped") not in TRUSTED_STATUSES for n in names):
+                    continue
+                self.results.update({n: results[n] for n in names if n in results})
+                self._patch_section(section, change)
+            self._patch_root(change)
+            if not any(change.values()):
+                return None
+            self.revision += 1
+            record: Dict[str, Any] = {"revision": self.revision, "at": time.time(), "sections": sections, **change}
+            self.changes.append(record)
+            return record
+
+    def snapshot(self) -> Tuple[int, Graph]:
+        """(revision, graph) as of one consistent moment; the root node carries `revision`."""
+        with self._lock:
+            graph = self.graph.to_dict()
+            revision = self.revision
+        for node in graph["nodes"]:
+            if node["id"] == "root":
+                node["properties"] = {**node["properties"], "revision": str(revision)}
+                break
+        return revision, graph
+
+    def run(
+        self,
+        source: Any,
+        stop: Optional[threading.Event] = None,
+        on_change: Optional[Callable[[Dict[str, Any]], None]] = None,
+        debounce: float = 0.2,
+    ) -> None:
+        """Apply events from `source` until `stop` is set or the source is exhausted.
+
+        Events arriving within `debounce` seconds of the first are coalesced,
+        so a burst (one device, many kobjects) costs one refresh per section.
+        """
+        stop = stop or threading.Event()
+        while not stop.is_set():
+            event = source.get(0.5)
+            if event is None:
+                if source.exhausted():
+                    return
+                continue
+            sections: Set[str] = set()
+            until = time.monotonic() + debounce
+            while event is not None:
+                section = SUBSYSTEM_SECTIONS.get(event.subsystem)
+                if section:
+                    sections.add(section)
+                left = until - time.monotonic()
+                event = source.get(left) if left > 0 else None
+            change = self.refresh(sections)
+            if change is not None and on_change is not None:
+                on_change(change)
+
+
+def default_event_source() -> NetlinkUEventSource:
+    if not hasattr(socket, "AF_NETLINK"):
+        raise OSError("kernel uevents need a Linux host")
+    return NetlinkUEventSource()
+
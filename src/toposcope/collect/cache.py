@@ -0,0 +1,95 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, Optional, Tuple
+
+CACHE_VERSION = 1
+CACHE_FILE = "scan-cache.json"
+
+
+def default_cache_dir() -> str:
+    """`$XDG_CACHE_HOME/toposcope`, falling back to `~/.cache/toposcope`."""
+    base = os.environ.get("XDG_CACHE_HOME") or os.path.join(os.path.expanduser("~"), ".cache")
+    return os.path.join(base, "toposcope")
+
+
+def fingerprint(*parts: Any) -> str:
+    """Stable digest of JSON-friendly fingerprint parts."""
+    blob = json.dumps(parts, sort_keys=True, separators=(",", ":"), default=str)
+    return hashlib.sha256(blob.encode("utf-8")).hexdigest()
+
+
+def _code_stamp() -> str:
+    # Parser changes must invalidate cached results, so key the whole cache
+    # on the collector sources' mtimes as well as the format version.
+    here = os.path.dirname(os.path.abspath(__file__))
+    try:
+        mtimes = sorted(
+            (e.name, e.stat().st_mtime_ns) for e in os.scandir(here) if e.name.endswith(".py")
+        )
+    except OSError:
+        mtimes = []
+    return fingerprint(CACHE_VERSION, mtimes)
+
+
+class ScanCache:
+    """Per-collector results from earlier scans, keyed on source fingerprints.
+
+    A collector's entry is reused only while its fingerprint (boot id, sysfs
+    listings, tool binary stats, ...) is unchanged; see `Collector.fingerprint`.
+    Stored as one JSON file; a missing, corrupt or outdated file is an empty
+    cache. With `fresh`, earlier entries are ignored but new results are still
+    saved. Thread-safe, since collectors consult it from worker threads.
+    """
+
+    def __init__(self, directory: Optional[str] = None, fresh: bool = False) -> None:
+        self.path = os.path.join(directory or default_cache_dir(), CACHE_FILE)
+        self._lock = threading.Lock()
+        self._stamp = _code_stamp()
+        self._entries: Dict[str, Dict[str, Any]] = {}
+        self._dirty = False
+        if fresh:
+            return
+        try:
+            with open(self.path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            if data.get("code") == self._stamp:
+                self._entries = data.get("collectors") or {}
+        except Exception:
+            pass
+
+    def get(self, name: str, fp: str) -> Tuple[bool, Any, str]:
+        """Return (hit, result, status) for a collector's current fingerprint."""
+        with self._lock:
+            entry = self._entries.get(name)
+        if not entry or entry.get("fingerprint") != fp:
+            return False, None, ""
+        return True, entry.get("result"), entry.get("status", "ok")
+
+    def put(self, name: str, fp: str, result: Any, status: str) -> None:
+        with self._lock:
+            self._entries[name] = {"fingerprint": fp, "status": status, "saved": time.time(), "result": result}
+            self._dirty = True
+
+    def save(self) -> None:
+        """Write the cache atomically; failures (read-only home, ...) are ignored."""
+        with self._lock:
+            if not self._dirty:
+                return
+            data = {"code": self._stamp, "collectors": dict(self._entries)}
+            self._dirty = False
+        tmp = f"{self.path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(data, f, separators=(",", ":"))
+            os.replace(tmp, self.path)
+        except Exception:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
@@ -0,0 +1,307 @@
+from __future__ import annotations
+
+import contextlib
+import contextvars
+import os
+import signal
+import subprocess
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass
+from typing import Any, Callable, Dict, Iterator, List, Mapping, Optional, Set, Tuple
+
+from .hostio import HostIO
+from .profile import ScanProfiler, count_nodes
+
+
+# Per-tool timeouts in seconds. Vendor tools and dmidecode talk to firmware or
+# drivers and are the usual suspects when a scan wedges, so keep them short.
+DEFAULT_TOOL_TIMEOUT = 15.0
+DEFAULT_TOOL_TIMEOUTS: Dict[str, float] = {
+    "dmidecode": 5.0,
+    "nvidia-smi": 10.0,
+    "rocm-smi": 10.0,
+    "ethtool": 3.0,
+    "nvme": 5.0,
+}
+
+
+@dataclass(frozen=True)
+class Collector:
+    """An independent unit of collection (one or more tools plus their parsers).
+
+    `run` must not depend on other collectors; it returns a JSON-friendly value
+    that the caller merges into the graph in a fixed order. Returning None
+    means the collector did not apply (e.g. its tool is not installed).
+
+    `fingerprint`, when set, cheaply summarizes the collector's sources (boot
+    id, sysfs listings, tool binaries); while it is unchanged a scan cache may
+    return the previous result instead of running the collector. Collectors
+    reporting volatile data (link state, telemetry) leave it unset.
+    """
+
+    name: str
+    run: Callable[[], Any]
+    fingerprint: Optional[Callable[[], str]] = None
+
+
+class ScanContext:
+    """Budget and process bookkeeping shared by every collector of one scan.
+
+    `deadline` is a scan-wide budget in seconds; each command additionally gets
+    its per-tool timeout, clipped to whatever is left of the budget. Once the
+    budget is spent, running commands are killed and new ones are not started.
+    All host access goes through `io` (live by default; see hostio). With a
+    `profiler`, every command and collector is timed; with a `cache`
+    (collect.cache.ScanCache), fingerprinted collectors reuse earlier results.
+    """
+
+    def __init__(
+        self,
+        deadline: Optional[float] = None,
+        tool_timeouts: Optional[Mapping[str, float]] = None,
+        io: Optional[HostIO] = None,
+        profiler: Optional[ScanProfiler] = None,
+        cache: Optional[Any] = None,
+    ) -> None:
+        self.io = io or HostIO()
+        self.profiler = profiler
+        self.cache = cache
+        # collector name -> fingerprint computed this scan / names served from cache
+        self.fingerprints: Dict[str, str] = {}
+        self.cached: Set[str] = set()
+        self.started = time.monotonic()
+        self.deadline_at = self.started + deadline if deadline is not None else None
+        self.tool_timeouts: Dict[str, float] = dict(DEFAULT_TOOL_TIMEOUTS)
+        if tool_timeouts:
+            self.tool_timeouts.update(tool_timeouts)
+        self._lock = threading.Lock()
+        self._procs: Set[subprocess.Popen] = set()
+        self._expired = False
+        # collector name -> tools that hit their timeout
+        self.timed_out_tools: Dict[str, List[str]] = {}
+        self._memo: Dict[str, Any] = {}
+        self._memo_lock = threading.Lock()
+
+    def remaining(self) -> Optional[float]:
+        if self.deadline_at is None:
+            return None
+        return max(0.0, self.deadline_at - time.monotonic())
+
+    def expired(self) -> bool:
+        return self._expired or self.remaining() == 0.0
+
+    def timeout_for(self, tool: str) -> float:
+        timeout = self.tool_timeouts.get(os.path.basename(tool), DEFAULT_TOOL_TIMEOUT)
+        remaining = self.remaining()
+        return timeout if remaining is None else min(timeout, remaining)
+
+    def memo(self, key: str, fn: Callable[[], Any]) -> Any:
+        """Compute `fn()` once per scan, e.g. a firmware table several collectors read."""
+        with self._memo_lock:
+            if key not in self._memo:
+                self._memo[key] = fn()
+            return self._memo[key]
+
+    def expire(self) -> None:
+        """Stop the scan: kill running commands and refuse to start new ones."""
+        with self._lock:
+            self._expired = True
+            procs = list(self._procs)
+        for proc in procs:
+            _kill(proc)
+
+    def run(self, cmd: List[str]) -> str:
+        """Run a command and return its stdout, or "" on any failure or timeout."""
+        if self.expired():
+            return ""
+        if self.profiler is None:
+            return self.io.run(cmd, self._spawn)
+        info: Dict[str, Any] = {}
+        start = self.profiler.now()
+        out = self.io.run(cmd, lambda c: self._spawn(c, info))
+        self.profiler.command(
+            _collector_name.get(),
+            cmd,
+            start,
+            self.profiler.now() - start,
+            info.get("spawn_s"),
+            info.get("bytes", len(out.encode("utf-8"))),
+            info.get("returncode"),
+        )
+        return out
+
+    def _spawn(self, cmd: List[str], info: Optional[Dict[str, Any]] = None) -> Tuple[str, Optional[int]]:
+        """Run one command; `info` (when given) receives spawn_s, bytes and returncode."""
+        timeout = self.timeout_for(cmd[0])
+        t0 = time.perf_counter()
+        try:
+            # Own process group so a kill also reaches helpers the tool spawned
+            # (which would otherwise keep stdout open and block communicate()).
+            proc = subprocess.Popen(
+                cmd,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                start_new_session=True,
+            )
+        except Exception:
+            return "", None
+        if info is not None:
+            info["spawn_s"] = time.perf_counter() - t0
+        with self._lock:
+            self._procs.add(proc)
+            # expire() may have run between the check above and registration
+            if self._expired:
+                _kill(proc)
+        try:
+            out, _ = proc.communicate(timeout=timeout)
+        except subprocess.TimeoutExpired:
+            _kill(proc)
+            proc.communicate()
+            with self._lock:
+                self.timed_out_tools.setdefault(_collector_name.get(), []).append(cmd[0])
+            return "", None
+        except Exception:
+            _kill(proc)
+            return "", None
+        finally:
+            with self._lock:
+                self._procs.discard(proc)
+        if info is not None:
+            info["bytes"] = len(out.encode("utf-8"))
+            info["returncode"] = proc.returncode
+        return out, proc.returncode
+
+
+def _kill(proc: subprocess.Popen) -> None:
+    try:
+        os.killpg(proc.pid, signal.SIGKILL)
+    except Exception:
+        try:
+            proc.kill()
+        except Exception:
+            pass
+
+
+_current_scan: contextvars.ContextVar[Optional[ScanContext]] = contextvars.ContextVar(
+    "toposcope_scan", default=None
+)
+_collector_name: contextvars.ContextVar[str] = contextvars.ContextVar(
+    "toposcope_collector", default=""
+)
+
+
+def current_scan() -> ScanContext:
+    """The active scan context, or a fresh unbounded one outside of a scan.
+
+    Outside a scan nothing is shared between calls, so memoized host data
+    (SMBIOS, pci.ids) is never held for the life of a long-running process.
+    """
+    return _current_scan.get() or ScanContext()
+
+
+@contextlib.contextmanager
+def use_scan(ctx: ScanContext) -> Iterator[ScanContext]:
+    """Make `ctx` the active scan context for code called outside `run_collectors`."""
+    token = _current_scan.set(ctx)
+    try:
+        yield ctx
+    finally:
+        _current_scan.reset(token)
+
+
+def default_max_workers(count: int) -> int:
+    # Collectors are dominated by subprocess wait time, not CPU, so allow more
+    # threads than cores; cap it to keep the process footprint small.
+    return max(1, min(count, 16, (os.cpu_count() or 1) + 4))
+
+
+def _run_cached(ctx: ScanContext, collector: Collector) -> Any:
+    if ctx.cache is None or collector.fingerprint is None:
+        return collector.run()
+    fp = collector.fingerprint()
+    with ctx._lock:
+        ctx.fingerprints[collector.name] = fp
+    hit, result, _ = ctx.cache.get(collector.name, fp)
+    if hit:
+        with ctx._lock:
+            ctx.cached.add(collector.name)
+        return result
+    return collector.run()
+
+
+def _run_one(ctx: ScanContext, collector: Collector) -> Any:
+    _current_scan.set(ctx)
+    _collector_name.set(collector.name)
+    if ctx.profiler is None:
+        return _run_cached(ctx, collector)
+    start = ctx.profiler.now()
+    result = None
+    try:
+        result = _run_cached(ctx, collector)
+        return result
+    finally:
+        ctx.profiler.collector(collector.name, start, ctx.profiler.now() - start, count_nodes(result))
+
+
+def run_collectors(
+    collectors: List[Collector],
+    max_workers: Optional[int] = None,
+    ctx: Optional[ScanContext] = None,
+) -> Tuple[Dict[str, Any], Dict[str, str]]:
+    """Run collectors concurrently; return (results, status) keyed by name.
+
+    Status is one of "ok", "skipped" (returned None), "cached" (reused from
+    `ctx.cache`), "partial" (a tool hit its timeout), "error" (raised) or
+    "timeout" (missed the scan deadline). Failed and timed-out collectors
+    yield None. Both dicts preserve the order of `collectors` so merging stays
+    deterministic regardless of completion order. Complete ("ok"/"skipped")
+    results of fingerprinted collectors are stored back into the cache.
+    """
+    results: Dict[str, Any] = {}
+    status: Dict[str, str] = {}
+    if not collectors:
+        return results, status
+    ctx = ctx or ScanContext()
+    workers = max_workers if max_workers and max_workers > 0 else default_max_workers(len(collectors))
+
+    pool = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="toposcope")
+    try:
+        futures = [
+            (c.name, pool.submit(contextvars.copy_context().run, _run_one, ctx, c))
+            for c in collectors
+        ]
+        wait([f for _, f in futures], timeout=ctx.remaining())
+        if not all(f.done() for _, f in futures):
+            ctx.expire()
+        for name, fut in futures:
+            if not fut.done():
+                fut.cancel()
+                results[name] = None
+                status[name] = "timeout"
+                continue
+            try:
+                results[name] = fut.result()
+            except Exception:
+                results[name] = None
+                status[name] = "error"
+                continue
+            if name in ctx.cached:
+                status[name] = "cached"
+            elif results[name] is None:
+                status[name] = "skipped"
+            elif ctx.timed_out_tools.get(name):
+                status[name] = "partial"
+            else:
+                status[name] = "ok"
+            if ctx.cache is not None and name in ctx.fingerprints and status[name] in ("ok", "skipped"):
+                ctx.cache.put(name, ctx.fingerprints[name], results[name], status[name])
+    finally:
+        # Do not block on collectors that overran the deadline; their commands
+        # were killed and they will wind down on their own.
+        pool.shutdown(wait=False, cancel_futures=True)
+    if ctx.profiler is not None:
+        ctx.profiler.set_status(status)
+    return results, status
@@ -0,0 +1,276 @@
+from __future__ import annotations
+
+import io
+import json
+import os
+import platform
+import shutil
+import tarfile
+import threading
+import time
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# A spawn function runs a command and returns (stdout, returncode); returncode
+# is None when the command could not be started or was killed on timeout.
+Spawn = Callable[[List[str]], Tuple[str, Optional[int]]]
+
+BUNDLE_VERSION = 1
+
+
+class HostIO:
+    """Every input a collector takes from the host: commands, tool lookup,
+    sysfs/procfs reads and host identity.
+
+    Collectors never touch the host directly, so a scan can be recorded
+    (`RecordingIO`) or rebuilt from a recording without subprocesses
+    (`ReplayIO`). Read helpers return None when a path is missing or unreadable.
+    """
+
+    def run(self, cmd: List[str], spawn: Spawn) -> str:
+        out, rc = spawn(cmd)
+        return out if rc == 0 else ""
+
+    def which(self, cmd: str) -> bool:
+        return shutil.which(cmd) is not None
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        try:
+            with open(path, "rb") as f:
+                return f.read()
+        except Exception:
+            return None
+
+    def read_text(self, path: str) -> Optional[str]:
+        data = self.read_bytes(path)
+        return data.decode("utf-8", "replace") if data is not None else None
+
+    def listdir(self, path: str) -> Optional[List[str]]:
+        try:
+            return sorted(os.listdir(path))
+        except Exception:
+            return None
+
+    def readlink(self, path: str) -> Optional[str]:
+        try:
+            return os.readlink(path)
+        except Exception:
+            return None
+
+    def realpath(self, path: str) -> str:
+        return os.path.realpath(path)
+
+    def isdir(self, path: str) -> bool:
+        return os.path.isdir(path)
+
+    def isfile(self, path: str) -> bool:
+        return os.path.isfile(path)
+
+    def exists(self, path: str) -> bool:
+        return os.path.exists(path)
+
+    # stat() and tool_path() only feed scan-cache fingerprints, which are not
+    # used when recording or replaying, so RecordingIO does not capture them.
+
+    def stat(self, path: str) -> Optional[Tuple[int, int]]:
+        """(mtime_ns, size) of a path, or None."""
+        try:
+            st = os.stat(path)
+        except OSError:
+            return None
+        return st.st_mtime_ns, st.st_size
+
+    def tool_path(self, cmd: str) -> Optional[str]:
+        return shutil.which(cmd)
+
+    def host(self) -> Dict[str, str]:
+        return {
+            "nodename": os.uname().nodename if hasattr(os, "uname") else "Linux",
+            "platform": platform.platform(),
+        }
+
+
+class RecordingIO(HostIO):
+    """Live host access that keeps a copy of everything it returns.
+
+    `save()` writes a tar bundle: manifest.json plus one member per command
+    stdout and per file body. Thread-safe, since collectors run concurrently.
+    """
+
+    def __init__(self) -> None:
+        self._lock = threading.Lock()
+        self.commands: List[Dict[str, Any]] = []
+        self.which_results: Dict[str, bool] = {}
+        # path -> observations, e.g. {"data": b"...", "listdir": [...], "isdir": True}
+        self.fs: Dict[str, Dict[str, Any]] = {}
+        self._host: Optional[Dict[str, str]] = None
+
+    def _note(self, path: str, key: str, value: Any) -> Any:
+        with self._lock:
+            self.fs.setdefault(path, {})[key] = value
+        return value
+
+    def run(self, cmd: List[str], spawn: Spawn) -> str:
+        t0 = time.monotonic()
+        out, rc = spawn(cmd)
+        entry = {"argv": list(cmd), "returncode": rc, "duration_s": time.monotonic() - t0, "stdout": out}
+        with self._lock:
+            self.commands.append(entry)
+        return out if rc == 0 else ""
+
+    def which(self, cmd: str) -> bool:
+        found = super().which(cmd)
+        with self._lock:
+            self.which_results[cmd] = found
+        return found
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        return self._note(path, "data", super().read_bytes(path))
+
+    def listdir(self, path: str) -> Optional[List[str]]:
+        return self._note(path, "listdir", super().listdir(path))
+
+    def readlink(self, path: str) -> Optional[str]:
+        return self._note(path, "readlink", super().readlink(path))
+
+    def realpath(self, path: str) -> str:
+        return self._note(path, "realpath", super().realpath(path))
+
+    def isdir(self, path: str) -> bool:
+        return self._note(path, "isdir", super().isdir(path))
+
+    def isfile(self, path: str) -> bool:
+        return self._note(path, "isfile", super().isfile(path))
+
+    def exists(self, path: str) -> bool:
+        return self._note(path, "exists", super().exists(path))
+
+    def host(self) -> Dict[str, str]:
+        if self._host is None:
+            self._host = super().host()
+        return self._host
+
+    def save(self, path: str) -> None:
+        """Write the recording as a tar bundle (gzip-compressed for *.gz/*.tgz)."""
+        with self._lock:
+            commands = list(self.commands)
+            fs = {p: dict(obs) for p, obs in self.fs.items()}
+        manifest: Dict[str, Any] = {
+            "version": BUNDLE_VERSION,
+            "host": self.host(),
+            "which": dict(self.which_results),
+            "commands": [],
+            "fs": {},
+        }
+        members: List[Tuple[str, bytes]] = []
+        for i, entry in enumerate(commands):
+            name = f"commands/{i:04d}.out"
+            members.append((name, entry["stdout"].encode("utf-8")))
+            manifest["commands"].append({
+                "argv": entry["argv"],
+                "returncode": entry["returncode"],
+                "duration_s": round(entry["duration_s"], 6),
+                "stdout": name,
+            })
+        for i, (fpath, obs) in enumerate(sorted(fs.items())):
+            rec = {k: v for k, v in obs.items() if k != "data"}
+            if "data" in obs:
+                if obs["data"] is None:
+                    rec["data"] = None
+                else:
+                    name = f"files/{i:05d}"
+                    members.append((name, obs["data"]))
+                    rec["data"] = name
+            manifest["fs"][fpath] = rec
+        mode = "w:gz" if path.endswith((".gz", ".tgz")) else "w"
+        with tarfile.open(path, mode) as tar:
+            _add_member(tar, "manifest.json", json.dumps(manifest, indent=1).encode("utf-8"))
+            for name, data in members:
+                _add_member(tar, name, data)
+
+
+def _add_member(tar: tarfile.TarFile, name: str, data: bytes) -> None:
+    info = tarfile.TarInfo(name)
+    info.size = len(data)
+    info.mtime = int(time.time())
+    tar.addfile(info, io.BytesIO(data))
+
+
+class ReplayIO(HostIO):
+    """Answers every host query from a bundle written by `RecordingIO.save`.
+
+    No subprocess is spawned and the live filesystem is never consulted;
+    anything not in the recording behaves as absent. With `realtime`, commands
+    sleep for their recorded duration to reproduce slow scans.
+    """
+
+    def __init__(self, path: str, realtime: bool = False) -> None:
+        self.realtime = realtime
+        with tarfile.open(path, "r:*") as tar:
+            blobs: Dict[str, bytes] = {}
+            for member in tar.getmembers():
+                if member.isfile():
+                    f = tar.extractfile(member)
+                    if f is not None:
+                        blobs[member.name] = f.read()
+        manifest = json.loads(blobs["manifest.json"].decode("utf-8"))
+        if manifest.get("version") != BUNDLE_VERSION:
+            raise ValueError(f"unsupported bundle version: {manifest.get('version')}")
+        self._host: Dict[str, str] = manifest.get("host") or {}
+        self._which: Dict[str, bool] = manifest.get("which") or {}
+        self._commands: Dict[Tuple[str, ...], Dict[str, Any]] = {}
+        for entry in manifest.get("commands") or []:
+            self._commands[tuple(entry["argv"])] = {
+                "stdout": blobs.get(entry["stdout"], b"").decode("utf-8"),
+                "returncode": entry.get("returncode"),
+                "duration_s": entry.get("duration_s") or 0.0,
+            }
+        self._fs: Dict[str, Dict[str, Any]] = {}
+        for fpath, rec in (manifest.get("fs") or {}).items():
+            obs = dict(rec)
+            if rec.get("data") is not None:
+                obs["data"] = blobs.get(rec["data"])
+            self._fs[fpath] = obs
+
+    def run(self, cmd: List[str], spawn: Spawn) -> str:
+        entry = self._commands.get(tuple(cmd))
+        if entry is None:
+            return ""
+        if self.realtime and entry["duration_s"]:
+            time.sleep(entry["duration_s"])
+        return entry["stdout"] if entry["returncode"] == 0 else ""
+
+    def which(self, cmd: str) -> bool:
+        return bool(self._which.get(cmd, False))
+
+    def _get(self, path: str, key: str, default: Any) -> Any:
+        return self._fs.get(path, {}).get(key, default)
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        return self._get(path, "data", None)
+
+    def listdir(self, path: str) -> Optional[List[str]]:
+        return self._get(path, "listdir", None)
+
+    def readlink(self, path: str) -> Optional[str]:
+        return self._get(path, "readlink", None)
+
+    def realpath(self, path: str) -> str:
+        return self._get(path, "realpath", path)
+
+    def isdir(self, path: str) -> bool:
+        return bool(self._get(path, "isdir", False))
+
+    def isfile(self, path: str) -> bool:
+        return bool(self._get(path, "isfile", False))
+
+    def exists(self, path: str) -> bool:
+        return bool(self._get(path, "exists", False))
+
+    def stat(self, path: str) -> Optional[Tuple[int, int]]:
+        return None
+
+    def tool_path(self, cmd: str) -> Optional[str]:
+        return None
+
+    def host(self) -> Dict[str, str]:
+        return dict(self._host)
@@ -1,26 +1,41 @@
 from __future__ import annotations
 
+import functools
 import json
 import os
-import platform
 import re
-import shutil
-import subprocess
-from typing import List, Tuple, Optional, Dict
-
-from ..model import Edge, Graph, Node
+import time
+from typing import List, Mapping, Tuple, Optional, Dict
+
+from ..demo import generate_demo_graph  # noqa: F401  (re-exported)
+from ..model import Edge, EdgeRecord, Graph, HardwareGraph, Node, NodeRecord, Telemetry
+from .cache import ScanCache, fingerprint
+from .engine import Collector, ScanContext, current_scan, run_collectors
+from .hostio import HostIO
+from .pciids import PCI_IDS_PATHS, PciIds, find_pci_ids, pci_class_name
+from .profile import ScanProfiler
+from .smbios import (
+    SmbiosStructure,
+    decode_memory_arrays,
+    decode_memory_devices,
+    decode_processors,
+    decode_system,
+    read_smbios,
+)
+
+
+def _io() -> HostIO:
+    # All host access goes through the scan's HostIO so scans can be recorded/replayed
+    return current_scan().io
 
 
 def _which(cmd: str) -> bool:
-    return shutil.which(cmd) is not None
+    return _io().which(cmd)
 
 
 def _run(cmd: List[str]) -> str:
-    try:
-        out = subprocess.check_output(cmd, stderr=subprocess.DEVNULL, text=True)
-        return out
-    except Exception:
-        return ""
+    # Timeouts, the scan deadline and process cleanup live in the scan context
+    return current_scan().run(cmd)
 
 
 def _parse_lspci_mm(output: str) -> List[Node]:
@@ -360,15 +375,6 @@ def _parse_lscpu_json(output: str) -> List[Node]:
             virtualization = entries.get("Virtualization")
             hypervisor = entries.get("Hypervisor vendor")
 
-            # Derive base_mhz from dmidecode Max/Current (treat as base, not turbo)
-            base_mhz = None
-            if _which("dmidecode"):
-                dmi_out = _run(["dmidecode", "-t", "processor"]) 
-                dmi_cur, dmi_max = _parse_dmidecode_processor(dmi_out)
-                base_mhz = dmi_max or dmi_cur
-                # CPU serial if exposed by BIOS
-                dmi_fields = _parse_dmidecode_processor_fields(dmi_out)
-
             node: Node = {
                 "id": "cpu:0",
                 "kind": "cpu",
@@ -383,7 +389,6 @@ def _parse_lscpu_json(output: str) -> List[Node]:
                     **({"stepping": str(stepping)} if stepping else {}),
                     **({"min_mhz": str(min_mhz)} if min_mhz else {}),
                     **({"max_mhz": str(max_mhz)} if max_mhz else {}),
-                    **({"base_mhz": str(base_mhz)} if base_mhz else {}),
                     **({"l1d_cache": str(l1d)} if l1d else {}),
                     **({"l1i_cache": str(l1i)} if l1i else {}),
                     **({"l2_cache": str(l2)} if l2 else {}),
@@ -394,7 +399,6 @@ def _parse_lscpu_json(output: str) -> List[Node]:
                     **({"address_sizes": str(address_sizes)} if address_sizes else {}),
                     **({"virtualization": str(virtualization)} if virtualization else {}),
                     **({"hypervisor": str(hypervisor)} if hypervisor else {}),
-                    **({"serial": dmi_fields.get("serial")} if 'dmi_fields' in locals() and dmi_fields.get("serial") else {}),
                 },
             }
             nodes.append(node)
@@ -449,6 +453,36 @@ def _parse_dmidecode_processor_fields(output: str) -> Dict[str, Optional[str]]:
     return result
 
 
+def _smbios() -> Optional[List[SmbiosStructure]]:
+    # One read of the firmware table per scan, shared by the CPU, memory and
+    # system collectors
+    return current_scan().memo("smbios", lambda: read_smbios(_io()))
+
+
+def _cpu_firmware_fields() -> Tuple[Optional[str], Optional[str]]:
+    """Return (base_mhz, serial) from SMBIOS type 4, else from `dmidecode -t processor`."""
+    structs = _smbios()
+    if structs is not None:
+        base_mhz: Optional[str] = None
+        serial: Optional[str] = None
+        for proc in decode_processors(structs):
+            if proc.get("Populated") == "no":
+                continue
+            speed = proc.get("Max Speed") or proc.get("Current Speed") or ""
+            if base_mhz is None and speed:
+                base_mhz = speed.split()[0]
+            val = proc.get("Serial Number", "")
+            if val and val.lower() not in ("not specified", "unknown", "n/a"):
+                serial = val
+        return base_mhz, serial
+    if _which("dmidecode"):
+        dmi_out = _run(["dmidecode", "-t", "processor"])
+        dmi_cur, dmi_max = _parse_dmidecode_processor(dmi_out)
+        # CPU serial if exposed by BIOS
+        return dmi_max or dmi_cur, _parse_dmidecode_processor_fields(dmi_out).get("serial")
+    return None, None
+
+
 def _collect_numa_nodes() -> List[Node]:
     """Collect NUMA nodes from sysfs; fallback to numactl if needed.
 
@@ -456,33 +490,28 @@ def _collect_numa_nodes() -> List[Node]:
     """
     nodes: List[Node] = []
     base = "/sys/devices/system/node"
+    io = _io()
     try:
-        import os
-        if os.path.isdir(base):
-            for name in sorted(os.listdir(base)):
+        if io.isdir(base):
+            for name in io.listdir(base) or []:
                 if not name.startswith("node"):
                     continue
                 path = os.path.join(base, name)
-                try:
-                    with open(os.path.join(path, "cpulist"), "r", encoding="utf-8") as f:
-                        cpulist = f.read().strip()
-                except Exception:
-                    cpulist = ""
+                cpulist = _read_sysfs(os.path.join(path, "cpulist"))
                 mem_total_gb = ""
                 try:
-                    with open(os.path.join(path, "meminfo"), "r", encoding="utf-8") as f:
-                        for line in f:
-                            if line.startswith("Node") and "MemTotal" in line:
-                                parts = line.split()
-                                # ... MemTotal: <value> kB
-                                for i, tok in enumerate(parts):
-                                    if tok == "MemTotal:" and i + 1 < len(parts):
-                                        try:
-                                            kb = float(parts[i + 1])
-                                            mem_total_gb = f"{kb / 1024.0 / 1024.0:.1f}"
-                                        except Exception:
-                                            pass
-                                break
+                    for line in (io.read_text(os.path.join(path, "meminfo")) or "").splitlines():
+                        if line.startswith("Node") and "MemTotal" in line:
+                            parts = line.split()
+                            # ... MemTotal: <value> kB
+                            for i, tok in enumerate(parts):
+                                if tok == "MemTotal:" and i + 1 < len(parts):
+                                    try:
+                                        kb = float(parts[i + 1])
+                                        mem_total_gb = f"{kb / 1024.0 / 1024.0:.1f}"
+                                    except Exception:
+                                        pass
+                            break
                 except Exception:
                     pass
                 node: Node = {
@@ -542,14 +571,25 @@ def _parse_dmidecode_memory(output: str) -> List[Node]:
 
     if current.get("__kind__") == "Memory Device":
         devices.append(current)
+    return _dimm_nodes(devices)
+
 
+def _dimm_nodes(devices: List[Dict[str, str]]) -> List[Node]:
+    """Build DIMM nodes from dmidecode-style memory device dicts (empty slots skipped)."""
     nodes: List[Node] = []
+    seen: set = set()
     idx = 0
     for dev in devices:
         size = dev.get("Size", "")
         if not size or size.lower().startswith("no module"):
             continue
         locator = dev.get("Locator") or dev.get("Bank Locator") or f"DIMM-{idx}"
+        # Some boards repeat locators per socket; qualify with the bank to keep ids unique
+        if locator in seen and dev.get("Bank Locator"):
+            locator = f"{dev['Bank Locator']}/{locator}"
+        if locator in seen:
+            locator = f"{locator}#{idx}"
+        seen.add(locator)
         dtype = dev.get("Type", "?")
         # Prefer configured speed; fall back to reported/max
         speed = (
@@ -595,37 +635,72 @@ def _parse_dmidecode_memory(output: str) -> List[Node]:
     return nodes
 
 
-def collect_linux_hardware_graph() -> Graph:
+# lscpu properties listed before base_mhz, which joins them from firmware
+_CPU_FREQUENCY_AND_BEFORE = (
+    "sockets",
+    "cores_per_socket",
+    "threads_per_core",
+    "vendor_id",
+    "family",
+    "model",
+    "stepping",
+    "min_mhz",
+    "max_mhz",
+)
+
+
+def _add_cpu_firmware_fields(node: Node, base_mhz: Optional[str], serial: Optional[str]) -> None:
+    props = node.setdefault("properties", {})
+    if base_mhz:
+        items = list(props.items())
+        at = sum(1 for k, _ in items if k in _CPU_FREQUENCY_AND_BEFORE)
+        node["properties"] = props = dict(items[:at] + [("base_mhz", str(base_mhz))] + items[at:])
+    if serial:
+        props["serial"] = serial
+
+
+def _collect_cpu() -> Optional[Graph]:
+    """CPU summary from lscpu (+ dmidecode) with NUMA nodes linked beneath it."""
+    if not _which("lscpu"):
+        return None
     nodes: List[Node] = []
     edges: List[Edge] = []
+    cpu_nodes = _parse_lscpu_json(_run(["lscpu", "-J"]))
+    if cpu_nodes:
+        # Derive base_mhz from SMBIOS/dmidecode Max/Current (treat as base, not turbo)
+        _add_cpu_firmware_fields(cpu_nodes[0], *_cpu_firmware_fields())
+    for n in cpu_nodes:
+        nodes.append(n)
+        edges.append({"id": f"e:root->{n['id']}", "source": "root", "target": n["id"], "kind": "contains", "label": "contains"})
+    # NUMA nodes linked under CPU if present
+    if cpu_nodes:
+        numa_nodes = _collect_numa_nodes()
+        for nn in numa_nodes:
+            nodes.append(nn)
+            edges.append({"id": f"e:{cpu_nodes[0]['id']}->{nn['id']}", "source": cpu_nodes[0]["id"], "target": nn["id"], "kind": "contains", "label": "numa"})
+    return {"nodes": nodes, "edges": edges}
 
-    # Root
-    root: Node = {
-        "id": "root",
-        "kind": "system",
-        "label": os.uname().nodename if hasattr(os, "uname") else "Linux",
-        "properties": {"os": platform.platform()},
-    }
-    nodes.append(root)
-
-    # CPU
-    if _which("lscpu"):
-        cpu_nodes = _parse_lscpu_json(_run(["lscpu", "-J"]))
-        for n in cpu_nodes:
-            nodes.append(n)
-            edges.append({"id": f"e:{root['id']}->{n['id']}", "source": root["id"], "target": n["id"], "kind": "contains", "label": "contains"})
-        # NUMA nodes linked under CPU if present
-        if cpu_nodes:
-            numa_nodes = _collect_numa_nodes()
-            for nn in numa_nodes:
-                nodes.append(nn)
-                edges.append({"id": f"e:{cpu_nodes[0]['id']}->{nn['id']}", "source": cpu_nodes[0]["id"], "target": nn["id"], "kind": "contains", "label": "numa"})
-
-    # Memory summary and DIMMs
-    mem_root: Optional[Node] = None
+
+def _collect_memory() -> Graph:
+    """Memory summary and DIMMs (SMBIOS or dmidecode when permitted, else /proc/meminfo)."""
+    nodes: List[Node] = []
+    edges: List[Edge] = []
     dimm_nodes: List[Node] = []
-    # Try dmidecode for per-DIMM info (may require root)
-    if _which("dmidecode"):
+    mem_props: Dict[str, str] = {}
+    # Per-DIMM info needs root either way: the raw SMBIOS table is read
+    # directly when accessible, dmidecode is the fallback
+    structs = _smbios()
+    if structs is not None:
+        dimm_nodes = _dimm_nodes(decode_memory_devices(structs))
+        arrays = decode_memory_arrays(structs)
+        if arrays:
+            ecc = arrays[0].get("Error Correction Type")
+            if ecc:
+                mem_props["ecc"] = ecc
+            slots = sum(int(a.get("Number Of Devices") or 0) for a in arrays)
+            if slots:
+                mem_props["slots"] = str(slots)
+    elif _which("dmidecode"):
         dimm_nodes = _parse_dmidecode_memory(_run(["dmidecode", "-t", "memory"]))
     total_gb: Optional[float] = None
     if dimm_nodes:
@@ -639,368 +714,906 @@ def collect_linux_hardware_graph() -> Graph:
         if total_kb:
             total_gb = round(total_kb / 1024.0 / 1024.0, 1)
 
-    mem_root = {
+    mem_root: Node = {
         "id": "bus:memory",
         "kind": "memory",
         "label": "Memory",
-        "properties": {"total_gb": f"{total_gb:.1f}" if total_gb is not None else ""},
+        "properties": {"total_gb": f"{total_gb:.1f}" if total_gb is not None else "", **mem_props},
     }
     nodes.append(mem_root)
-    edges.append({"id": f"e:{root['id']}->bus:memory", "source": root["id"], "target": "bus:memory", "kind": "contains", "label": "contains"})
+    edges.append({"id": "e:root->bus:memory", "source": "root", "target": "bus:memory", "kind": "contains", "label": "contains"})
     for n in dimm_nodes:
         nodes.append(n)
         edges.append({"id": f"e:bus:memory->{n['id']}", "source": "bus:memory", "target": n["id"], "kind": "contains", "label": "dimm"})
+    return {"nodes": nodes, "edges": edges}
+
+
+# Class names (as printed by lspci) that mark a device as a GPU/accelerator
+_GPU_CLASS_HINTS = ["vga", "3d controller", "display controller", "processing accelerators", "accelerator", "co-processor"]
+
+SYSFS_PCI_DEVICES = "/sys/bus/pci/devices"
+
+
+def _read_sysfs(path: str) -> str:
+    """Read a sysfs attribute, returning "" when missing or unreadable."""
+    return (_io().read_text(path) or "").strip()
 
-    # PCI devices (enriched)
-    if _which("lspci"):
-        vmm = _parse_lspci_vmm(_run(["lspci", "-Dvmmnnk"]))
-        vv_links = _parse_lspci_vv_links(_run(["lspci", "-vv"]))
-        pci_root: Node = {
-            "id": "bus:pci",
-            "kind": "bus",
-            "label": "PCI Bus",
-            "properties": {},
+
+def _sysfs_link_name(path: str) -> str:
+    """Basename of a sysfs symlink target (e.g. driver, iommu_group), or ""."""
+    target = _io().readlink(path)
+    return os.path.basename(target) if target else ""
+
+
+def _pci_ids() -> Optional[PciIds]:
+    return current_scan().memo("pci_ids", lambda: find_pci_ids(_io()))
+
+
+def _has_pci() -> bool:
+    return _io().isdir(SYSFS_PCI_DEVICES) or _which("lspci")
+
+
+def _pci_fragment(devices: List[Tuple[str, str, str, Dict[str, str]]]) -> Graph:
+    """Build the PCI bus fragment from (slot, class, label, properties) tuples."""
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    pci_root: Node = {
+        "id": "bus:pci",
+        "kind": "bus",
+        "label": "PCI Bus",
+        "properties": {},
+    }
+    nodes.append(pci_root)
+    edges.append({"id": "e:root->bus:pci", "source": "root", "target": "bus:pci", "kind": "contains", "label": "contains"})
+    for slot, cls, label, props in devices:
+        kind = "pci-device"
+        cls_l = cls.lower()
+        if any(k in cls_l for k in _GPU_CLASS_HINTS):
+            kind = "gpu-device"
+        node: Node = {
+            "id": f"pci:{slot}",
+            "kind": kind,
+            "label": label or slot,
+            "properties": props,
         }
-        nodes.append(pci_root)
-        edges.append({"id": f"e:{root['id']}->bus:pci", "source": root["id"], "target": "bus:pci", "kind": "contains", "label": "contains"})
-        created_pci_nodes: Dict[str, Node] = {}
-        for dev in vmm:
-            slot = dev.get("Slot") or "?"
-            cls = dev.get("Class") or dev.get("ClassName") or ""
-            vendor = dev.get("Vendor", "").split(" [")[0]
-            device = dev.get("Device", "").split(" [")[0]
-            vid = dev.get("VendorId", "")
-            did = dev.get("DeviceId", "")
-            props: Dict[str, str] = {
-                "class": cls,
-                "address": slot,
-            }
-            if vid:
-                props["vendor_id"] = vid
-            if did:
-                props["device_id"] = did
-            link = vv_links.get(slot)
-            if link:
-                props.update(link)
-            kind = "pci-device"
-            cls_l = cls.lower()
-            if any(k in cls_l for k in ["vga", "3d controller", "display controller", "processing accelerators", "accelerator", "co-processor"]):
-                kind = "gpu-device"
-            node: Node = {
-                "id": f"pci:{slot}",
-                "kind": kind,
-                "label": f"{vendor} {device}".strip() or slot,
-                "properties": props,
-            }
-            nodes.append(node)
-            edges.append({"id": f"e:bus:pci->pci:{slot}", "source": "bus:pci", "target": f"pci:{slot}", "kind": "contains", "label": "device"})
-            created_pci_nodes[slot] = node
-            m_tail = re.search(r"([0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])$", slot)
-            if m_tail:
-                created_pci_nodes[m_tail.group(1)] = node
-
-        # NVIDIA enrichment via nvidia-smi (maps by PCI bus id)
-        if _which("nvidia-smi") and created_pci_nodes:
-            out = _run([
-                "nvidia-smi",
-                "--query-gpu=pci.bus_id,name,driver_version,memory.total,temperature.gpu,power.draw,power.limit,utilization.gpu,serial,uuid,vbios_version",
-                "--format=csv,noheader,nounits",
-            ])
-            if out:
-                for line in out.splitlines():
-                    parts = [p.strip() for p in line.split(",")]
-                    if len(parts) < 2:
-                        continue
-                    bus_id = parts[0]
-                    # Expect forms like 00000000:01:00.0 or 0000:65:00.0
-                    m_tail = re.search(r"([0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])$", bus_id)
-                    m_full = re.search(r"([0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])", bus_id)
-                    node = None
-                    if m_tail:
-                        node = created_pci_nodes.get(m_tail.group(1))
-                    if node is None and m_full:
-                        node = created_pci_nodes.get(m_full.group(1))
-                    if node is None:
-                        continue
-                    if not node:
-                        continue
-                    name = parts[1] if len(parts) > 1 else ""
-                    driver = parts[2] if len(parts) > 2 else ""
-                    vram_mb = parts[3] if len(parts) > 3 else ""
-                    temp_c = parts[4] if len(parts) > 4 else ""
-                    power_w = parts[5] if len(parts) > 5 else ""
-                    power_cap = parts[6] if len(parts) > 6 else ""
-                    util_gpu = parts[7] if len(parts) > 7 else ""
-                    serial = parts[8] if len(parts) > 8 else ""
-                    uuid = parts[9] if len(parts) > 9 else ""
-                    vbios = parts[10] if len(parts) > 10 else ""
-                    node["kind"] = "gpu-device"
-                    if name:
-                        node["label"] = name
-                    p = node.setdefault("properties", {})
-                    if driver:
-                        p["driver"] = driver
-                        p["driver_version"] = driver
-                    if vram_mb:
-                        p["vram_mb"] = vram_mb
-                    if temp_c:
-                        p["temperature_c"] = temp_c
-                    if power_w:
-                        p["power_w"] = power_w
-                    if power_cap:
-                        p["power_cap_w"] = power_cap
-                    if util_gpu:
-                        p["utilization_gpu_pct"] = util_gpu
-                    if serial:
-                        p["serial"] = serial
-                    elif uuid:
-                        p["uuid"] = uuid
-                    if vbios:
-                        p["vbios_version"] = vbios
-
-        # AMD ROCm enrichment via rocm-smi JSON
-        def _parse_rocm_smi_json(output: str) -> List[Dict[str, str]]:
-            devices: List[Dict[str, str]] = []
-            if not output:
-                return devices
+        nodes.append(node)
+        edges.append({"id": f"e:bus:pci->pci:{slot}", "source": "bus:pci", "target": f"pci:{slot}", "kind": "contains", "label": "device"})
+    return {"nodes": nodes, "edges": edges}
+
+
+def _pcie_speed(value: str) -> str:
+    """Normalize sysfs '8.0 GT/s PCIe' to lspci's '8GT/s'; "" if unknown."""
+    m = re.match(r"^([0-9.]+)\s*GT/s", value)
+    if not m:
+        return ""
+    num = m.group(1)
+    if num.endswith(".0"):
+        num = num[:-2]
+    return f"{num}GT/s"
+
+
+def _collect_pci_sysfs() -> Optional[Graph]:
+    """PCI bus and devices read directly from /sys/bus/pci/devices (no subprocesses)."""
+    slots = _io().listdir(SYSFS_PCI_DEVICES)
+    if not slots:
+        return None
+    ids = _pci_ids()
+    devices: List[Tuple[str, str, str, Dict[str, str]]] = []
+    for slot in slots:
+        path = os.path.join(SYSFS_PCI_DEVICES, slot)
+        vid = _read_sysfs(os.path.join(path, "vendor")).lower().replace("0x", "")
+        did = _read_sysfs(os.path.join(path, "device")).lower().replace("0x", "")
+        class_code = _read_sysfs(os.path.join(path, "class")).lower().replace("0x", "")
+        vendor = (ids.vendor_name(vid) if ids and vid else None) or ""
+        device = (ids.device_name(vid, did) if ids and vid and did else None) or ""
+        if vendor and not device and did:
+            device = f"Device {did}"  # as lspci prints unknown devices
+        cls = ""
+        if class_code:
+            cls_name = pci_class_name(class_code, ids)
+            cls = f"{cls_name} [{class_code[:4]}]" if cls_name else f"Class [{class_code[:4]}]"
+        props: Dict[str, str] = {
+            "class": cls,
+            "address": slot,
+        }
+        if vid:
+            props["vendor_id"] = vid
+        if did:
+            props["device_id"] = did
+        speed = _pcie_speed(_read_sysfs(os.path.join(path, "current_link_speed")))
+        width = _read_sysfs(os.path.join(path, "current_link_width"))
+        max_speed = _pcie_speed(_read_sysfs(os.path.join(path, "max_link_speed")))
+        max_width = _read_sysfs(os.path.join(path, "max_link_width"))
+        if speed:
+            props["pcie_speed"] = speed
+        if width.isdigit() and width != "0":
+            props["pcie_width"] = f"x{width}"
+        if max_speed:
+            props["pcie_max_speed"] = max_speed
+        if max_width.isdigit() and max_width != "0":
+            props["pcie_max_width"] = f"x{max_width}"
+        numa = _read_sysfs(os.path.join(path, "numa_node"))
+        if numa and numa != "-1":
+            props["numa_node"] = numa
+        iommu_group = _sysfs_link_name(os.path.join(path, "iommu_group"))
+        if iommu_group:
+            props["iommu_group"] = iommu_group
+        driver = _sysfs_link_name(os.path.join(path, "driver"))
+        if driver:
+            props["driver"] = driver
+        numvfs = _read_sysfs(os.path.join(path, "sriov_numvfs"))
+        if numvfs:
+            props["sriov_numvfs"] = numvfs
+        physfn = _sysfs_link_name(os.path.join(path, "physfn"))
+        if physfn:
+            props["physfn"] = physfn
+        label = f"{vendor} {device}".strip() or (f"PCI device {vid}:{did}" if vid and did else slot)
+        devices.append((slot, cls, label, props))
+    return _pci_fragment(devices)
+
+
+def _collect_pci_lspci() -> Optional[Graph]:
+    """PCI bus and devices from `lspci -Dvmmnnk` enriched with `lspci -vv` links."""
+    if not _which("lspci"):
+        return None
+    vmm = _parse_lspci_vmm(_run(["lspci", "-Dvmmnnk"]))
+    vv_links = _parse_lspci_vv_links(_run(["lspci", "-vv"]))
+    devices: List[Tuple[str, str, str, Dict[str, str]]] = []
+    for dev in vmm:
+        slot = dev.get("Slot") or "?"
+        cls = dev.get("Class") or dev.get("ClassName") or ""
+        vendor = dev.get("Vendor", "").split(" [")[0]
+        device = dev.get("Device", "").split(" [")[0]
+        vid = dev.get("VendorId", "")
+        did = dev.get("DeviceId", "")
+        props: Dict[str, str] = {
+            "class": cls,
+            "address": slot,
+        }
+        if vid:
+            props["vendor_id"] = vid
+        if did:
+            props["device_id"] = did
+        if dev.get("Driver"):
+            props["driver"] = dev["Driver"]
+        # `lspci -vv` prints slots without the PCI domain
+        link = vv_links.get(slot) or vv_links.get(slot[5:] if len(slot) > 7 and slot[4] == ":" else slot)
+        if link:
+            props.update(link)
+        devices.append((slot, cls, f"{vendor} {device}".strip(), props))
+    return _pci_fragment(devices)
+
+
+def _collect_pci() -> Optional[Graph]:
+    """PCI inventory from sysfs; lspci is only spawned when sysfs is unavailable."""
+    return _collect_pci_sysfs() or _collect_pci_lspci()
+
+
+_BUS_ID_RE = re.compile(r"(?:([0-9a-fA-F]{4,8}):)?([0-9a-fA-F]{2}):([0-9a-fA-F]{2})\.([0-7])$")
+
+
+def _pci_node_id(bus_id: str) -> Optional[str]:
+    """Normalize a tool's PCI bus id to our node id ("pci:dddd:bb:dd.f").
+
+    nvidia-smi reports an 8-digit uppercase domain ("00000000:3B:00.0"),
+    rocm-smi a 4-digit one; a missing domain means domain 0.
+    """
+    m = _BUS_ID_RE.search(bus_id.strip())
+    if not m:
+        return None
+    domain = int(m.group(1) or "0", 16)
+    return f"pci:{domain:04x}:{m.group(2).lower()}:{m.group(3).lower()}.{m.group(4)}"
+
+
+NVIDIA_INVENTORY_FIELDS = "pci.bus_id,name,driver_version,memory.total,power.limit,serial,uuid,vbios_version"
+NVIDIA_TELEMETRY_FIELDS = "pci.bus_id,temperature.gpu,power.draw,utilization.gpu"
+
+
+# Reading keys shared by the NVIDIA and AMD telemetry paths
+GPU_TELEMETRY_KEYS = ("temperature_c", "power_w", "utilization_gpu_pct")
+
+
+def _parse_nvidia_csv_line(line: str) -> Optional[List[str]]:
+    # nvidia-smi prints "[N/A]" / "[Not Supported]" for fields a board lacks
+    parts = ["" if p.strip().startswith("[") else p.strip() for p in line.split(",")]
+    return parts if len(parts) >= 2 else None
+
+
+def _parse_nvidia_telemetry_line(line: str) -> Optional[Tuple[str, Dict[str, str]]]:
+    """(node id, readings) from one NVIDIA_TELEMETRY_FIELDS CSV line."""
+    parts = _parse_nvidia_csv_line(line)
+    node_id = _pci_node_id(parts[0]) if parts else None
+    if not parts or not node_id:
+        return None
+    values = dict(zip(GPU_TELEMETRY_KEYS, parts[1:4]))
+    return node_id, {k: v for k, v in values.items() if v}
+
+
+def _nvidia_query(fields: str) -> List[List[str]]:
+    out = _run(["nvidia-smi", f"--query-gpu={fields}", "--format=csv,noheader,nounits"])
+    rows: List[List[str]] = []
+    for line in out.splitlines():
+        parts = _parse_nvidia_csv_line(line)
+        if parts:
+            rows.append(parts)
+    return rows
+
+
+def _collect_nvidia_smi() -> Optional[List[List[str]]]:
+    """Raw `nvidia-smi --query-gpu` inventory rows; applied to PCI nodes by `_apply_nvidia_smi`."""
+    if not (_which("nvidia-smi") and _has_pci()):
+        return None
+    return _nvidia_query(NVIDIA_INVENTORY_FIELDS)
+
+
+def _apply_nvidia_smi(graph: HardwareGraph, rows: List[List[str]]) -> None:
+    # NVIDIA enrichment via nvidia-smi (maps by PCI bus id)
+    for parts in rows:
+        node_id = _pci_node_id(parts[0])
+        node = graph.node(node_id) if node_id else None
+        if node is None:
+            continue
+        name = parts[1] if len(parts) > 1 else ""
+        driver = parts[2] if len(parts) > 2 else ""
+        vram_mb = parts[3] if len(parts) > 3 else ""
+        power_cap = parts[4] if len(parts) > 4 else ""
+        serial = parts[5] if len(parts) > 5 else ""
+        uuid = parts[6] if len(parts) > 6 else ""
+        vbios = parts[7] if len(parts) > 7 else ""
+        graph.set_kind(node.id, "gpu-device")
+        if name:
+            node.label = name
+        if node.properties is None:
+            node.properties = {}
+        p = node.properties
+        if driver:
+            p["driver"] = driver
+            p["driver_version"] = driver
+        if vram_mb:
+            p["vram_mb"] = vram_mb
+        if power_cap:
+            p["power_cap_w"] = power_cap
+        if serial:
+            p["serial"] = serial
+        elif uuid:
+            p["uuid"] = uuid
+        if vbios:
+            p["vbios_version"] = vbios
+
+
+def _collect_nvidia_telemetry() -> Optional[Dict[str, Dict[str, str]]]:
+    """Temperature, power draw and utilization per GPU, keyed by PCI node id."""
+    if not (_which("nvidia-smi") and _has_pci()):
+        return None
+    out = _run(["nvidia-smi", f"--query-gpu={NVIDIA_TELEMETRY_FIELDS}", "--format=csv,noheader,nounits"])
+    readings: Dict[str, Dict[str, str]] = {}
+    for line in out.splitlines():
+        parsed = _parse_nvidia_telemetry_line(line)
+        if parsed:
+            readings[parsed[0]] = parsed[1]
+    return readings
+
+
+def _parse_rocm_smi_json(output: str) -> List[Dict[str, str]]:
+    devices: List[Dict[str, str]] = []
+    if not output:
+        return devices
+    try:
+        data = json.loads(output)
+    except Exception:
+        return devices
+    # rocm-smi -a --json often returns a dict of cards {"card0": {...}, ...}
+    if isinstance(data, dict):
+        items = data.items()
+    elif isinstance(data, list):
+        # some versions might return a list
+        items = [(str(i), v) for i, v in enumerate(data)]
+    else:
+        items = []
+    for _, info in items:
+        if not isinstance(info, dict):
+            continue
+        # flatten nested dicts into a single-level map of key->value strings
+        flat: Dict[str, str] = {}
+        def walk(prefix: str, obj: Dict[str, object]):
+            for k, v in obj.items():
+                key = f"{prefix}{k}" if not prefix else f"{prefix}.{k}"
+                if isinstance(v, dict):
+                    walk(key, v)
+                else:
+                    flat[key] = str(v)
+        walk("", info)
+        # heuristic extraction
+        def find_key(substrs: List[str]) -> Optional[str]:
+            # return the first match scanning keys in sorted order for stability
+            for k in sorted(flat.keys()):
+                lk = k.lower()
+                if all(s in lk for s in substrs):
+                    return flat[k]
+            return None
+
+        # Identify PCI BDF as precisely as possible
+        bdf = (
+            find_key(["pci bus"]) or
+            find_key(["pcie", "bus"]) or
+            find_key(["bdf"]) or
+            find_key(["pci", "bus"]) or
+            ""
+        )
+        # Prefer product/series/name over hex model code
+        name = (
+            find_key(["device name"]) or
+            find_key(["card series"]) or
+            find_key(["product"]) or
+            find_key(["name"]) or
+            find_key(["card model"]) or
+            ""
+        )
+        driver = find_key(["driver version"]) or ""
+
+        # Prefer hotspot/core temperature then memory
+        temp_c = (
+            find_key(["temperature_hotspot", "c"]) or
+            find_key(["temperature (sensor junction)", "c"]) or
+            find_key(["temperature (sensor memory)", "c"]) or
+            find_key(["temperature", "c"]) or
+            ""
+        )
+        # Prefer current socket power, fallback to generic current power; capture max separately
+        power_current = (
+            find_key(["current socket graphics package power", "w"]) or
+            find_key(["current_socket_power", "w"]) or
+            find_key(["socket graphics package power", "w"]) or
+            ""
+        )
+        power_cap = find_key(["max graphics package power", "w"]) or ""
+        util_gpu = find_key(["gpu use", "%"]) or find_key(["average_gfx_activity", "%"]) or ""
+        serial = (
+            find_key(["serial", "number"]) or
+            find_key(["unique id"]) or
+            find_key(["guid"]) or
+            ""
+        )
+        vram_b = find_key(["vram", "total"]) or find_key(["memory", "total"]) or ""
+        vram_mb: Optional[str] = None
+        if vram_b:
             try:
-                data = json.loads(output)
+                # value may include units; extract digits
+                num = re.search(r"([0-9]+)", vram_b)
+                if num:
+                    val = int(num.group(1))
+                    # Heuristic: if very large, assume bytes; else kB
+                    if val > 1_000_000_000:
+                        vram_mb = str(int(round(val / (1024*1024))))
+                    else:
+                        vram_mb = str(int(round(val / 1024)))
             except Exception:
-                return devices
-            # rocm-smi -a --json often returns a dict of cards {"card0": {...}, ...}
-            if isinstance(data, dict):
-                items = data.items()
-            elif isinstance(data, list):
-                # some versions might return a list
-                items = [(str(i), v) for i, v in enumerate(data)]
-            else:
-                items = []
-            for _, info in items:
-                if not isinstance(info, dict):
-                    continue
-                # flatten nested dicts into a single-level map of key->value strings
-                flat: Dict[str, str] = {}
-                def walk(prefix: str, obj: Dict[str, object]):
-                    for k, v in obj.items():
-                        key = f"{prefix}{k}" if not prefix else f"{prefix}.{k}"
-                        if isinstance(v, dict):
-                            walk(key, v)
-                        else:
-                            flat[key] = str(v)
-                walk("", info)
-                # heuristic extraction
-                def find_key(substrs: List[str]) -> Optional[str]:
-                    # return the first match scanning keys in sorted order for stability
-                    for k in sorted(flat.keys()):
-                        lk = k.lower()
-                        if all(s in lk for s in substrs):
-                            return flat[k]
-                    return None
+                pass
+        # PCIe link metrics: convert 0.1 GT/s to GT/s
+        pcie_width = find_key(["pcie_link_width", "lanes"]) or ""
+        pcie_speed_raw = find_key(["pcie_link_speed", "gt/s"]) or ""
+        pcie_speed = None
+        if pcie_speed_raw:
+            m = re.search(r"([0-9]+)", pcie_speed_raw)
+            if m:
+                try:
+                    pcie_speed = f"{int(m.group(1))/10:.1f}GT/s"
+                except Exception:
+                    pcie_speed = None
+        # Gather firmware versions and vbios
+        fw: Dict[str, str] = {}
+        for k, v in flat.items():
+            lk = k.lower()
+            if "firmware version" in lk:
+                mod = lk.replace("firmware version", "").strip().replace(" ", "_").replace(".", "_")
+                key = f"fw_{mod}" if mod else "fw"
+                fw[key] = str(v)
+        vbios = find_key(["vbios version"]) or ""
+        devices.append({
+            "bdf": bdf or "",
+            "name": name or "",
+            "driver": driver or "",
+            "temperature_c": temp_c or "",
+            "power_w": power_current or "",
+            **({"power_cap_w": power_cap} if power_cap else {}),
+            **({"vram_mb": vram_mb} if vram_mb else {}),
+            **({"pcie_width": f"x{pcie_width}"} if pcie_width and not pcie_width.startswith("x") else ({"pcie_width": pcie_width} if pcie_width else {})),
+            **({"pcie_speed": pcie_speed} if pcie_speed else {}),
+            **({"utilization_gpu_pct": util_gpu} if util_gpu else {}),
+            **({"driver_version": driver} if driver else {}),
+            **fw,
+            **({"vbios_version": vbios} if vbios else {}),
+            **({"serial": serial} if serial else {}),
+        })
+    return devices
 
-                # Identify PCI BDF as precisely as possible
-                bdf = (
-                    find_key(["pci bus"]) or
-                    find_key(["pcie", "bus"]) or
-                    find_key(["bdf"]) or
-                    find_key(["pci", "bus"]) or
-                    ""
-                )
-                # Prefer product/series/name over hex model code
-                name = (
-                    find_key(["device name"]) or
-                    find_key(["card series"]) or
-                    find_key(["product"]) or
-                    find_key(["name"]) or
-                    find_key(["card model"]) or
-                    ""
-                )
-                driver = find_key(["driver version"]) or ""
-
-                # Prefer hotspot/core temperature then memory
-                temp_c = (
-                    find_key(["temperature_hotspot", "c"]) or
-                    find_key(["temperature (sensor junction)", "c"]) or
-                    find_key(["temperature (sensor memory)", "c"]) or
-                    find_key(["temperature", "c"]) or
-                    ""
-                )
-                # Prefer current socket power, fallback to generic current power; capture max separately
-                power_current = (
-                    find_key(["current socket graphics package power", "w"]) or
-                    find_key(["current_socket_power", "w"]) or
-                    find_key(["socket graphics package power", "w"]) or
-                    ""
-                )
-                power_cap = find_key(["max graphics package power", "w"]) or ""
-                util_gpu = find_key(["gpu use", "%"]) or find_key(["average_gfx_activity", "%"]) or ""
-                serial = (
-                    find_key(["serial", "number"]) or
-                    find_key(["unique id"]) or
-                    find_key(["guid"]) or
-                    ""
-                )
-                vram_b = find_key(["vram", "total"]) or find_key(["memory", "total"]) or ""
-                vram_mb: Optional[str] = None
-                if vram_b:
-                    try:
-                        # value may include units; extract digits
-                        num = re.search(r"([0-9]+)", vram_b)
-                        if num:
-                            val = int(num.group(1))
-                            # Heuristic: if very large, assume bytes; else kB
-                            if val > 1_000_000_000:
-                                vram_mb = str(int(round(val / (1024*1024))))
-                            else:
-                                vram_mb = str(int(round(val / 1024)))
-                    except Exception:
-                        pass
-                # PCIe link metrics: convert 0.1 GT/s to GT/s
-                pcie_width = find_key(["pcie_link_width", "lanes"]) or ""
-                pcie_speed_raw = find_key(["pcie_link_speed", "gt/s"]) or ""
-                pcie_speed = None
-                if pcie_speed_raw:
-                    m = re.search(r"([0-9]+)", pcie_speed_raw)
-                    if m:
-                        try:
-                            pcie_speed = f"{int(m.group(1))/10:.1f}GT/s"
-                        except Exception:
-                            pcie_speed = None
-                # Gather firmware versions and vbios
-                fw: Dict[str, str] = {}
-                for k, v in flat.items():
-                    lk = k.lower()
-                    if "firmware version" in lk:
-                        mod = lk.replace("firmware version", "").strip().replace(" ", "_").replace(".", "_")
-                        key = f"fw_{mod}" if mod else "fw"
-                        fw[key] = str(v)
-                vbios = find_key(["vbios version"]) or ""
-                devices.append({
-                    "bdf": bdf or "",
-                    "name": name or "",
-                    "driver": driver or "",
-                    "temperature_c": temp_c or "",
-                    "power_w": power_current or "",
-                    **({"power_cap_w": power_cap} if power_cap else {}),
-                    **({"vram_mb": vram_mb} if vram_mb else {}),
-                    **({"pcie_width": f"x{pcie_width}"} if pcie_width and not pcie_width.startswith("x") else ({"pcie_width": pcie_width} if pcie_width else {})),
-                    **({"pcie_speed": pcie_speed} if pcie_speed else {}),
-                    **({"utilization_gpu_pct": util_gpu} if util_gpu else {}),
-                    **({"driver_version": driver} if driver else {}),
-                    **fw,
-                    **({"vbios_version": vbios} if vbios else {}),
-                    **({"serial": serial} if serial else {}),
-                })
-            return devices
-
-        if _which("rocm-smi") and created_pci_nodes:
-            out = _run(["rocm-smi", "--showall", "--json"]) or _run(["rocm-smi", "-a", "--json"])  # try variants
-            for dev in _parse_rocm_smi_json(out):
-                bdf = dev.get("bdf", "")
-                # normalize to slot form 00:00.0 at end of BDF
-                m = re.search(r"([0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7])$", bdf)
-                if not m:
-                    continue
-                slot_key = m.group(1)
-                node = created_pci_nodes.get(slot_key) or created_pci_nodes.get(bdf)
-                if not node:
-                    continue
-                node["kind"] = "gpu-device"
-                if dev.get("name"):
-                    node["label"] = dev["name"]
-                p = node.setdefault("properties", {})
-                for k in ("driver", "vram_mb", "temperature_c", "power_w"):
-                    if dev.get(k):
-                        p[k] = dev[k]
-
-    # USB devices
-    if _which("lsusb"):
-        usb_nodes = _parse_lsusb(_run(["lsusb"]))
-        usb_root: Node = {
-            "id": "bus:usb",
-            "kind": "bus",
-            "label": "USB Bus",
-            "properties": {},
-        }
-        nodes.append(usb_root)
-        edges.append({"id": f"e:{root['id']}->bus:usb", "source": root["id"], "target": "bus:usb", "kind": "contains", "label": "contains"})
-        for n in usb_nodes:
-            nodes.append(n)
-            edges.append({"id": f"e:bus:usb->{n['id']}", "source": "bus:usb", "target": n["id"], "kind": "contains", "label": "device"})
+def _collect_rocm_smi() -> Optional[List[Dict[str, str]]]:
+    """Parsed rocm-smi devices; applied to PCI nodes by `_apply_rocm_smi`."""
+    if not (_which("rocm-smi") and _has_pci()):
+        return None
+    out = _run(["rocm-smi", "--showall", "--json"]) or _run(["rocm-smi", "-a", "--json"])  # try variants
+    return _parse_rocm_smi_json(out)
 
-    # Storage: NVMe and generic disks
-    storage_root: Node = {
-        "id": "bus:storage",
+
+def _apply_rocm_smi(graph: HardwareGraph, devices: List[Dict[str, str]]) -> None:
+    # AMD ROCm enrichment via rocm-smi JSON (static fields; readings come from _collect_rocm_telemetry)
+    for dev in devices:
+        node_id = _pci_node_id(dev.get("bdf", ""))
+        node = graph.node(node_id) if node_id else None
+        if node is None:
+            continue
+        graph.set_kind(node.id, "gpu-device")
+        if dev.get("name"):
+            node.label = dev["name"]
+        if node.properties is None:
+            node.properties = {}
+        for k in ("driver", "vram_mb"):
+            if dev.get(k):
+                node.properties[k] = dev[k]
+
+
+SYSFS_CLASS_DRM = "/sys/class/drm"
+
+
+def _amdgpu_sysfs_readings() -> Dict[str, Dict[str, str]]:
+    """AMD GPU readings straight from amdgpu's sysfs/hwmon files (no rocm-smi spawn).
+
+    Keyed by PCI node id; empty when no amdgpu card exposes them.
+    """
+    io = _io()
+    readings: Dict[str, Dict[str, str]] = {}
+    for card in io.listdir(SYSFS_CLASS_DRM) or []:
+        if not re.fullmatch(r"card\d+", card):
+            continue
+        dev = f"{SYSFS_CLASS_DRM}/{card}/device"
+        if _read_sysfs(f"{dev}/vendor") != "0x1002":
+            continue
+        node_id = _pci_node_id(os.path.basename(io.realpath(dev)))
+        if not node_id:
+            continue
+        values: Dict[str, str] = {}
+        busy = _read_sysfs(f"{dev}/gpu_busy_percent")
+        if busy.isdigit():
+            values["utilization_gpu_pct"] = busy
+        for hwmon in io.listdir(f"{dev}/hwmon") or []:
+            base = f"{dev}/hwmon/{hwmon}"
+            # temp2 is the junction (hotspot) sensor, temp1 the edge sensor
+            for name in ("temp2_input", "temp1_input"):
+                milli = _read_sysfs(f"{base}/{name}")
+                if milli.lstrip("-").isdigit():
+                    values["temperature_c"] = str(int(milli) // 1000)
+                    break
+            for name in ("power1_average", "power1_input"):
+                micro = _read_sysfs(f"{base}/{name}")
+                if micro.isdigit():
+                    values["power_w"] = f"{int(micro) / 1e6:.1f}"
+                    break
+        if values:
+            readings[node_id] = values
+    return readings
+
+
+def _collect_rocm_telemetry() -> Optional[Dict[str, Dict[str, str]]]:
+    """Temperature, power and utilization per AMD GPU, keyed by PCI node id."""
+    readings = _amdgpu_sysfs_readings()
+    if readings:
+        return readings
+    if not (_which("rocm-smi") and _has_pci()):
+        return None
+    out = _run(["rocm-smi", "--showbus", "--showtemp", "--showpower", "--showuse", "--json"])
+    for dev in _parse_rocm_smi_json(out):
+        node_id = _pci_node_id(dev.get("bdf", ""))
+        if node_id:
+            readings[node_id] = {k: dev[k] for k in GPU_TELEMETRY_KEYS if dev.get(k)}
+    return readings
+
+
+def _collect_usb() -> Optional[Graph]:
+    if not _which("lsusb"):
+        return None
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    usb_nodes = _parse_lsusb(_run(["lsusb"]))
+    usb_root: Node = {
+        "id": "bus:usb",
         "kind": "bus",
-        "label": "Storage",
+        "label": "USB Bus",
         "properties": {},
     }
-    nodes.append(storage_root)
-    edges.append({"id": f"e:{root['id']}->bus:storage", "source": root["id"], "target": "bus:storage", "kind": "contains", "label": "contains"})
+    nodes.append(usb_root)
+    edges.append({"id": "e:root->bus:usb", "source": "root", "target": "bus:usb", "kind": "contains", "label": "contains"})
+    for n in usb_nodes:
+        nodes.append(n)
+        edges.append({"id": f"e:bus:usb->{n['id']}", "source": "bus:usb", "target": n["id"], "kind": "contains", "label": "device"})
+    return {"nodes": nodes, "edges": edges}
+
 
+def _collect_nvme() -> Optional[Graph]:
     # NVMe via nvme-cli
-    if _which("nvme"):
-        nvme_nodes = _parse_nvme_list_json(_run(["nvme", "list", "-o", "json"]))
-        for n in nvme_nodes:
-            nodes.append(n)
-            edges.append({"id": f"e:bus:storage->{n['id']}", "source": "bus:storage", "target": n["id"], "kind": "contains", "label": "nvme"})
+    if not _which("nvme"):
+        return None
+    nvme_nodes = _parse_nvme_list_json(_run(["nvme", "list", "-o", "json"]))
+    edges: List[Edge] = [
+        {"id": f"e:bus:storage->{n['id']}", "source": "bus:storage", "target": n["id"], "kind": "contains", "label": "nvme"}
+        for n in nvme_nodes
+    ]
+    return {"nodes": nvme_nodes, "edges": edges}
 
+
+def _collect_lsblk() -> Optional[Graph]:
     # Generic disks via lsblk
-    if _which("lsblk"):
-        lsblk_nodes = _parse_lsblk_json(_run(["lsblk", "-J", "-o", "NAME,TYPE,SIZE,ROTA,TRAN,MODEL,SERIAL"]))
-        for n in lsblk_nodes:
-            nodes.append(n)
-            edges.append({"id": f"e:bus:storage->{n['id']}", "source": "bus:storage", "target": n["id"], "kind": "contains", "label": "disk"})
-
-    # Network interfaces
-    if _which("ip"):
-        net_root: Node = {"id": "bus:net", "kind": "bus", "label": "Network", "properties": {}}
-        nodes.append(net_root)
-        edges.append({"id": f"e:{root['id']}->bus:net", "source": root["id"], "target": "bus:net", "kind": "contains", "label": "contains"})
-        ifaces = _parse_ip_link_brief(_run(["ip", "-br", "link"]))
-        for iface in ifaces:
-            ifname = iface.get("ifname")
-            props: Dict[str, str] = {k: v for k, v in iface.items() if k != "ifname"}
-            # enrich with ethtool
-            if _which("ethtool") and ifname:
-                info = _parse_ethtool_i(_run(["ethtool", "-i", ifname]))
-                speed = _parse_ethtool_speed(_run(["ethtool", ifname]))
-                props.update(info)
-                if speed:
-                    props["speed_mbps"] = str(speed)
-            node: Node = {
-                "id": f"net:{ifname}",
-                "kind": "net-interface",
-                "label": ifname,
-                "properties": props,
-            }
-            nodes.append(node)
-            edges.append({"id": f"e:bus:net->net:{ifname}", "source": "bus:net", "target": f"net:{ifname}", "kind": "contains", "label": "iface"})
+    if not _which("lsblk"):
+        return None
+    lsblk_nodes = _parse_lsblk_json(_run(["lsblk", "-J", "-o", "NAME,TYPE,SIZE,ROTA,TRAN,MODEL,SERIAL"]))
+    edges: List[Edge] = [
+        {"id": f"e:bus:storage->{n['id']}", "source": "bus:storage", "target": n["id"], "kind": "contains", "label": "disk"}
+        for n in lsblk_nodes
+    ]
+    return {"nodes": lsblk_nodes, "edges": edges}
+
+
+def _collect_net_ip() -> Optional[Graph]:
+    """Network interfaces from `ip -br link` plus two `ethtool` runs per interface."""
+    if not _which("ip"):
+        return None
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    net_root: Node = {"id": "bus:net", "kind": "bus", "label": "Network", "properties": {}}
+    nodes.append(net_root)
+    edges.append({"id": "e:root->bus:net", "source": "root", "target": "bus:net", "kind": "contains", "label": "contains"})
+    ifaces = _parse_ip_link_brief(_run(["ip", "-br", "link"]))
+    has_ethtool = _which("ethtool")
+    for iface in ifaces:
+        ifname = iface.get("ifname")
+        props: Dict[str, str] = {k: v for k, v in iface.items() if k != "ifname"}
+        # enrich with ethtool
+        if has_ethtool and ifname:
+            info = _parse_ethtool_i(_run(["ethtool", "-i", ifname]))
+            speed = _parse_ethtool_speed(_run(["ethtool", ifname]))
+            props.update(info)
+            if speed:
+                props["speed_mbps"] = str(speed)
+        node: Node = {
+            "id": f"net:{ifname}",
+            "kind": "net-interface",
+            "label": ifname,
+            "properties": props,
+        }
+        nodes.append(node)
+        edges.append({"id": f"e:bus:net->net:{ifname}", "source": "bus:net", "target": f"net:{ifname}", "kind": "contains", "label": "iface"})
+    return {"nodes": nodes, "edges": edges}
+
+
+SYSFS_CLASS_NET = "/sys/class/net"
 
+# How `_collect_net_sysfs` treats virtual interfaces (veth, bridges, lo, ...)
+VIRTUAL_IFACE_MODES = ("show", "skip", "aggregate")
+
+_BDF_RE = re.compile(r"^[0-9a-fA-F]{4}:[0-9a-fA-F]{2}:[0-9a-fA-F]{2}\.[0-7]$")
+
+
+def _net_bus_info(ifpath: str) -> str:
+    """PCI address backing an interface, as `ethtool -i` reports in bus-info."""
+    io = _io()
+    dev = io.realpath(os.path.join(ifpath, "device"))
+    if not io.exists(dev):
+        return ""
+    name = os.path.basename(dev)
+    if _BDF_RE.match(name):
+        return name
+    # virtio NICs hang off a virtioN child of the PCI function
+    parent = os.path.basename(os.path.dirname(dev))
+    if name.startswith("virtio") and _BDF_RE.match(parent):
+        return parent
+    return ""
+
+
+def _collect_net_sysfs(virtual_ifaces: str = "show") -> Optional[Graph]:
+    """Network interfaces from /sys/class/net in a single pass (no subprocesses).
+
+    `virtual_ifaces` is one of VIRTUAL_IFACE_MODES: list virtual interfaces
+    individually, skip them, or fold them into one aggregate node.
+    """
+    io = _io()
+    names = io.listdir(SYSFS_CLASS_NET)
+    if names is None:
+        return None
+    nodes: List[Node] = []
+    edges: List[Edge] = []
+    net_root: Node = {"id": "bus:net", "kind": "bus", "label": "Network", "properties": {}}
+    nodes.append(net_root)
+    edges.append({"id": "e:root->bus:net", "source": "root", "target": "bus:net", "kind": "contains", "label": "contains"})
+    virtual: List[str] = []
+    for ifname in names:
+        path = os.path.join(SYSFS_CLASS_NET, ifname)
+        is_virtual = "/devices/virtual/" in io.realpath(path)
+        if is_virtual and virtual_ifaces != "show":
+            virtual.append(ifname)
+            continue
+        props: Dict[str, str] = {}
+        state = _read_sysfs(os.path.join(path, "operstate"))
+        if state:
+            props["state"] = state.upper()
+        mac = _read_sysfs(os.path.join(path, "address"))
+        if mac:
+            props["mac"] = mac.lower()
+        driver = _sysfs_link_name(os.path.join(path, "device", "driver"))
+        if driver:
+            props["driver"] = driver
+        bus_info = _net_bus_info(path)
+        if bus_info:
+            props["bus_info"] = bus_info
+        # speed is unreadable (EINVAL) or -1 while the link is down
+        speed = _read_sysfs(os.path.join(path, "speed"))
+        if speed.isdigit() and int(speed) > 0:
+            props["speed_mbps"] = speed
+        node: Node = {
+            "id": f"net:{ifname}",
+            "kind": "net-interface",
+            "label": ifname,
+            "properties": props,
+        }
+        nodes.append(node)
+        edges.append({"id": f"e:bus:net->net:{ifname}", "source": "bus:net", "target": f"net:{ifname}", "kind": "contains", "label": "iface"})
+    if virtual and virtual_ifaces == "aggregate":
+        agg: Node = {
+            "id": "net:virtual",
+            "kind": "net-interface",
+            "label": f"Virtual interfaces ({len(virtual)})",
+            "properties": {"count": str(len(virtual)), "members": ",".join(virtual)},
+        }
+        nodes.append(agg)
+        edges.append({"id": "e:bus:net->net:virtual", "source": "bus:net", "target": "net:virtual", "kind": "contains", "label": "iface"})
     return {"nodes": nodes, "edges": edges}
 
 
-def generate_demo_graph() -> Graph:
-    nodes: List[Node] = [
-        {"id": "root", "kind": "system", "label": "Demo System", "properties": {"os": "Linux"}},
-        {"id": "cpu:0", "kind": "cpu", "label": "Intel(R) Xeon(R) CPU", "properties": {"sockets": "1", "cores_per_socket": "8", "threads_per_core": "2"}},
-        {"id": "bus:memory", "kind": "memory", "label": "Memory", "properties": {"total_gb": "32.0"}},
-        {"id": "dimm:A1", "kind": "dimm", "label": "DIMM A1", "properties": {"slot": "A1", "size_gb": "16.0", "type": "DDR4", "speed": "2666 MT/s"}},
-        {"id": "dimm:B1", "kind": "dimm", "label": "DIMM B1", "properties": {"slot": "B1", "size_gb": "16.0", "type": "DDR4", "speed": "2666 MT/s"}},
-        {"id": "bus:pci", "kind": "bus", "label": "PCI Bus", "properties": {}},
-        {"id": "pci:00:00.0", "kind": "pci-device", "label": "Intel Corporation 440FX - 82441FX PMC [Natoma]", "properties": {"class": "Host bridge", "address": "00:00.0"}},
-        {"id": "pci:00:01.0", "kind": "pci-device", "label": "Intel Corporation 82371SB PIIX3 ISA [Natoma/Triton II]", "properties": {"class": "ISA bridge", "address": "00:01.0"}},
-        {"id": "bus:usb", "kind": "bus", "label": "USB Bus", "properties": {}},
-        {"id": "usb:001-002", "kind": "usb-device", "label": "Intel Corp. Integrated Hub", "properties": {"bus": "001", "device": "002", "vendor_id": "8087", "product_id": "0024"}},
+def _collect_net(virtual_ifaces: str = "show") -> Optional[Graph]:
+    """Network interfaces from sysfs; ip/ethtool are only spawned without it."""
+    if _io().isdir(SYSFS_CLASS_NET):
+        return _collect_net_sysfs(virtual_ifaces)
+    return _collect_net_ip()
+
+
+SYSFS_DMI_ID = "/sys/class/dmi/id"
+
+# /sys/class/dmi/id attribute -> root property (serials there are root-only)
+_DMI_ID_FIELDS = {
+    "sys_vendor": "system_vendor",
+    "product_name": "system_product",
+    "product_version": "system_version",
+    "product_serial": "system_serial",
+    "board_vendor": "board_vendor",
+    "board_name": "board_product",
+    "board_version": "board_version",
+    "board_serial": "board_serial",
+}
+
+
+def _collect_system() -> Dict[str, str]:
+    """System and baseboard identity for the root node (SMBIOS types 1/2)."""
+    structs = _smbios()
+    if structs is not None:
+        return decode_system(structs)
+    # The kernel's decoded copy is mostly world-readable
+    info: Dict[str, str] = {}
+    for attr, key in _DMI_ID_FIELDS.items():
+        val = _read_sysfs(os.path.join(SYSFS_DMI_ID, attr))
+        if val:
+            info[key] = val
+    return info
+
+
+# Scan-cache fingerprints: cheap summaries of what each collector reads. A
+# reboot (new boot_id), an upgraded tool or a changed device listing makes
+# the collector run again; see collect.cache.
+
+BOOT_ID_PATH = "/proc/sys/kernel/random/boot_id"
+
+
+def _tool_stamps(*tools: str) -> List[Tuple[str, Optional[str], Optional[Tuple[int, int]]]]:
+    io = _io()
+    stamps = []
+    for tool in tools:
+        path = io.tool_path(tool)
+        stamps.append((tool, path, io.stat(path) if path else None))
+    return stamps
+
+
+def _sources_fp(tools: Tuple[str, ...], *parts: object) -> str:
+    return fingerprint(_read_sysfs(BOOT_ID_PATH), _tool_stamps(*tools), *parts)
+
+
+def _fp_system() -> str:
+    return _sources_fp(())
+
+
+def _fp_cpu() -> str:
+    return _sources_fp(
+        ("lscpu", "dmidecode"),
+        _read_sysfs("/sys/devices/system/cpu/online"),
+        _io().listdir("/sys/devices/system/node"),
+    )
+
+
+def _fp_memory() -> str:
+    return _sources_fp(("dmidecode", "cat"), _parse_meminfo_total_kb(_io().read_text("/proc/meminfo") or ""))
+
+
+def _fp_pci() -> str:
+    io = _io()
+    devices = io.listdir(SYSFS_PCI_DEVICES) or []
+    # Driver binds/unbinds change the inventory without changing the listing
+    drivers = [_sysfs_link_name(f"{SYSFS_PCI_DEVICES}/{d}/driver") for d in devices]
+    # GPUs retrain their links when idle or under load, which pcie_speed and
+    # pcie_width report
+    links = [
+        [_read_sysfs(f"{SYSFS_PCI_DEVICES}/{d}/{attr}") for attr in ("current_link_speed", "current_link_width")]
+        for d in devices
     ]
-    edges: List[Edge] = [
-        {"id": "e:root->cpu:0", "source": "root", "target": "cpu:0", "kind": "contains", "label": "contains"},
-        {"id": "e:root->bus:memory", "source": "root", "target": "bus:memory", "kind": "contains", "label": "contains"},
-        {"id": "e:bus:memory->dimm:A1", "source": "bus:memory", "target": "dimm:A1", "kind": "contains", "label": "dimm"},
-        {"id": "e:bus:memory->dimm:B1", "source": "bus:memory", "target": "dimm:B1", "kind": "contains", "label": "dimm"},
-        {"id": "e:root->bus:pci", "source": "root", "target": "bus:pci", "kind": "contains", "label": "contains"},
-        {"id": "e:bus:pci->pci:00:00.0", "source": "bus:pci", "target": "pci:00:00.0", "kind": "contains", "label": "device"},
-        {"id": "e:bus:pci->pci:00:01.0", "source": "bus:pci", "target": "pci:00:01.0", "kind": "contains", "label": "device"},
-        {"id": "e:root->bus:usb", "source": "root", "target": "bus:usb", "kind": "contains", "label": "contains"},
-        {"id": "e:bus:usb->usb:001-002", "source": "bus:usb", "target": "usb:001-002", "kind": "contains", "label": "device"},
+    return _sources_fp(("lspci",), devices, drivers, links, [io.stat(p) for p in PCI_IDS_PATHS])
+
+
+def _fp_usb() -> str:
+    return _sources_fp(("lsusb",), _io().listdir("/sys/bus/usb/devices"))
+
+
+def _fp_gpu(tool: str, module: str) -> str:
+    # Inventory only (serial, VBIOS, VRAM); readings are collected separately
+    return _sources_fp(
+        (tool,), _read_sysfs(f"/sys/module/{module}/version"), _io().listdir(SYSFS_PCI_DEVICES)
+    )
+
+
+def _block_listing() -> List[Tuple[str, str]]:
+    return [(b, _read_sysfs(f"/sys/class/block/{b}/size")) for b in _io().listdir("/sys/class/block") or []]
+
+
+def _fp_nvme() -> str:
+    return _sources_fp(("nvme",), _io().listdir("/sys/class/nvme"), _block_listing())
+
+
+def _fp_lsblk() -> str:
+    return _sources_fp(("lsblk",), _block_listing())
+
+
+def linux_telemetry_collectors() -> List[Collector]:
+    """Collectors for volatile readings; each returns {node id: {key: value}}."""
+    return [
+        Collector("nvidia_telemetry", _collect_nvidia_telemetry),
+        Collector("rocm_telemetry", _collect_rocm_telemetry),
     ]
-    return {"nodes": nodes, "edges": edges}
+
+
+def linux_collectors(virtual_ifaces: str = "show", telemetry: bool = True) -> List[Collector]:
+    """Independent collection units, run concurrently by `collect_linux_hardware_graph`.
+
+    Order here does not affect the output; merge order is fixed there.
+    """
+    collectors = [
+        Collector("system", _collect_system, _fp_system),
+        Collector("cpu", _collect_cpu, _fp_cpu),
+        Collector("memory", _collect_memory, _fp_memory),
+        Collector("pci", _collect_pci, _fp_pci),
+        Collector("nvidia", _collect_nvidia_smi, functools.partial(_fp_gpu, "nvidia-smi", "nvidia")),
+        Collector("rocm", _collect_rocm_smi, functools.partial(_fp_gpu, "rocm-smi", "amdgpu")),
+        Collector("usb", _collect_usb, _fp_usb),
+        Collector("nvme", _collect_nvme, _fp_nvme),
+        Collector("lsblk", _collect_lsblk, _fp_lsblk),
+        # Link state and speed change at any time
+        Collector("net", functools.partial(_collect_net, virtual_ifaces)),
+    ]
+    if telemetry:
+        collectors += linux_telemetry_collectors()
+    return collectors
+
+
+def _telemetry_readings(results: Mapping[str, object]) -> Dict[str, Dict[str, str]]:
+    readings: Dict[str, Dict[str, str]] = {}
+    for c in linux_telemetry_collectors():
+        for node_id, values in (results.get(c.name) or {}).items():  # type: ignore[union-attr]
+            readings.setdefault(node_id, {}).update(values)
+    return readings
+
+
+def collect_linux_telemetry(
+    max_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+    tool_timeouts: Optional[Mapping[str, float]] = None,
+    io: Optional[HostIO] = None,
+    profiler: Optional[ScanProfiler] = None,
+) -> Telemetry:
+    """Collect only the telemetry overlay; merge it with `model.merge_telemetry`.
+
+    Runs just the GPU reading queries, so it is cheap enough to repeat at
+    short intervals against a cached inventory graph.
+    """
+    ctx = ScanContext(deadline=deadline, tool_timeouts=tool_timeouts, io=io, profiler=profiler)
+    results, _ = run_collectors(linux_telemetry_collectors(), max_workers=max_workers, ctx=ctx)
+    return {"collected_at": time.time(), "nodes": _telemetry_readings(results)}
+
+
+def collect_linux_hardware_graph(
+    max_workers: Optional[int] = None,
+    deadline: Optional[float] = None,
+    tool_timeouts: Optional[Mapping[str, float]] = None,
+    virtual_ifaces: str = "show",
+    io: Optional[HostIO] = None,
+    profiler: Optional[ScanProfiler] = None,
+    cache: Optional[ScanCache] = None,
+    telemetry: bool = True,
+) -> Graph:
+    """Scan the host and return the hardware graph.
+
+    Collectors run concurrently (bounded by `max_workers`; 1 runs them serially)
+    so scan time tracks the slowest tool rather than the sum of all of them.
+    Fragments are merged in a fixed order, keeping node/edge order stable.
+
+    `deadline` bounds the whole scan in seconds; collectors that miss it are
+    dropped and the graph holds whatever completed. Per-collector status is
+    recorded on the root node as `collector_<name>` plus an overall `scan_status`.
+
+    `virtual_ifaces` ("show", "skip" or "aggregate") controls how virtual
+    network interfaces appear; see `_collect_net_sysfs`. `io` substitutes host
+    access, e.g. `RecordingIO` to capture a scan or `ReplayIO` to rebuild one.
+    `profiler` records collector, command and assembly timings. With `cache`,
+    collectors whose sources are unchanged since an earlier scan are not run
+    (status "cached"), and fresh results are saved for the next scan.
+    `telemetry` also collects GPU readings into each node's `telemetry`
+    overlay; inventory alone is steadier for snapshots and caching.
+    """
+    ctx = ScanContext(deadline=deadline, tool_timeouts=tool_timeouts, io=io, profiler=profiler, cache=cache)
+    collectors = linux_collectors(virtual_ifaces=virtual_ifaces, telemetry=telemetry)
+    collect_start = profiler.now() if profiler else 0.0
+    results, status = run_collectors(collectors, max_workers=max_workers, ctx=ctx)
+    if profiler:
+        profiler.phase("collect", collect_start, profiler.now() - collect_start)
+        assemble_start = profiler.now()
+
+    if cache is not None:
+        cache.save()
+    out = assemble_linux_graph(results, status, ctx.io.host()).to_dict()
+    if profiler:
+        profiler.phase("assemble", assemble_start, profiler.now() - assemble_start)
+    return out
+
+
+def apply_gpu_results(graph: HardwareGraph, results: Mapping[str, object]) -> None:
+    """Enrich PCI nodes from the GPU collectors' results (inventory, then telemetry)."""
+    _apply_nvidia_smi(graph, results.get("nvidia") or [])  # type: ignore[arg-type]
+    _apply_rocm_smi(graph, results.get("rocm") or [])  # type: ignore[arg-type]
+    graph.apply_telemetry(_telemetry_readings(results))
+
+
+def assemble_linux_graph(
+    results: Mapping[str, object], status: Mapping[str, str], host: Mapping[str, str]
+) -> HardwareGraph:
+    """Merge collector results into the graph in the fixed section order."""
+    root: Node = {
+        "id": "root",
+        "kind": "system",
+        "label": host.get("nodename") or "Linux",
+        "properties": {"os": host.get("platform", ""), **(results.get("system") or {})},  # type: ignore[dict-item]
+    }
+    incomplete = any(st in ("timeout", "partial", "error") for st in status.values())
+    root["properties"]["scan_status"] = "partial" if incomplete else "complete"
+    for name, st in status.items():
+        root["properties"][f"collector_{name}"] = st
+    graph = HardwareGraph()
+    graph.add_node(NodeRecord.from_dict(root))
+
+    graph.merge(results.get("cpu"))  # type: ignore[arg-type]
+    graph.merge(results.get("memory"))  # type: ignore[arg-type]
+    graph.merge(results.get("pci"))  # type: ignore[arg-type]
+    # GPU tools enrich the PCI functions they report on
+    apply_gpu_results(graph, results)
+
+    graph.merge(results.get("usb"))  # type: ignore[arg-type]
+
+    # Storage: NVMe and generic disks
+    graph.add_node(NodeRecord("bus:storage", "bus", "Storage", {}))
+    graph.add_edge(EdgeRecord("e:root->bus:storage", "root", "bus:storage", "contains", "contains"))
+    graph.merge(results.get("nvme"))  # type: ignore[arg-type]
+    graph.merge(results.get("lsblk"))  # type: ignore[arg-type]
+
+    graph.merge(results.get("net"))  # type: ignore[arg-type]
+    return graph
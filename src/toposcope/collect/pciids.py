@@ -0,0 +1,166 @@
+from __future__ import annotations
+
+import gzip
+from typing import Dict, Optional, Tuple
+
+from .hostio import HostIO
+
+# Common install locations (hwdata on Fedora/SUSE, pciutils on Debian/Ubuntu)
+PCI_IDS_PATHS = (
+    "/usr/share/hwdata/pci.ids",
+    "/usr/share/misc/pci.ids",
+    "/usr/share/pci.ids",
+    "/usr/share/hwdata/pci.ids.gz",
+    "/usr/share/misc/pci.ids.gz",
+)
+
+# Standard PCI class/subclass names, used when no pci.ids is installed so that
+# classification (e.g. GPU detection) does not depend on the database.
+PCI_CLASSES: Dict[str, str] = {
+    "00": "Unclassified device",
+    "01": "Mass storage controller",
+    "0101": "IDE interface",
+    "0104": "RAID bus controller",
+    "0106": "SATA controller",
+    "0107": "Serial Attached SCSI controller",
+    "0108": "Non-Volatile memory controller",
+    "02": "Network controller",
+    "0200": "Ethernet controller",
+    "0207": "Infiniband controller",
+    "03": "Display controller",
+    "0300": "VGA compatible controller",
+    "0302": "3D controller",
+    "04": "Multimedia controller",
+    "0403": "Audio device",
+    "05": "Memory controller",
+    "06": "Bridge",
+    "0600": "Host bridge",
+    "0601": "ISA bridge",
+    "0604": "PCI bridge",
+    "07": "Communication controller",
+    "08": "Generic system peripheral",
+    "0c": "Serial bus controller",
+    "0c03": "USB controller",
+    "0c05": "SMBus",
+    "0d": "Wireless controller",
+    "11": "Signal processing controller",
+    "12": "Processing accelerators",
+    "40": "Coprocessor",
+}
+
+
+class PciIds:
+    """Lazily loaded, indexed view of a pci.ids database.
+
+    The first lookup reads the file and indexes vendor lines to byte offsets;
+    a vendor's device block is only parsed when one of its devices is looked
+    up. Classes (the small "C" section) are parsed with the index.
+    """
+
+    def __init__(self, path: str, io: Optional[HostIO] = None) -> None:
+        self.path = path
+        self.io = io or HostIO()
+        self._data: Optional[bytes] = None
+        # vendor id -> (name, start offset of its device block, end offset)
+        self._vendors: Dict[str, Tuple[str, int, int]] = {}
+        self._devices: Dict[str, Dict[str, str]] = {}
+        # "cc" -> name and "ccss" -> name
+        self._classes: Dict[str, str] = {}
+
+    def _load(self) -> bytes:
+        if self._data is not None:
+            return self._data
+        data = self.io.read_bytes(self.path) or b""
+        if self.path.endswith(".gz"):
+            try:
+                data = gzip.decompress(data)
+            except Exception:
+                data = b""
+        self._data = data
+        self._index(data)
+        return data
+
+    def _index(self, data: bytes) -> None:
+        pos = 0
+        size = len(data)
+        vendor: Optional[Tuple[str, str, int]] = None  # (id, name, block start)
+        cur_class: Optional[str] = None
+        in_classes = False
+        while pos < size:
+            nl = data.find(b"\n", pos)
+            if nl < 0:
+                nl = size
+            line = data[pos:nl]
+            start, pos = pos, nl + 1
+            if not line or line[:1] == b"#":
+                continue
+            if in_classes:
+                text = line.decode("utf-8", "replace")
+                if text.startswith("C "):
+                    cur_class = text[2:4].lower()
+                    self._classes[cur_class] = text[4:].strip()
+                elif text.startswith("\t") and not text.startswith("\t\t") and cur_class:
+                    self._classes[cur_class + text[1:3].lower()] = text[3:].strip()
+                continue
+            if line[:1] == b"\t":
+                continue
+            if vendor is not None:
+                vid, name, block = vendor
+                self._vendors[vid] = (name, block, start)
+                vendor = None
+            if line[:2] == b"C ":
+                in_classes = True
+                cur_class = None
+                pos = start  # reprocess this line in class mode
+                continue
+            text = line.decode("utf-8", "replace")
+            vid = text[:4].lower()
+            if len(text) > 6 and text[4:6] == "  ":
+                vendor = (vid, text[6:].strip(), nl + 1)
+        if vendor is not None:
+            vid, name, block = vendor
+            self._vendors[vid] = (name, block, size)
+
+    def vendor_name(self, vendor_id: str) -> Optional[str]:
+        self._load()
+        entry = self._vendors.get(vendor_id.lower())
+        return entry[0] if entry else None
+
+    def device_name(self, vendor_id: str, device_id: str) -> Optional[str]:
+        data = self._load()
+        vid = vendor_id.lower()
+        devices = self._devices.get(vid)
+        if devices is None:
+            devices = {}
+            entry = self._vendors.get(vid)
+            if entry:
+                _, start, end = entry
+                for raw in data[start:end].split(b"\n"):
+                    # devices have one leading tab; subsystems have two
+                    if raw[:1] == b"\t" and raw[1:2] != b"\t" and len(raw) > 7:
+                        text = raw.decode("utf-8", "replace")
+                        devices[text[1:5].lower()] = text[7:].strip()
+            self._devices[vid] = devices
+        return devices.get(device_id.lower())
+
+    def class_name(self, class_code: str) -> Optional[str]:
+        """Name for a 4-hex-digit class+subclass code, falling back to the class."""
+        self._load()
+        code = class_code.lower()
+        return self._classes.get(code[:4]) or self._classes.get(code[:2])
+
+
+def pci_class_name(class_code: str, ids: Optional[PciIds] = None) -> Optional[str]:
+    """Class name from pci.ids when available, else from the built-in table."""
+    code = class_code.lower()
+    name = ids.class_name(code) if ids else None
+    return name or PCI_CLASSES.get(code[:4]) or PCI_CLASSES.get(code[:2])
+
+
+def find_pci_ids(io: Optional[HostIO] = None) -> Optional[PciIds]:
+    """The first pci.ids database found on the host (loaded on first lookup)."""
+    io = io or HostIO()
+    for path in PCI_IDS_PATHS:
+        if io.isfile(path):
+            return PciIds(path, io)
+    return None
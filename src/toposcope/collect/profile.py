@@ -0,0 +1,157 @@
+from __future__ import annotations
+
+import json
+import os
+import threading
+import time
+from typing import Any, Dict, List, Optional
+
+
+def count_nodes(result: Any) -> int:
+    """Nodes a collector produced: graph fragments count nodes, lists count rows."""
+    if isinstance(result, dict) and "nodes" in result:
+        return len(result.get("nodes") or [])
+    if isinstance(result, list):
+        return len(result)
+    return 0
+
+
+class ScanProfiler:
+    """Timing of one scan, per collector and per subprocess.
+
+    Times are `time.perf_counter()` readings relative to the profiler's start.
+    A collector's parse time is its wall time minus the time spent waiting on
+    its commands, i.e. parsing plus sysfs/procfs reads. Thread-safe; collectors
+    report from worker threads.
+    """
+
+    def __init__(self) -> None:
+        self.t0 = time.perf_counter()
+        self._lock = threading.Lock()
+        self.collectors: Dict[str, Dict[str, Any]] = {}
+        self.commands: List[Dict[str, Any]] = []
+        self.phases: List[Dict[str, Any]] = []
+        self._threads: Dict[int, str] = {}
+
+    def now(self) -> float:
+        return time.perf_counter() - self.t0
+
+    def _tid(self) -> int:
+        t = threading.current_thread()
+        with self._lock:
+            self._threads.setdefault(t.ident or 0, t.name)
+        return t.ident or 0
+
+    def command(
+        self,
+        collector: str,
+        argv: List[str],
+        start: float,
+        wall_s: float,
+        spawn_s: Optional[float],
+        out_bytes: int,
+        returncode: Optional[int],
+    ) -> None:
+        entry = {
+            "collector": collector,
+            "argv": list(argv),
+            "start": start,
+            "wall_s": wall_s,
+            "spawn_s": spawn_s,
+            "bytes": out_bytes,
+            "returncode": returncode,
+            "tid": self._tid(),
+        }
+        with self._lock:
+            self.commands.append(entry)
+
+    def collector(self, name: str, start: float, wall_s: float, nodes: int) -> None:
+        entry = {"start": start, "wall_s": wall_s, "nodes": nodes, "status": "", "tid": self._tid()}
+        with self._lock:
+            self.collectors[name] = entry
+
+    def set_status(self, status: Dict[str, str]) -> None:
+        """Attach final statuses and reorder collectors from completion to scan order."""
+        now = self.now()
+        with self._lock:
+            ordered: Dict[str, Dict[str, Any]] = {}
+            for name, st in status.items():
+                # Collectors that never finished have no timing entry
+                entry = self.collectors.get(name) or {"start": 0.0, "wall_s": now, "nodes": 0, "tid": 0}
+                entry["status"] = st
+                ordered[name] = entry
+            self.collectors = ordered
+
+    def phase(self, name: str, start: float, wall_s: float) -> None:
+        entry = {"name": name, "start": start, "wall_s": wall_s, "tid": self._tid()}
+        with self._lock:
+            self.phases.append(entry)
+
+    def summary(self) -> List[Dict[str, Any]]:
+        """One row per collector, in scan order."""
+        rows: List[Dict[str, Any]] = []
+        with self._lock:
+            commands = list(self.commands)
+            collectors = dict(self.collectors)
+        for name, c in collectors.items():
+            cmds = [cmd for cmd in commands if cmd["collector"] == name]
+            cmd_s = sum(cmd["wall_s"] for cmd in cmds)
+            rows.append({
+                "collector": name,
+                "status": c["status"],
+                "wall_s": c["wall_s"],
+                "commands": len(cmds),
+                "spawn_s": sum(cmd["spawn_s"] or 0.0 for cmd in cmds),
+                "command_s": cmd_s,
+                "parse_s": max(0.0, c["wall_s"] - cmd_s),
+                "bytes": sum(cmd["bytes"] for cmd in cmds),
+                "nodes": c["nodes"],
+            })
+        return rows
+
+    def slowest_commands(self, limit: int = 10) -> List[Dict[str, Any]]:
+        with self._lock:
+            commands = list(self.commands)
+        return sorted(commands, key=lambda c: c["wall_s"], reverse=True)[:limit]
+
+    def chrome_trace(self) -> Dict[str, Any]:
+        """Trace-event JSON (complete "X" events, microseconds) for chrome://tracing or Perfetto."""
+        pid = os.getpid()
+        us = 1e6
+        events: List[Dict[str, Any]] = []
+        with self._lock:
+            threads = dict(self._threads)
+            collectors = dict(self.collectors)
+            commands = list(self.commands)
+            phases = list(self.phases)
+        events.append({"ph": "M", "name": "process_name", "pid": pid, "tid": 0, "args": {"name": "toposcope scan"}})
+        for tid, tname in threads.items():
+            events.append({"ph": "M", "name": "thread_name", "pid": pid, "tid": tid, "args": {"name": tname}})
+        for p in phases:
+            events.append({
+                "ph": "X", "cat": "phase", "name": p["name"], "pid": pid, "tid": p["tid"],
+                "ts": p["start"] * us, "dur": p["wall_s"] * us,
+            })
+        for name, c in collectors.items():
+            events.append({
+                "ph": "X", "cat": "collector", "name": name, "pid": pid, "tid": c["tid"],
+                "ts": c["start"] * us, "dur": c["wall_s"] * us,
+                "args": {"status": c["status"], "nodes": c["nodes"]},
+            })
+        for cmd in commands:
+            events.append({
+                "ph": "X", "cat": "command", "name": os.path.basename(cmd["argv"][0]) if cmd["argv"] else "?",
+                "pid": pid, "tid": cmd["tid"], "ts": cmd["start"] * us, "dur": cmd["wall_s"] * us,
+                "args": {
+                    "argv": " ".join(cmd["argv"]),
+                    "collector": cmd["collector"],
+                    "spawn_us": round((cmd["spawn_s"] or 0.0) * us, 1),
+                    "bytes": cmd["bytes"],
+                    "returncode": cmd["returncode"],
+                },
+            })
+        return {"traceEvents": events, "displayTimeUnit": "ms"}
+
+    def save(self, path: str) -> None:
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.chrome_trace(), f)
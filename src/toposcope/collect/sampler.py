@@ -0,0 +1,248 @@
+from __future__ import annotations
+
+import collections
+import math
+import subprocess
+import threading
+import time
+from typing import Deque, Dict, List, Optional, Tuple
+
+from ..model import Telemetry
+from .engine import ScanContext, _kill, use_scan
+from .linux import (
+    GPU_TELEMETRY_KEYS,
+    NVIDIA_TELEMETRY_FIELDS,
+    _collect_rocm_telemetry,
+    _parse_nvidia_telemetry_line,
+)
+
+DEFAULT_CAPACITY = 300  # samples kept per GPU and metric (5 min at 1 Hz)
+# A dead nvidia-smi stream is restarted after this delay, doubling per
+# failed attempt up to the maximum
+RESTART_BACKOFF_S = 1.0
+MAX_RESTART_BACKOFF_S = 30.0
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    rank = max(1, math.ceil(pct / 100.0 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def _fmt(value: float) -> str:
+    return f"{value:.2f}".rstrip("0").rstrip(".")
+
+
+class SampleStore:
+    """Fixed-size ring buffer of readings per (node id, metric).
+
+    Old samples fall off once `capacity` is reached, so memory stays bounded
+    however long a sampler runs. Thread-safe: samplers add from reader
+    threads while summaries are taken from the main thread.
+
+    A node that has had no sample for `stale_after` seconds is summarized
+    with `stale: "true"`; after `expire_after` seconds its readings are
+    dropped, so a dead source does not pass old numbers off as current.
+    """
+
+    def __init__(
+        self,
+        capacity: int = DEFAULT_CAPACITY,
+        stale_after: Optional[float] = None,
+        expire_after: Optional[float] = None,
+    ) -> None:
+        self.capacity = capacity
+        self.stale_after = stale_after
+        self.expire_after = expire_after
+        self._lock = threading.Lock()
+        self._buffers: Dict[Tuple[str, str], Deque[float]] = {}
+        # node id -> time.monotonic() of its latest sample
+        self._last: Dict[str, float] = {}
+
+    def add(self, node_id: str, readings: Dict[str, str]) -> None:
+        with self._lock:
+            self._last[node_id] = time.monotonic()
+            for key, raw in readings.items():
+                try:
+                    value = float(raw)
+                except (TypeError, ValueError):
+                    continue
+                buf = self._buffers.get((node_id, key))
+                if buf is None:
+                    buf = self._buffers[(node_id, key)] = collections.deque(maxlen=self.capacity)
+                buf.append(value)
+
+    def summary(self) -> Dict[str, Dict[str, str]]:
+        """Per node: latest value plus `<metric>_min/_avg/_max/_p95` and a sample count."""
+        now = time.monotonic()
+        with self._lock:
+            if self.expire_after is not None:
+                expired = {n for n, at in self._last.items() if now - at > self.expire_after}
+                for key in [k for k in self._buffers if k[0] in expired]:
+                    del self._buffers[key]
+                for node_id in expired:
+                    del self._last[node_id]
+            snapshot = {k: list(v) for k, v in self._buffers.items()}
+            last = dict(self._last)
+        out: Dict[str, Dict[str, str]] = {}
+        for (node_id, key), values in snapshot.items():
+            if not values:
+                continue
+            ordered = sorted(values)
+            entry = out.setdefault(node_id, {})
+            entry[key] = _fmt(values[-1])
+            entry[f"{key}_min"] = _fmt(ordered[0])
+            entry[f"{key}_avg"] = _fmt(sum(values) / len(values))
+            entry[f"{key}_max"] = _fmt(ordered[-1])
+            entry[f"{key}_p95"] = _fmt(percentile(ordered, 95))
+            entry["samples"] = str(max(len(values), int(entry.get("samples", "0"))))
+        if self.stale_after is not None:
+            for node_id, entry in out.items():
+                if now - last.get(node_id, now) > self.stale_after:
+                    entry["stale"] = "true"
+        return out
+
+    def overlay(self) -> Telemetry:
+        return {"collected_at": time.time(), "nodes": self.summary()}
+
+
+class NvidiaSmiSampler:
+    """One long-lived `nvidia-smi --query-gpu ... --loop-ms` feeding a SampleStore.
+
+    nvidia-smi prints a CSV line per GPU every interval; lines are parsed as
+    they arrive, so sampling costs one process for the sampler's lifetime
+    rather than one per sample. If the process exits (driver reset, killed),
+    it is restarted after RESTART_BACKOFF_S, doubling while restarts keep
+    failing. `command` replaces the nvidia-smi argv prefix (e.g. a stub
+    script that emits the same CSV).
+    """
+
+    def __init__(
+        self,
+        store: SampleStore,
+        interval_ms: int = 1000,
+        command: Optional[List[str]] = None,
+        backoff: float = RESTART_BACKOFF_S,
+        max_backoff: float = MAX_RESTART_BACKOFF_S,
+    ) -> None:
+        self.store = store
+        self.argv = list(command or ["nvidia-smi"]) + [
+            f"--query-gpu={NVIDIA_TELEMETRY_FIELDS}",
+            "--format=csv,noheader,nounits",
+            f"--loop-ms={interval_ms}",
+        ]
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.restarts = 0
+        self._lock = threading.Lock()
+        self._proc: Optional[subprocess.Popen] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _spawn(self) -> Optional[subprocess.Popen]:
+        try:
+            proc = subprocess.Popen(
+                self.argv,
+                stdout=subprocess.PIPE,
+                stderr=subprocess.DEVNULL,
+                text=True,
+                bufsize=1,
+                start_new_session=True,
+            )
+        except OSError:
+            return None
+        with self._lock:
+            self._proc = proc
+            # stop() may have run while spawning
+            if self._stop.is_set():
+                _kill(proc)
+        return proc
+
+    def start(self) -> bool:
+        """Spawn the stream; False when the tool cannot be started."""
+        proc = self._spawn()
+        if proc is None:
+            return False
+        self._thread = threading.Thread(target=self._run, args=(proc,), name="toposcope-nvidia-sampler", daemon=True)
+        self._thread.start()
+        return True
+
+    def _read(self, proc: subprocess.Popen) -> int:
+        """Feed the store until `proc` ends; returns the samples read."""
+        count = 0
+        if proc.stdout is not None:
+            for line in proc.stdout:
+                parsed = _parse_nvidia_telemetry_line(line)
+                if parsed:
+                    self.store.add(parsed[0], parsed[1])
+                    count += 1
+        proc.wait()
+        return count
+
+    def _run(self, proc: Optional[subprocess.Popen]) -> None:
+        delay = self.backoff
+        while not self._stop.is_set():
+            if proc is not None and self._read(proc):
+                delay = self.backoff  # it worked for a while: restart promptly
+            if self._stop.wait(delay):
+                break
+            delay = min(delay * 2, self.max_backoff)
+            proc = self._spawn()
+            self.restarts += 1
+
+    def running(self) -> bool:
+        """Whether the sampler is live (its process may be between restarts)."""
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        with self._lock:
+            proc = self._proc
+        if proc is not None:
+            _kill(proc)
+            proc.wait()
+        if self._thread is not None:
+            self._thread.join(timeout=1.0)
+
+
+class RocmPoller:
+    """Polls AMD GPU readings on a thread at a fixed interval.
+
+    rocm-smi has no streaming mode, so this reads amdgpu's sysfs/hwmon files
+    directly (no process per sample) and spawns rocm-smi only on hosts
+    without them.
+    """
+
+    def __init__(self, store: SampleStore, interval_ms: int = 1000) -> None:
+        self.store = store
+        self.interval = interval_ms / 1000.0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+        self._ctx = ScanContext()
+
+    def poll_once(self) -> int:
+        with use_scan(self._ctx):
+            readings = _collect_rocm_telemetry() or {}
+        for node_id, values in readings.items():
+            self.store.add(node_id, {k: v for k, v in values.items() if k in GPU_TELEMETRY_KEYS})
+        return len(readings)
+
+    def start(self) -> bool:
+        """Start polling; False when no AMD GPU reports readings."""
+        if not self.poll_once():
+            return False
+        self._thread = threading.Thread(target=self._loop, name="toposcope-rocm-poller", daemon=True)
+        self._thread.start()
+        return True
+
+    def _loop(self) -> None:
+        while not self._stop.wait(self.interval):
+            self.poll_once()
+
+    def running(self) -> bool:
+        return self._thread is not None and self._thread.is_alive()
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
@@ -0,0 +1,231 @@
+# Minimal SMBIOS (DMI) table decoder for the structures TopoScope uses:
+# system (1), baseboard (2), processor (4), memory array (16) and memory
+# device (17). Offsets follow the DMTF SMBIOS reference specification; fields
+# beyond a structure's length are simply absent. Values are shaped like
+# dmidecode's output so callers can share code with the dmidecode parsers.
+from __future__ import annotations
+
+import struct
+from dataclasses import dataclass, field
+from typing import Dict, List, Optional, Tuple
+
+from .hostio import HostIO
+
+SMBIOS_TABLE_PATH = "/sys/firmware/dmi/tables/DMI"
+SMBIOS_ENTRY_POINT_PATH = "/sys/firmware/dmi/tables/smbios_entry_point"
+
+# Type 17 "Memory Type" values (SMBIOS 3.7, 7.18.2)
+_MEMORY_TYPES = {
+    0x01: "Other", 0x02: "Unknown", 0x03: "DRAM", 0x04: "EDRAM", 0x05: "VRAM",
+    0x06: "SRAM", 0x07: "RAM", 0x08: "ROM", 0x09: "Flash", 0x0A: "EEPROM",
+    0x0B: "FEPROM", 0x0C: "EPROM", 0x0D: "CDRAM", 0x0E: "3DRAM", 0x0F: "SDRAM",
+    0x10: "SGRAM", 0x11: "RDRAM", 0x12: "DDR", 0x13: "DDR2", 0x14: "DDR2 FB-DIMM",
+    0x18: "DDR3", 0x19: "FBD2", 0x1A: "DDR4", 0x1B: "LPDDR", 0x1C: "LPDDR2",
+    0x1D: "LPDDR3", 0x1E: "LPDDR4", 0x1F: "Logical non-volatile device",
+    0x20: "HBM", 0x21: "HBM2", 0x22: "DDR5", 0x23: "LPDDR5", 0x24: "HBM3",
+}
+
+# Type 16 "Memory Error Correction" values (7.17.3)
+_ERROR_CORRECTION = {
+    0x01: "Other", 0x02: "Unknown", 0x03: "None", 0x04: "Parity",
+    0x05: "Single-bit ECC", 0x06: "Multi-bit ECC", 0x07: "CRC",
+}
+
+
+@dataclass
+class SmbiosStructure:
+    type: int
+    handle: int
+    data: bytes  # formatted area, including the 4-byte header
+    strings: List[str] = field(default_factory=list)
+
+    def byte(self, offset: int) -> Optional[int]:
+        return self.data[offset] if offset < len(self.data) else None
+
+    def word(self, offset: int) -> Optional[int]:
+        if offset + 2 > len(self.data):
+            return None
+        return struct.unpack_from("<H", self.data, offset)[0]
+
+    def dword(self, offset: int) -> Optional[int]:
+        if offset + 4 > len(self.data):
+            return None
+        return struct.unpack_from("<I", self.data, offset)[0]
+
+    def string(self, offset: int) -> str:
+        """Resolve a 1-based string reference stored at `offset` ("" if unset)."""
+        idx = self.byte(offset)
+        if not idx or idx > len(self.strings):
+            return ""
+        return self.strings[idx - 1].strip()
+
+
+def parse_entry_point(data: bytes) -> Optional[Tuple[int, int]]:
+    """Return the (major, minor) SMBIOS version from an entry point blob."""
+    if data[:5] == b"_SM3_" and len(data) >= 9:
+        return data[7], data[8]
+    if data[:4] == b"_SM_" and len(data) >= 8:
+        return data[6], data[7]
+    return None
+
+
+def parse_table(data: bytes) -> List[SmbiosStructure]:
+    """Split a raw SMBIOS table into structures; stops at end-of-table (127)."""
+    structs: List[SmbiosStructure] = []
+    pos = 0
+    size = len(data)
+    while pos + 4 <= size:
+        stype, length, handle = struct.unpack_from("<BBH", data, pos)
+        if length < 4 or pos + length > size:
+            break
+        formatted = data[pos:pos + length]
+        # String set follows the formatted area and ends with a double NUL
+        end = data.find(b"\x00\x00", pos + length)
+        if end < 0:
+            end = size
+        raw_strings = data[pos + length:end]
+        strings = [s.decode("utf-8", "replace") for s in raw_strings.split(b"\x00")] if raw_strings else []
+        structs.append(SmbiosStructure(stype, handle, formatted, strings))
+        pos = end + 2
+        if stype == 127:
+            break
+    return structs
+
+
+def decode_system(structs: List[SmbiosStructure]) -> Dict[str, str]:
+    """System (type 1) and baseboard (type 2) identification."""
+    info: Dict[str, str] = {}
+    for s in structs:
+        if s.type == 1 and "system_vendor" not in info:
+            info["system_vendor"] = s.string(0x04)
+            info["system_product"] = s.string(0x05)
+            info["system_version"] = s.string(0x06)
+            info["system_serial"] = s.string(0x07)
+        elif s.type == 2 and "board_vendor" not in info:
+            info["board_vendor"] = s.string(0x04)
+            info["board_product"] = s.string(0x05)
+            info["board_version"] = s.string(0x06)
+            info["board_serial"] = s.string(0x07)
+    return {k: v for k, v in info.items() if v}
+
+
+def decode_processors(structs: List[SmbiosStructure]) -> List[Dict[str, str]]:
+    """Processor (type 4) entries with dmidecode-style keys."""
+    procs: List[Dict[str, str]] = []
+    for s in structs:
+        if s.type != 4:
+            continue
+        proc: Dict[str, str] = {
+            "Socket Designation": s.string(0x04),
+            "Manufacturer": s.string(0x07),
+            "Version": s.string(0x10),
+        }
+        max_speed = s.word(0x14)
+        cur_speed = s.word(0x16)
+        if max_speed:
+            proc["Max Speed"] = f"{max_speed} MHz"
+        if cur_speed:
+            proc["Current Speed"] = f"{cur_speed} MHz"
+        status = s.byte(0x18)
+        if status is not None:
+            proc["Populated"] = "yes" if status & 0x40 else "no"
+        if s.byte(0x20) is not None:
+            proc["Serial Number"] = s.string(0x20)
+            proc["Part Number"] = s.string(0x22)
+        cores = s.byte(0x23)
+        threads = s.byte(0x25)
+        if cores == 0xFF and s.word(0x2A) is not None:
+            cores = s.word(0x2A)
+        if threads == 0xFF and s.word(0x2E) is not None:
+            threads = s.word(0x2E)
+        if cores:
+            proc["Core Count"] = str(cores)
+        if threads:
+            proc["Thread Count"] = str(threads)
+        procs.append(proc)
+    return procs
+
+
+def decode_memory_arrays(structs: List[SmbiosStructure]) -> List[Dict[str, str]]:
+    """Physical memory arrays (type 16): ECC mode, capacity and slot count."""
+    arrays: List[Dict[str, str]] = []
+    for s in structs:
+        if s.type != 16:
+            continue
+        arr: Dict[str, str] = {}
+        ecc = s.byte(0x06)
+        if ecc is not None:
+            arr["Error Correction Type"] = _ERROR_CORRECTION.get(ecc, "Unknown")
+        cap_kb = s.dword(0x07)
+        if cap_kb == 0x80000000 and len(s.data) >= 0x17:
+            cap_bytes = struct.unpack_from("<Q", s.data, 0x0F)[0]
+            arr["Maximum Capacity"] = f"{cap_bytes // (1024 ** 3)} GB"
+        elif cap_kb:
+            arr["Maximum Capacity"] = f"{cap_kb // (1024 ** 2)} GB"
+        slots = s.word(0x0D)
+        if slots is not None:
+            arr["Number Of Devices"] = str(slots)
+        arrays.append(arr)
+    return arrays
+
+
+def _memory_size_mb(s: SmbiosStructure) -> Optional[int]:
+    size = s.word(0x0C)
+    if size is None or size == 0 or size == 0xFFFF:
+        return None
+    if size == 0x7FFF:
+        ext = s.dword(0x1C)
+        return (ext & 0x7FFFFFFF) if ext else None
+    if size & 0x8000:
+        return (size & 0x7FFF) // 1024  # KB granularity
+    return size
+
+
+def _memory_speed(s: SmbiosStructure, offset: int, ext_offset: int) -> str:
+    speed = s.word(offset)
+    if speed == 0xFFFF:
+        speed = s.dword(ext_offset)
+    return f"{speed} MT/s" if speed else ""
+
+
+def decode_memory_devices(structs: List[SmbiosStructure]) -> List[Dict[str, str]]:
+    """Memory devices (type 17) with the dmidecode keys `_parse_dmidecode_memory` reads.
+
+    Empty slots are reported with Size "No Module Installed" like dmidecode.
+    """
+    devices: List[Dict[str, str]] = []
+    for s in structs:
+        if s.type != 17:
+            continue
+        size_mb = _memory_size_mb(s)
+        dev: Dict[str, str] = {
+            "Size": f"{size_mb} MB" if size_mb else "No Module Installed",
+            "Locator": s.string(0x10),
+            "Bank Locator": s.string(0x11),
+            "Type": _MEMORY_TYPES.get(s.byte(0x12) or 0x02, "Unknown"),
+        }
+        speed = _memory_speed(s, 0x15, 0x54)
+        if speed:
+            dev["Speed"] = speed
+        configured = _memory_speed(s, 0x20, 0x58)
+        if configured:
+            dev["Configured Memory Speed"] = configured
+        if s.byte(0x17) is not None:
+            dev["Manufacturer"] = s.string(0x17)
+            dev["Serial Number"] = s.string(0x18)
+            dev["Part Number"] = s.string(0x1A)
+        devices.append(dev)
+    return devices
+
+
+def read_smbios(io: Optional[HostIO] = None) -> Optional[List[SmbiosStructure]]:
+    """Read and split the host's SMBIOS table; None when unreadable (usually non-root)."""
+    io = io or HostIO()
+    table = io.read_bytes(SMBIOS_TABLE_PATH)
+    if not table:
+        return None
+    # The table alone is enough; the entry point, when readable, validates it
+    entry_point = io.read_bytes(SMBIOS_ENTRY_POINT_PATH)
+    if entry_point is not None and parse_entry_point(entry_point) is None:
+        return None
+    return parse_table(table) or None
@@ -0,0 +1,34 @@
+from __future__ import annotations
+
+from typing import List
+
+from .model import Edge, Graph, Node
+
+# Kept apart from the collectors so `scan --demo` does not import them.
+
+
+def generate_demo_graph() -> Graph:
+    nodes: List[Node] = [
+        {"id": "root", "kind": "system", "label": "Demo System", "properties": {"os": "Linux"}},
+        {"id": "cpu:0", "kind": "cpu", "label": "Intel(R) Xeon(R) CPU", "properties": {"sockets": "1", "cores_per_socket": "8", "threads_per_core": "2"}},
+        {"id": "bus:memory", "kind": "memory", "label": "Memory", "properties": {"total_gb": "32.0"}},
+        {"id": "dimm:A1", "kind": "dimm", "label": "DIMM A1", "properties": {"slot": "A1", "size_gb": "16.0", "type": "DDR4", "speed": "2666 MT/s"}},
+        {"id": "dimm:B1", "kind": "dimm", "label": "DIMM B1", "properties": {"slot": "B1", "size_gb": "16.0", "type": "DDR4", "speed": "2666 MT/s"}},
+        {"id": "bus:pci", "kind": "bus", "label": "PCI Bus", "properties": {}},
+        {"id": "pci:00:00.0", "kind": "pci-device", "label": "Intel Corporation 440FX - 82441FX PMC [Natoma]", "properties": {"class": "Host bridge", "address": "00:00.0"}},
+        {"id": "pci:00:01.0", "kind": "pci-device", "label": "Intel Corporation 82371SB PIIX3 ISA [Natoma/Triton II]", "properties": {"class": "ISA bridge", "address": "00:01.0"}},
+        {"id": "bus:usb", "kind": "bus", "label": "USB Bus", "properties": {}},
+        {"id": "usb:001-002", "kind": "usb-device", "label": "Intel Corp. Integrated Hub", "properties": {"bus": "001", "device": "002", "vendor_id": "8087", "product_id": "0024"}},
+    ]
+    edges: List[Edge] = [
+        {"id": "e:root->cpu:0", "source": "root", "target": "cpu:0", "kind": "contains", "label": "contains"},
+        {"id": "e:root->bus:memory", "source": "root", "target": "bus:memory", "kind": "contains", "label": "contains"},
+        {"id": "e:bus:memory->dimm:A1", "source": "bus:memory", "target": "dimm:A1", "kind": "contains", "label": "dimm"},
+        {"id": "e:bus:memory->dimm:B1", "source": "bus:memory", "target": "dimm:B1", "kind": "contains", "label": "dimm"},
+        {"id": "e:root->bus:pci", "source": "root", "target": "bus:pci", "kind": "contains", "label": "contains"},
+        {"id": "e:bus:pci->pci:00:00.0", "source": "bus:pci", "target": "pci:00:00.0", "kind": "contains", "label": "device"},
+        {"id": "e:bus:pci->pci:00:01.0", "source": "bus:pci", "target": "pci:00:01.0", "kind": "contains", "label": "device"},
+        {"id": "e:root->bus:usb", "source": "root", "target": "bus:usb", "kind": "contains", "label": "contains"},
+        {"id": "e:bus:usb->usb:001-002", "source": "bus:usb", "target": "usb:001-002", "kind": "contains", "label": "device"},
+    ]
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,160 @@
+from __future__ import annotations
+
+import fnmatch
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .model import EdgeRecord, Graph, HardwareGraph, NodeRecord
+
+# {"nodes": {"added": [Node], "removed": [id], "changed": [Node]}, "edges": {...}}
+GraphDelta = Dict[str, Dict[str, List[Any]]]
+
+# {"nodes": {"added": [Node], "removed": [Node], "changed": [Change]}, "edges": {...}}
+# where Change is {"id", "kind", "label", "changes": {field: [old, new]}}
+GraphDiff = Dict[str, Dict[str, List[Any]]]
+
+# Keys that change between scans of the same hardware: GPU readings (in
+# `telemetry`, or in `properties` in older graphs) and the root's record of
+# the scan itself. Shell-style patterns, matched against property names.
+VOLATILE_KEYS = (
+    "temperature_c",
+    "power_w",
+    "utilization_gpu_pct",
+    "scan_status",
+    "collector_*",
+    "revision",
+)
+
+
+def _section_delta(old: List[Dict[str, Any]], new: List[Dict[str, Any]]) -> Dict[str, List[Any]]:
+    before = {item["id"]: item for item in old}
+    after = {item["id"]: item for item in new}
+    return {
+        "added": [item for item_id, item in after.items() if item_id not in before],
+        "removed": [item_id for item_id in before if item_id not in after],
+        "changed": [item for item_id, item in after.items() if item_id in before and before[item_id] != item],
+    }
+
+
+def graph_delta(old: Graph, new: Graph) -> GraphDelta:
+    """Nodes and edges added, removed (by id) or changed (new definition) from `old` to `new`.
+
+    Edges without an id are keyed on their conventional `e:<source>-><target>`.
+    """
+    return {
+        "nodes": _section_delta(old.get("nodes") or [], new.get("nodes") or []),
+        "edges": _section_delta(_with_edge_ids(old.get("edges") or []), _with_edge_ids(new.get("edges") or [])),
+    }
+
+
+def delta_is_empty(delta: GraphDelta) -> bool:
+    return not any(items for section in delta.values() for items in section.values())
+
+
+def apply_delta(graph: Graph, delta: GraphDelta) -> Graph:
+    """Return `graph` with `delta` applied; `apply_delta(a, graph_delta(a, b))` equals `b` up to order."""
+    g = HardwareGraph.from_dict(graph)
+    for edge_id in delta["edges"]["removed"]:
+        g.remove_edge(edge_id)
+    for node_id in delta["nodes"]["removed"]:
+        g.remove_node(node_id)
+    for node in delta["nodes"]["added"] + delta["nodes"]["changed"]:
+        g.add_node(NodeRecord.from_dict(node), replace=True)
+    for edge in delta["edges"]["added"] + delta["edges"]["changed"]:
+        g.add_edge(EdgeRecord.from_dict(edge), replace=True)
+    return g.to_dict()
+
+
+def _key_matcher(patterns: Iterable[str]) -> Any:
+    patterns = list(patterns)
+    if not patterns:
+        return lambda key: False
+    return re.compile("|".join(fnmatch.translate(p) for p in patterns)).match
+
+
+def _field_changes(
+    old: Dict[str, Any], new: Dict[str, Any], ignored: Any, telemetry: bool
+) -> Dict[str, List[Any]]:
+    """Per-field [old, new] pairs; nested property/telemetry keys as `properties.<key>`."""
+    changes: Dict[str, List[Any]] = {}
+    for field in old.keys() | new.keys():
+        if field == "id" or ignored(field):
+            continue
+        a, b = old.get(field), new.get(field)
+        if field in ("properties", "telemetry"):
+            if field == "telemetry" and not telemetry:
+                continue
+            a, b = a or {}, b or {}
+            if a == b:
+                continue
+            for key in a.keys() | b.keys():
+                if not ignored(key) and a.get(key) != b.get(key):
+                    changes[f"{field}.{key}"] = [a.get(key), b.get(key)]
+        elif a != b:
+            changes[field] = [a, b]
+    return dict(sorted(changes.items()))
+
+
+def _items_diff(
+    old: List[Dict[str, Any]], new: List[Dict[str, Any]], ignored: Any, telemetry: bool
+) -> Dict[str, List[Any]]:
+    before = {item["id"]: item for item in old}
+    after = {item["id"]: item for item in new}
+    changed = []
+    for item_id, item in after.items():
+        prev = before.get(item_id)
+        if prev is None or prev == item:
+            continue
+        fields = _field_changes(prev, item, ignored, telemetry)
+        if fields:
+            entry = {"id": item_id}
+            for key in ("kind", "label", "source", "target"):
+                if key in item:
+                    entry[key] = item[key]
+            entry["changes"] = fields
+            changed.append(entry)
+    return {
+        "added": [item for item_id, item in after.items() if item_id not in before],
+        "removed": [item for item_id, item in before.items() if item_id not in after],
+        "changed": changed,
+    }
+
+
+def _with_edge_ids(edges: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
+    return [e if e.get("id") else dict(e, id=f"e:{e['source']}->{e['target']}") for e in edges]
+
+
+def diff_graphs(
+    old: Graph,
+    new: Graph,
+    ignore: Optional[Iterable[str]] = VOLATILE_KEYS,
+    telemetry: bool = False,
+) -> GraphDiff:
+    """Structural diff of two scans: nodes and edges added, removed and changed, field by field.
+
+    Nodes and edges are matched by id in one pass over each graph. Property
+    names matching an `ignore` pattern (default VOLATILE_KEYS) are skipped;
+    so is `telemetry` unless asked for. Embedded layouts are never compared.
+    """
+    ignored = _key_matcher(ignore or ())
+    return {
+        "nodes": _items_diff(old.get("nodes") or [], new.get("nodes") or [], ignored, telemetry),
+        "edges": _items_diff(
+            _with_edge_ids(old.get("edges") or []), _with_edge_ids(new.get("edges") or []), ignored, telemetry
+        ),
+    }
+
+
+def diff_rows(diff: GraphDiff) -> List[Tuple[str, str, str, str, Any, Any]]:
+    """Flatten a diff to (change, section, id, field, old, new) rows for display."""
+    rows: List[Tuple[str, str, str, str, Any, Any]] = []
+    for section in ("nodes", "edges"):
+        part = diff[section]
+        for item in part["removed"]:
+            rows.append(("removed", section, item["id"], "", item.get("label", ""), None))
+        for item in part["added"]:
+            rows.append(("added", section, item["id"], "", None, item.get("label", "")))
+        for item in part["changed"]:
+            for field, (a, b) in item["changes"].items():
+                rows.append(("changed", section, item["id"], field, a, b))
+    return rows
@@ -0,0 +1,75 @@
+from __future__ import annotations
+
+import json
+from pathlib import Path
+from typing import IO
+
+from .model import Graph
+
+# Formats `scan --format` writes; every reader here detects them from the
+# file's first bytes, whatever its name
+GRAPH_FORMATS = ("json", "ndjson", "binary")
+_SNIFF_BYTES = 16
+
+
+def sniff_format(head: bytes) -> str:
+    """The format of a graph file starting with `head` (JSON unless recognised)."""
+    from .binary import is_binary
+    from .ndjson import is_ndjson
+
+    if is_binary(head):
+        return "binary"
+    if is_ndjson(head):
+        return "ndjson"
+    return "json"
+
+
+def graph_format(path: Path) -> str:
+    with path.open("rb") as f:
+        return sniff_format(f.read(_SNIFF_BYTES))
+
+
+def load_graph(path: Path) -> Graph:
+    """The graph in `path`, in any of GRAPH_FORMATS.
+
+    Raises OSError if it cannot be read and ValueError if it is not a graph
+    (including truncated NDJSON and damaged binary files).
+    """
+    with path.open("rb") as f:
+        fmt = sniff_format(f.read(_SNIFF_BYTES))
+        f.seek(0)
+        if fmt == "binary":
+            from .binary import read_binary
+
+            graph = read_binary(f)
+        elif fmt == "ndjson":
+            import io
+
+            from .ndjson import read_ndjson
+
+            graph = read_ndjson(io.TextIOWrapper(f, encoding="utf-8", newline=""))
+        else:
+            graph = json.load(f)
+    if not isinstance(graph, dict) or not isinstance(graph.get("nodes"), list):
+        raise ValueError("not a graph (no node list)")
+    return graph
+
+
+def dump_graph(graph: Graph, f: IO[bytes], fmt: str = "json") -> None:
+    """Write `graph` to a binary stream in one of GRAPH_FORMATS."""
+    if fmt == "binary":
+        from .binary import write_binary
+
+        write_binary(graph, f)
+    elif fmt == "ndjson":
+        import io
+
+        from .ndjson import write_ndjson
+
+        text = io.TextIOWrapper(f, encoding="utf-8", newline="\n")
+        write_ndjson(graph, text)
+        text.detach()
+    elif fmt == "json":
+        f.write(json.dumps(graph, indent=2).encode("utf-8"))
+    else:
+        raise ValueError(f"unknown graph format {fmt!r} (expected one of {', '.join(GRAPH_FORMATS)})")
@@ -0,0 +1,213 @@
+from __future__ import annotations
+
+import hashlib
+import json
+import os
+import sqlite3
+import time
+import zlib
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from .model import Graph
+
+HISTORY_FILE = "history.sqlite"
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS blobs (
+    hash TEXT PRIMARY KEY,
+    data BLOB NOT NULL
+);
+CREATE TABLE IF NOT EXISTS snapshots (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    host TEXT NOT NULL,
+    taken_at REAL NOT NULL,
+    hash TEXT NOT NULL,
+    nodes INTEGER NOT NULL,
+    edges INTEGER NOT NULL,
+    new_bytes INTEGER NOT NULL
+);
+CREATE INDEX IF NOT EXISTS snapshots_host ON snapshots (host, taken_at);
+CREATE TABLE IF NOT EXISTS sections (
+    snapshot INTEGER NOT NULL REFERENCES snapshots (id) ON DELETE CASCADE,
+    position INTEGER NOT NULL,
+    name TEXT NOT NULL,
+    blob TEXT NOT NULL,
+    PRIMARY KEY (snapshot, position)
+);
+CREATE INDEX IF NOT EXISTS sections_blob ON sections (blob);
+"""
+
+
+def default_state_dir() -> str:
+    """`$XDG_STATE_HOME/toposcope`, falling back to `~/.local/state/toposcope`."""
+    base = os.environ.get("XDG_STATE_HOME") or os.path.join(os.path.expanduser("~"), ".local", "state")
+    return os.path.join(base, "toposcope")
+
+
+def _canonical(items: List[Dict[str, Any]]) -> bytes:
+    return json.dumps(
+        sorted(items, key=lambda i: i["id"]), sort_keys=True, separators=(",", ":"), ensure_ascii=False
+    ).encode("utf-8")
+
+
+def graph_sections(graph: Graph) -> List[Tuple[str, bytes]]:
+    """Split `graph` into canonical sections: one per node kind, holding those
+    nodes and the edges into them, in first-seen kind order.
+
+    Telemetry and embedded layouts are left out, so a section only changes
+    when inventory does. A rescan of unchanged hardware yields the same bytes.
+    """
+    kinds: Dict[str, str] = {}
+    nodes: Dict[str, List[Dict[str, Any]]] = {}
+    for n in graph.get("nodes") or []:
+        kind = n.get("kind", "")
+        kinds[n["id"]] = kind
+        nodes.setdefault(kind, []).append({k: v for k, v in n.items() if k != "telemetry"})
+    edges: Dict[str, List[Dict[str, Any]]] = {}
+    for e in graph.get("edges") or []:
+        # Edges to unknown nodes still need a home
+        edges.setdefault(kinds.get(e["target"], ""), []).append(dict(e, id=e.get("id") or f"e:{e['source']}->{e['target']}"))
+    names = list(nodes) + [k for k in edges if k not in nodes]
+    return [
+        (name, _canonical(nodes.get(name, [])) + b"\n" + _canonical(edges.get(name, [])))
+        for name in names
+    ]
+
+
+def _digest(data: bytes) -> str:
+    return hashlib.sha256(data).hexdigest()
+
+
+class HistoryStore:
+    """Scan snapshots in one SQLite file, deduplicated by section.
+
+    Each snapshot is a list of content-addressed sections (see
+    graph_sections), stored zlib-compressed once no matter how many
+    snapshots share them; a snapshot of unchanged hardware adds a row per
+    section and no data. Listing reads only the snapshot table.
+    """
+
+    def __init__(self, path: Optional[str] = None) -> None:
+        if path is None:
+            path = os.path.join(default_state_dir(), HISTORY_FILE)
+        parent = os.path.dirname(path)
+        if parent:
+            os.makedirs(parent, exist_ok=True)
+        self.path = path
+        self._db = sqlite3.connect(path)
+        self._db.execute("PRAGMA foreign_keys = ON")
+        self._db.execute("PRAGMA journal_mode = WAL")
+        self._db.executescript(_SCHEMA)
+
+    def close(self) -> None:
+        self._db.close()
+
+    def __enter__(self) -> "HistoryStore":
+        return self
+
+    def __exit__(self, *exc: Any) -> None:
+        self.close()
+
+    def add(self, graph: Graph, host: Optional[str] = None, taken_at: Optional[float] = None) -> Dict[str, Any]:
+        """Store a snapshot of `graph`; returns its listing row.
+
+        `host` defaults to the root node's label (the scanned host's name).
+        """
+        if host is None:
+            nodes = graph.get("nodes") or []
+            host = nodes[0].get("label", "") if nodes else ""
+        sections = graph_sections(graph)
+        hashes = [_digest(data) for _, data in sections]
+        new_bytes = 0
+        with self._db:
+            for (_, data), digest in zip(sections, hashes):
+                packed = zlib.compress(data, 6)
+                cur = self._db.execute("INSERT OR IGNORE INTO blobs (hash, data) VALUES (?, ?)", (digest, packed))
+                if cur.rowcount:
+                    new_bytes += len(packed)
+            snapshot_hash = _digest("\n".join(f"{n}:{h}" for (n, _), h in zip(sections, hashes)).encode())
+            cur = self._db.execute(
+                "INSERT INTO snapshots (host, taken_at, hash, nodes, edges, new_bytes) VALUES (?, ?, ?, ?, ?, ?)",
+                (
+                    host,
+                    time.time() if taken_at is None else taken_at,
+                    snapshot_hash,
+                    len(graph.get("nodes") or []),
+                    len(graph.get("edges") or []),
+                    new_bytes,
+                ),
+            )
+            snapshot_id = cur.lastrowid
+            self._db.executemany(
+                "INSERT INTO sections (snapshot, position, name, blob) VALUES (?, ?, ?, ?)",
+                [(snapshot_id, i, name, digest) for i, ((name, _), digest) in enumerate(zip(sections, hashes))],
+            )
+        return self.info(snapshot_id)  # type: ignore[arg-type,return-value]
+
+    _COLUMNS = ("id", "host", "taken_at", "hash", "nodes", "edges", "new_bytes")
+
+    def info(self, snapshot_id: int) -> Optional[Dict[str, Any]]:
+        row = self._db.execute(
+            f"SELECT {', '.join(self._COLUMNS)} FROM snapshots WHERE id = ?", (snapshot_id,)
+        ).fetchone()
+        return dict(zip(self._COLUMNS, row)) if row else None
+
+    def list(self, host: Optional[str] = None, limit: Optional[int] = None) -> List[Dict[str, Any]]:
+        """Snapshots, newest first, without loading their contents."""
+        sql = f"SELECT {', '.join(self._COLUMNS)} FROM snapshots"
+        args: List[Any] = []
+        if host is not None:
+            sql += " WHERE host = ?"
+            args.append(host)
+        sql += " ORDER BY taken_at DESC, id DESC"
+        if limit is not None:
+            sql += " LIMIT ?"
+            args.append(limit)
+        return [dict(zip(self._COLUMNS, row)) for row in self._db.execute(sql, args)]
+
+    def _sections(self, snapshot_id: int) -> Iterator[bytes]:
+        rows = self._db.execute(
+            "SELECT b.data FROM sections s JOIN blobs b ON b.hash = s.blob WHERE s.snapshot = ? ORDER BY s.position",
+            (snapshot_id,),
+        )
+        for (packed,) in rows:
+            yield zlib.decompress(packed)
+
+    def get(self, snapshot_id: int) -> Optional[Graph]:
+        """The stored graph (without telemetry; nodes grouped by kind), or None."""
+        if self.info(snapshot_id) is None:
+            return None
+        graph: Graph = {"nodes": [], "edges": []}
+        for data in self._sections(snapshot_id):
+            nodes, _, edges = data.partition(b"\n")
+            graph["nodes"].extend(json.loads(nodes))
+            graph["edges"].extend(json.loads(edges))
+        return graph
+
+    def prune(
+        self, keep_last: Optional[int] = None, older_than: Optional[float] = None, host: Optional[str] = None
+    ) -> Tuple[int, int]:
+        """Drop snapshots beyond the newest `keep_last` per host and/or older
+        than `older_than` seconds, then sections no snapshot uses.
+
+        Returns (snapshots, blobs) removed.
+        """
+        doomed: List[int] = []
+        hosts = [host] if host is not None else [r[0] for r in self._db.execute("SELECT DISTINCT host FROM snapshots")]
+        cutoff = time.time() - older_than if older_than is not None else None
+        for h in hosts:
+            rows = self._db.execute(
+                "SELECT id, taken_at FROM snapshots WHERE host = ? ORDER BY taken_at DESC, id DESC", (h,)
+            ).fetchall()
+            for i, (snapshot_id, taken_at) in enumerate(rows):
+                if (keep_last is not None and i >= keep_last) or (cutoff is not None and taken_at < cutoff):
+                    doomed.append(snapshot_id)
+        with self._db:
+            self._db.executemany("DELETE FROM snapshots WHERE id = ?", [(i,) for i in doomed])
+            cur = self._db.execute("DELETE FROM blobs WHERE hash NOT IN (SELECT blob FROM sections)")
+            blobs = cur.rowcount
+        return len(doomed), blobs
+
+    def vacuum(self) -> None:
+        """Return freed pages to the filesystem."""
+        self._db.execute("VACUUM")
@@ -0,0 +1,312 @@
+from __future__ import annotations
+
+import collections
+import json
+import math
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+from .model import Graph, HardwareGraph
+
+# Positions keyed by node id, as [x, y] in viewer (Cytoscape model) pixels
+Positions = Dict[str, List[float]]
+
+# Names match the viewer's layout buttons. "compact" is force-directed and
+# needs NumPy; without it the viewer falls back to its own cose layout.
+LAYOUT_NAMES = ("radial", "hierarchy", "compact")
+
+# Viewer cards are 260px wide and roughly 80-140px tall
+NODE_SPACING = 300.0
+RING_GAP = 320.0
+LAYER_GAP = 220.0
+# Leaf children beyond this many per row wrap into a block under their parent
+WRAP = 32
+# Force layout is O(n^2) per iteration; larger graphs keep radial/hierarchy only
+FORCE_MAX_NODES = 1500
+
+
+def _fnv1a_utf16(text: str) -> str:
+    """The viewer's fnv1a(), bit for bit: UTF-16 code units, float multiply, ToUint32."""
+    h = 0x811C9DC5
+    data = text.encode("utf-16-le", "surrogatepass")
+    for i in range(0, len(data), 2):
+        h ^= data[i] | (data[i + 1] << 8)
+        # JS multiplies as doubles; products above 2**53 lose low bits before >>> 0
+        h = int(float(h * 0x01000193)) % (1 << 32)
+    return format(h, "x")
+
+
+def _js_sorted(values: List[str]) -> List[str]:
+    # Array.prototype.sort() compares UTF-16 code units, not code points
+    return sorted(values, key=lambda v: v.encode("utf-16-be", "surrogatepass"))
+
+
+def structure_hash(graph: Graph) -> str:
+    """Same value as the viewer's hashGraph(): node ids and edge endpoints only."""
+    ids = {
+        "n": _js_sorted([n["id"] for n in graph.get("nodes") or []]),
+        "e": _js_sorted([f"{e['source']}->{e['target']}" for e in graph.get("edges") or []]),
+    }
+    return _fnv1a_utf16(json.dumps(ids, ensure_ascii=False, separators=(",", ":")))
+
+
+def _tree(g: HardwareGraph) -> Tuple[List[str], Dict[str, List[str]], Dict[str, int]]:
+    """Spanning tree by BFS from the roots: (roots, children, depth).
+
+    A node's first-discovered parent owns it. Roots are `root` if present,
+    then any node unreachable so far, in graph order.
+    """
+    children: Dict[str, List[str]] = {}
+    depth: Dict[str, int] = {}
+    roots: List[str] = []
+    order = [n.id for n in g.nodes()]
+    if "root" in g:
+        order.remove("root")
+        order.insert(0, "root")
+    for start in order:
+        if start in depth:
+            continue
+        roots.append(start)
+        depth[start] = 0
+        children[start] = []
+        queue = collections.deque([start])
+        while queue:
+            cur = queue.popleft()
+            for child in g.children(cur):
+                if child.id in depth:
+                    continue
+                depth[child.id] = depth[cur] + 1
+                children[cur].append(child.id)
+                children[child.id] = []
+                queue.append(child.id)
+    return roots, children, depth
+
+
+def _leaves(node: str, children: Dict[str, List[str]], memo: Dict[str, int]) -> int:
+    stack = [(node, False)]
+    while stack:
+        cur, done = stack.pop()
+        if done:
+            memo[cur] = max(1, sum(memo[c] for c in children[cur]))
+            continue
+        stack.append((cur, True))
+        stack.extend((c, False) for c in children[cur])
+    return memo[node]
+
+
+def radial_layout(g: HardwareGraph) -> Positions:
+    """Rings by tree depth around the root; each subtree gets an angular wedge sized by its leaves."""
+    roots, children, depth = _tree(g)
+    if not roots:
+        return {}
+    # Extra roots hang off a virtual centre so everything shares one set of rings
+    top = "\0"
+    children[top] = roots
+    weight: Dict[str, int] = {}
+    _leaves(top, children, weight)
+
+    angle: Dict[str, float] = {}
+    stack = [(top, 0.0, 2 * math.pi)]
+    while stack:
+        node, start, span = stack.pop()
+        angle[node] = start + span / 2
+        total = weight[node]
+        for child in children[node]:
+            part = span * weight[child] / total
+            stack.append((child, start, part))
+            start += part
+
+    # Ring radius grows with the number of nodes on it so cards do not overlap
+    level = {n: (depth[n] + (1 if len(roots) > 1 else 0)) for n in depth}
+    per_ring = collections.Counter(level.values())
+    radius: Dict[int, float] = {0: 0.0}
+    for d in range(1, max(per_ring) + 1):
+        radius[d] = max(radius[d - 1] + RING_GAP, per_ring.get(d, 0) * NODE_SPACING / (2 * math.pi))
+
+    rings: Dict[int, List[str]] = collections.defaultdict(list)
+    for n, d in level.items():
+        rings[d].append(n)
+    out: Positions = {}
+    for d, members in rings.items():
+        r = radius[d]
+        if r == 0:
+            for n in members:
+                out[n] = [0.0, 0.0]
+            continue
+        # Wedges follow leaf counts, which can crowd light subtrees; enforce a
+        # minimum arc between neighbours on the ring
+        members.sort(key=lambda n: angle[n])
+        min_gap = NODE_SPACING / r
+        placed: List[float] = []
+        for n in members:
+            a = angle[n]
+            if placed and a - placed[-1] < min_gap:
+                a = placed[-1] + min_gap
+            placed.append(a)
+        shift = (sum(angle[n] for n in members) - sum(placed)) / len(members)
+        for n, a in zip(members, placed):
+            a += shift
+            out[n] = [round(r * math.cos(a), 1), round(r * math.sin(a), 1)]
+    return out
+
+
+def layered_layout(g: HardwareGraph) -> Positions:
+    """Top-down tree: one layer per depth, parents centred over their children.
+
+    Runs of leaf children wrap into blocks `WRAP` cards wide, so a bus with
+    thousands of functions stays compact instead of one very long row.
+    """
+    roots, children, depth = _tree(g)
+    out: Positions = {}
+    cursor = 0.0  # next free x slot
+
+    def place(node: str) -> Tuple[float, float]:
+        """Lay out `node`'s subtree from `cursor`; return its (left, right) extent."""
+        nonlocal cursor
+        y = depth[node] * LAYER_GAP
+        kids = children[node]
+        if not kids:
+            out[node] = [cursor, y]
+            cursor += NODE_SPACING
+            return out[node][0], out[node][0]
+        leaves = [k for k in kids if not children[k]]
+        inner = [k for k in kids if children[k]]
+        left = right = None
+        for k in inner:
+            lo, hi = place(k)
+            left = lo if left is None else left
+            right = hi
+        if len(leaves) > WRAP:
+            x0 = cursor
+            for i, k in enumerate(leaves):
+                row, col = divmod(i, WRAP)
+                out[k] = [x0 + col * NODE_SPACING, y + LAYER_GAP * (1 + row * 0.75)]
+            cursor = x0 + WRAP * NODE_SPACING
+            left = x0 if left is None else left
+            right = cursor - NODE_SPACING
+        else:
+            for k in leaves:
+                lo, hi = place(k)
+                left = lo if left is None else left
+                right = hi
+        out[node] = [(left + right) / 2, y]  # type: ignore[operator]
+        return left, right  # type: ignore[return-value]
+
+    for r in roots:
+        place(r)
+        cursor += NODE_SPACING
+    return {k: [round(v[0], 1), round(v[1], 1)] for k, v in out.items()}
+
+
+def force_layout(g: HardwareGraph, iterations: int = 80, seed: Optional[Positions] = None) -> Positions:
+    """Fruchterman-Reingold with NumPy, started from `seed` (radial by default).
+
+    Raises ImportError without NumPy.
+    """
+    import numpy as np
+
+    ids = [n.id for n in g.nodes()]
+    n = len(ids)
+    if n == 0:
+        return {}
+    index = {i: k for k, i in enumerate(ids)}
+    seed = seed or radial_layout(g)
+    pos = np.array([seed.get(i, [0.0, 0.0]) for i in ids], dtype=np.float64)
+    # Break ties between coincident starts deterministically
+    pos += np.random.default_rng(0).normal(scale=1.0, size=pos.shape)
+    pairs = [(index[e.source], index[e.target]) for e in g.edges() if e.source in index and e.target in index]
+    src = np.array([p[0] for p in pairs], dtype=np.intp)
+    dst = np.array([p[1] for p in pairs], dtype=np.intp)
+
+    k = NODE_SPACING
+    temp = k * math.sqrt(n)
+    chunk = max(1, (1 << 21) // n)  # bounds the chunk x n distance matrices
+    x, y = pos[:, 0], pos[:, 1]
+    for step in range(iterations):
+        disp = np.zeros_like(pos)
+        for lo in range(0, n, chunk):
+            dx = x[lo:lo + chunk, None] - x[None, :]
+            dy = y[lo:lo + chunk, None] - y[None, :]
+            inv = (k * k) / np.maximum(dx * dx + dy * dy, 1.0)
+            disp[lo:lo + chunk, 0] = np.einsum("ij,ij->i", dx, inv)
+            disp[lo:lo + chunk, 1] = np.einsum("ij,ij->i", dy, inv)
+        if len(src):
+            delta = pos[src] - pos[dst]
+            dist = np.maximum(np.sqrt((delta ** 2).sum(axis=1)), 1.0)
+            pull = delta * (dist / k)[:, None]
+            np.add.at(disp, src, -pull)
+            np.add.at(disp, dst, pull)
+        length = np.maximum(np.sqrt((disp ** 2).sum(axis=1)), 1e-9)
+        pos += disp / length[:, None] * np.minimum(length, temp)[:, None]
+        temp *= 1.0 - (step + 1) / (iterations + 1)
+    pos -= pos.mean(axis=0)
+    return {i: [round(float(x), 1), round(float(y), 1)] for i, (x, y) in zip(ids, pos)}
+
+
+def compute_layouts(graph: Graph, structure: Optional[str] = None) -> Dict[str, Any]:
+    """All available layouts for `graph`: `{"hash": ..., "radial": Positions, ...}`."""
+    g = HardwareGraph.from_dict(graph)
+    layouts: Dict[str, Any] = {"hash": structure or structure_hash(graph)}
+    layouts["radial"] = radial_layout(g)
+    layouts["hierarchy"] = layered_layout(g)
+    if g.node_count() <= FORCE_MAX_NODES:
+        try:
+            layouts["compact"] = force_layout(g, seed=layouts["radial"])
+        except ImportError:
+            pass
+    return layouts
+
+
+class LayoutCache:
+    """Computed layouts on disk, one JSON file per structure hash.
+
+    Property or telemetry changes keep the hash, so rescans of the same
+    hardware reuse positions; failures to write are ignored.
+    """
+
+    def __init__(self, directory: Optional[str] = None) -> None:
+        if directory is None:
+            from .collect.cache import default_cache_dir
+
+            directory = os.path.join(default_cache_dir(), "layouts")
+        self.directory = directory
+
+    def _path(self, structure: str) -> str:
+        return os.path.join(self.directory, f"{structure}.json")
+
+    def get(self, structure: str) -> Optional[Dict[str, Any]]:
+        try:
+            with open(self._path(structure), "r", encoding="utf-8") as f:
+                data = json.load(f)
+        except (OSError, ValueError):
+            return None
+        return data if isinstance(data, dict) and data.get("hash") == structure else None
+
+    def put(self, layouts: Dict[str, Any]) -> None:
+        path = self._path(layouts["hash"])
+        tmp = f"{path}.{os.getpid()}.tmp"
+        try:
+            os.makedirs(self.directory, exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(layouts, f, separators=(",", ":"))
+            os.replace(tmp, path)
+        except OSError:
+            try:
+                os.unlink(tmp)
+            except OSError:
+                pass
+
+
+def layouts_for(graph: Graph, cache: Optional[LayoutCache] = None) -> Dict[str, Any]:
+    """Layouts for `graph`: embedded ones if still current, else cached, else computed (and cached)."""
+    structure = structure_hash(graph)
+    embedded = graph.get("layouts")  # type: ignore[misc]
+    if isinstance(embedded, dict) and embedded.get("hash") == structure:
+        return embedded
+    found = cache.get(structure) if cache is not None else None
+    if found is not None:
+        return found
+    layouts = compute_layouts(graph, structure)
+    if cache is not None:
+        cache.put(layouts)
+    return layouts
@@ -1,14 +1,17 @@
 from __future__ import annotations
 
-from dataclasses import dataclass, field
-from typing import Dict, List, Literal, TypedDict
+import sys
+from typing import Any, Dict, Iterator, List, Optional, TypedDict
 
 
 class Node(TypedDict, total=False):
     id: str
     kind: str
     label: str
+    # Static inventory: serials, firmware, capacities. Changes mean the hardware changed.
     properties: Dict[str, str]
+    # Volatile readings (temperature, power, utilization), refreshed independently
+    telemetry: Dict[str, str]
 
 
 class Edge(TypedDict, total=False):
@@ -19,6 +22,296 @@ class Edge(TypedDict, total=False):
     label: str
 
 
-class Graph(TypedDict):
+class _GraphBase(TypedDict):
     nodes: List[Node]
     edges: List[Edge]
+
+
+class Graph(_GraphBase, total=False):
+    # Precomputed viewer positions (see layout.py), keyed by structure hash
+    layouts: Dict[str, Any]
+
+
+class Telemetry(TypedDict):
+    """Telemetry overlay: readings keyed by node id, merged onto an inventory graph."""
+
+    collected_at: float
+    nodes: Dict[str, Dict[str, str]]
+
+
+_NODE_FIELDS = ("id", "kind", "label", "properties", "telemetry")
+_EDGE_FIELDS = ("id", "source", "target", "kind", "label")
+
+
+def _intern_props(props: Optional[Dict[str, Any]]) -> Optional[Dict[str, Any]]:
+    # Property keys repeat across thousands of nodes; share one string each
+    if props is None:
+        return None
+    return {sys.intern(k) if isinstance(k, str) else k: v for k, v in props.items()}
+
+
+class NodeRecord:
+    """Compact in-memory node. Fields outside the schema are kept in `extra`."""
+
+    __slots__ = ("id", "kind", "label", "properties", "telemetry", "extra")
+
+    def __init__(
+        self,
+        id: str,
+        kind: str = "",
+        label: str = "",
+        properties: Optional[Dict[str, Any]] = None,
+        extra: Optional[Dict[str, Any]] = None,
+        telemetry: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.kind = sys.intern(kind)
+        self.label = label
+        self.properties = _intern_props(properties)
+        self.telemetry = _intern_props(telemetry)
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, node: Node) -> "NodeRecord":
+        extra = {k: v for k, v in node.items() if k not in _NODE_FIELDS} or None
+        return cls(
+            node["id"],
+            node.get("kind", ""),
+            node.get("label", ""),
+            node.get("properties"),
+            extra,
+            node.get("telemetry"),
+        )
+
+    def to_dict(self) -> Node:
+        out: Dict[str, Any] = {"id": self.id, "kind": self.kind, "label": self.label}
+        if self.properties is not None:
+            out["properties"] = self.properties
+        if self.telemetry:
+            out["telemetry"] = self.telemetry
+        if self.extra:
+            out.update(self.extra)
+        return out  # type: ignore[return-value]
+
+
+class EdgeRecord:
+    """Compact in-memory edge. `kind`/`label` are None when absent from the source."""
+
+    __slots__ = ("id", "source", "target", "kind", "label", "extra")
+
+    def __init__(
+        self,
+        id: str,
+        source: str,
+        target: str,
+        kind: Optional[str] = None,
+        label: Optional[str] = None,
+        extra: Optional[Dict[str, Any]] = None,
+    ) -> None:
+        self.id = id
+        self.source = source
+        self.target = target
+        self.kind = sys.intern(kind) if kind is not None else None
+        self.label = sys.intern(label) if label is not None else None
+        self.extra = extra
+
+    @classmethod
+    def from_dict(cls, edge: Edge) -> "EdgeRecord":
+        extra = {k: v for k, v in edge.items() if k not in _EDGE_FIELDS} or None
+        edge_id = edge.get("id") or f"e:{edge['source']}->{edge['target']}"
+        return cls(edge_id, edge["source"], edge["target"], edge.get("kind"), edge.get("label"), extra)
+
+    def to_dict(self) -> Edge:
+        out: Dict[str, Any] = {"id": self.id, "source": self.source, "target": self.target}
+        if self.kind is not None:
+            out["kind"] = self.kind
+        if self.label is not None:
+            out["label"] = self.label
+        if self.extra:
+            out.update(self.extra)
+        return out  # type: ignore[return-value]
+
+
+class HardwareGraph:
+    """Indexed graph container that serializes to the `Graph` JSON schema.
+
+    Nodes and edges are kept in insertion order (which is the output order)
+    with an id index, forward/reverse adjacency and a per-kind index, so
+    lookups and neighbor queries are O(1) instead of list scans.
+    """
+
+    __slots__ = ("_nodes", "_edges", "_out", "_in", "_by_kind")
+
+    def __init__(self) -> None:
+        self._nodes: Dict[str, NodeRecord] = {}
+        self._edges: Dict[str, EdgeRecord] = {}
+        # node id -> {edge id: None}; dicts double as ordered sets
+        self._out: Dict[str, Dict[str, None]] = {}
+        self._in: Dict[str, Dict[str, None]] = {}
+        self._by_kind: Dict[str, Dict[str, None]] = {}
+
+    # -- construction -----------------------------------------------------
+
+    @classmethod
+    def from_dict(cls, graph: Graph) -> "HardwareGraph":
+        """Index a JSON graph. Duplicate node ids keep the last definition."""
+        g = cls()
+        for node in graph.get("nodes") or []:
+            g.add_node(NodeRecord.from_dict(node), replace=True)
+        for edge in graph.get("edges") or []:
+            g.add_edge(EdgeRecord.from_dict(edge), replace=True)
+        return g
+
+    def to_dict(self) -> Graph:
+        return {
+            "nodes": [n.to_dict() for n in self._nodes.values()],
+            "edges": [e.to_dict() for e in self._edges.values()],
+        }
+
+    def add_node(self, node: NodeRecord, replace: bool = False) -> NodeRecord:
+        existing = self._nodes.get(node.id)
+        if existing is not None:
+            if not replace:
+                raise ValueError(f"duplicate node id: {node.id}")
+            self._by_kind[existing.kind].pop(node.id, None)
+        self._nodes[node.id] = node
+        self._by_kind.setdefault(node.kind, {})[node.id] = None
+        self._out.setdefault(node.id, {})
+        self._in.setdefault(node.id, {})
+        return node
+
+    def add_edge(self, edge: EdgeRecord, replace: bool = False) -> EdgeRecord:
+        """Add an edge; its endpoints need not exist yet (fragments merge in any order)."""
+        existing = self._edges.get(edge.id)
+        if existing is not None:
+            if not replace:
+                raise ValueError(f"duplicate edge id: {edge.id}")
+            self._out.get(existing.source, {}).pop(edge.id, None)
+            self._in.get(existing.target, {}).pop(edge.id, None)
+        self._edges[edge.id] = edge
+        self._out.setdefault(edge.source, {})[edge.id] = None
+        self._in.setdefault(edge.target, {})[edge.id] = None
+        return edge
+
+    def merge(self, fragment: Optional[Graph]) -> None:
+        """Append a JSON fragment (nodes then edges), as collectors produce them.
+
+        Ids already in the graph keep their first definition.
+        """
+        if not fragment:
+            return
+        for node in fragment.get("nodes") or []:
+            if node["id"] not in self._nodes:
+                self.add_node(NodeRecord.from_dict(node))
+        for edge in fragment.get("edges") or []:
+            rec = EdgeRecord.from_dict(edge)
+            if rec.id not in self._edges:
+                self.add_edge(rec)
+
+    def apply_telemetry(self, readings: Dict[str, Dict[str, str]]) -> int:
+        """Replace the telemetry of nodes present in `readings`; return how many matched.
+
+        Readings for ids not in the graph are ignored, so an overlay collected
+        after hardware changed can still be applied to an older inventory.
+        """
+        matched = 0
+        for node_id, values in readings.items():
+            node = self._nodes.get(node_id)
+            if node is None:
+                continue
+            node.telemetry = _intern_props(values)
+            matched += 1
+        return matched
+
+    def set_kind(self, node_id: str, kind: str) -> None:
+        node = self._nodes[node_id]
+        if node.kind == kind:
+            return
+        self._by_kind[node.kind].pop(node_id, None)
+        node.kind = sys.intern(kind)
+        self._by_kind.setdefault(node.kind, {})[node_id] = None
+
+    def remove_edge(self, edge_id: str) -> Optional[EdgeRecord]:
+        edge = self._edges.pop(edge_id, None)
+        if edge is not None:
+            self._out.get(edge.source, {}).pop(edge_id, None)
+            self._in.get(edge.target, {}).pop(edge_id, None)
+        return edge
+
+    def remove_node(self, node_id: str) -> Optional[NodeRecord]:
+        """Remove a node together with its incident edges."""
+        node = self._nodes.pop(node_id, None)
+        if node is None:
+            return None
+        self._by_kind[node.kind].pop(node_id, None)
+        for edge_id in list(self._out.get(node_id, {})) + list(self._in.get(node_id, {})):
+            self.remove_edge(edge_id)
+        self._out.pop(node_id, None)
+        self._in.pop(node_id, None)
+        return node
+
+    # -- queries ----------------------------------------------------------
+
+    def __len__(self) -> int:
+        return len(self._nodes)
+
+    def __contains__(self, node_id: object) -> bool:
+        return node_id in self._nodes
+
+    def node(self, node_id: str) -> Optional[NodeRecord]:
+        return self._nodes.get(node_id)
+
+    def edge(self, edge_id: str) -> Optional[EdgeRecord]:
+        return self._edges.get(edge_id)
+
+    def nodes(self, kind: Optional[str] = None) -> Iterator[NodeRecord]:
+        if kind is None:
+            return iter(list(self._nodes.values()))
+        return iter([self._nodes[i] for i in self._by_kind.get(kind, {})])
+
+    def edges(self) -> Iterator[EdgeRecord]:
+        return iter(list(self._edges.values()))
+
+    def node_count(self) -> int:
+        return len(self._nodes)
+
+    def edge_count(self) -> int:
+        return len(self._edges)
+
+    def kinds(self) -> List[str]:
+        return [k for k, ids in self._by_kind.items() if ids]
+
+    def out_edges(self, node_id: str) -> List[EdgeRecord]:
+        return [self._edges[e] for e in self._out.get(node_id, {})]
+
+    def in_edges(self, node_id: str) -> List[EdgeRecord]:
+        return [self._edges[e] for e in self._in.get(node_id, {})]
+
+    def children(self, node_id: str) -> List[NodeRecord]:
+        """Targets of outgoing edges that exist as nodes, in edge order."""
+        out = []
+        for e in self._out.get(node_id, {}):
+            n = self._nodes.get(self._edges[e].target)
+            if n is not None:
+                out.append(n)
+        return out
+
+    def parents(self, node_id: str) -> List[NodeRecord]:
+        """Sources of incoming edges that exist as nodes, in edge order."""
+        out = []
+        for e in self._in.get(node_id, {}):
+            n = self._nodes.get(self._edges[e].source)
+            if n is not None:
+                out.append(n)
+        return out
+
+
+def merge_telemetry(graph: Graph, overlay: Telemetry) -> Graph:
+    """Return `graph` with the overlay's readings applied by node id.
+
+    Graph-level keys other than nodes and edges (embedded layouts, ...) are
+    kept; readings do not change the structure they depend on.
+    """
+    g = HardwareGraph.from_dict(graph)
+    g.apply_telemetry(overlay.get("nodes") or {})
+    return {**graph, **g.to_dict()}  # type: ignore[return-value]
@@ -0,0 +1,137 @@
+from __future__ import annotations
+
+import hashlib
+import json
+from typing import IO, Any, Dict, Iterable, Iterator, Optional, Tuple
+
+from .model import Edge, Graph, Node
+
+# One JSON record per line:
+#   {"toposcope":"graph","version":1,"nodes":N,"edges":M,"structure":"<hash>"}
+#   {"layouts":{...}}           optional, before the elements
+#   {"node":{...}} ...          nodes, then
+#   {"edge":{...}} ...          edges
+#   {"end":{"nodes":N,"edges":M,"sha256":"<hex of every line above>"}}
+# Header counts and structure hash (layout.structure_hash) are present when
+# the writer had the whole graph; readers rely only on the trailer.
+NDJSON_VERSION = 1
+NDJSON_MAGIC = b'{"toposcope"'
+
+
+def is_ndjson(head: bytes) -> bool:
+    """Whether a file starting with `head` is an NDJSON graph (the header is written first-key first)."""
+    return head.lstrip().startswith(NDJSON_MAGIC)
+
+
+def _line(record: Dict[str, Any]) -> str:
+    return json.dumps(record, separators=(",", ":"), ensure_ascii=False) + "\n"
+
+
+class NDJSONWriter:
+    """Writes graph records as they become available, to a text stream.
+
+    Nothing is buffered beyond the current line, so consumers can start on
+    the first nodes while the rest is still being written. `close` writes
+    the trailer; a stream without one reads as truncated.
+    """
+
+    def __init__(self, f: IO[str], header: Optional[Dict[str, Any]] = None) -> None:
+        self._f = f
+        self._sha = hashlib.sha256()
+        self.nodes = 0
+        self.edges = 0
+        self._write({"toposcope": "graph", "version": NDJSON_VERSION, **(header or {})})
+
+    def _write(self, record: Dict[str, Any]) -> None:
+        line = _line(record)
+        self._sha.update(line.encode("utf-8"))
+        self._f.write(line)
+
+    def layouts(self, layouts: Dict[str, Any]) -> None:
+        self._write({"layouts": layouts})
+
+    def node(self, node: Node) -> None:
+        self._write({"node": node})
+        self.nodes += 1
+
+    def edge(self, edge: Edge) -> None:
+        self._write({"edge": edge})
+        self.edges += 1
+
+    def close(self) -> None:
+        self._f.write(_line({"end": {"nodes": self.nodes, "edges": self.edges, "sha256": self._sha.hexdigest()}}))
+        self._f.flush()
+
+
+def write_ndjson(graph: Graph, f: IO[str]) -> None:
+    """Write a whole graph; layouts first, so a viewer can place nodes as they stream in."""
+    from .layout import structure_hash
+
+    nodes = graph.get("nodes") or []
+    edges = graph.get("edges") or []
+    writer = NDJSONWriter(f, {"nodes": len(nodes), "edges": len(edges), "structure": structure_hash(graph)})
+    layouts = graph.get("layouts")  # type: ignore[misc]
+    if layouts:
+        writer.layouts(layouts)
+    for n in nodes:
+        writer.node(n)
+    for e in edges:
+        writer.edge(e)
+    writer.close()
+
+
+def iter_ndjson(lines: Iterable[str]) -> Iterator[Tuple[str, Any]]:
+    """Yield ("header" | "layouts" | "node" | "edge", value) as lines (newline included) are read.
+
+    Raises ValueError for a missing header, an unknown or malformed record,
+    or a trailer that is missing, malformed or disagrees with the counts or
+    checksum (records seen before the problem have already been yielded).
+    """
+    sha = hashlib.sha256()
+    counts = {"node": 0, "edge": 0}
+    first = True
+    for line in lines:
+        if not line.strip():
+            continue
+        record = json.loads(line)
+        if first:
+            if not isinstance(record, dict) or record.get("toposcope") != "graph":
+                raise ValueError("not an NDJSON graph (missing header)")
+            if record.get("version") != NDJSON_VERSION:
+                raise ValueError(f"unsupported NDJSON graph version {record.get('version')!r}")
+            first = False
+            sha.update(line.encode("utf-8"))
+            yield "header", record
+            continue
+        if not isinstance(record, dict) or len(record) != 1:
+            raise ValueError(f"not a graph record: {line[:80]!r}")
+        ((kind, value),) = record.items()
+        if kind == "end":
+            if not isinstance(value, dict):
+                raise ValueError("NDJSON graph trailer is damaged")
+            if value.get("nodes") != counts["node"] or value.get("edges") != counts["edge"]:
+                raise ValueError("NDJSON graph trailer does not match the records read")
+            if value.get("sha256") != sha.hexdigest():
+                raise ValueError("NDJSON graph checksum mismatch")
+            return
+        if kind not in ("layouts", "node", "edge"):
+            raise ValueError(f"unknown NDJSON graph record {kind!r}")
+        if kind != "layouts" and not isinstance(value, dict):
+            raise ValueError(f"not a graph {kind}: {line[:80]!r}")
+        sha.update(line.encode("utf-8"))
+        if kind in counts:
+            counts[kind] += 1
+        yield kind, value
+    raise ValueError("NDJSON graph is truncated (no trailer)" if not first else "empty NDJSON graph")
+
+
+def read_ndjson(f: IO[str]) -> Graph:
+    graph: Graph = {"nodes": [], "edges": []}
+    for kind, value in iter_ndjson(f):
+        if kind == "node":
+            graph["nodes"].append(value)
+        elif kind == "edge":
+            graph["edges"].append(value)
+        elif kind == "layouts":
+            graph["layouts"] = value
+    return graph
@@ -0,0 +1,139 @@
+from __future__ import annotations
+
+import collections
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+
+from .layout import LayoutCache, layouts_for
+from .model import Graph, HardwareGraph, NodeRecord
+
+DEFAULT_SEARCH_LIMIT = 50
+
+
+class GraphIndex:
+    """Read-only queries over one graph for viewers that load it piecemeal.
+
+    Wraps a HardwareGraph (id and adjacency indexes) and adds a search text
+    per node, built on the first search. Responses are plain JSON; nodes in a
+    subgraph carry how many children were left out so a viewer can offer to
+    expand them.
+    """
+
+    def __init__(self, graph: Graph) -> None:
+        self.source = graph
+        self.graph = HardwareGraph.from_dict(graph)
+        self._text: Optional[List[tuple]] = None
+        self._layouts: Optional[Dict[str, Any]] = None
+        self._lock = threading.Lock()
+        self._layout_lock = threading.Lock()
+
+    def layouts(self, cache: Optional[LayoutCache] = None) -> Dict[str, Any]:
+        """Precomputed positions for the viewer (see layout.layouts_for), computed once."""
+        with self._layout_lock:
+            if self._layouts is None:
+                self._layouts = layouts_for(self.source, cache)
+            return self._layouts
+
+    def summary(self) -> Dict[str, Any]:
+        return {
+            "nodes": self.graph.node_count(),
+            "edges": self.graph.edge_count(),
+            "kinds": {k: len(list(self.graph.nodes(k))) for k in self.graph.kinds()},
+        }
+
+    def node(self, node_id: str) -> Optional[Dict[str, Any]]:
+        """A node with its incoming edges, neighbor ids and the path from the root (first parents)."""
+        rec = self.graph.node(node_id)
+        if rec is None:
+            return None
+        path: List[str] = []
+        seen: Set[str] = set()
+        cur: Optional[NodeRecord] = rec
+        while cur is not None and cur.id not in seen:
+            seen.add(cur.id)
+            path.append(cur.id)
+            parents = self.graph.parents(cur.id)
+            cur = parents[0] if parents else None
+        path.reverse()
+        return {
+            "node": rec.to_dict(),
+            "in_edges": [e.to_dict() for e in self.graph.in_edges(node_id)],
+            "parents": [n.id for n in self.graph.parents(node_id)],
+            "children": [n.id for n in self.graph.children(node_id)],
+            "path": path,
+        }
+
+    def subgraph(
+        self,
+        root: str,
+        depth: int = 1,
+        kinds: Optional[Iterable[str]] = None,
+        limit: Optional[int] = None,
+        offset: int = 0,
+    ) -> Optional[Dict[str, Any]]:
+        """Nodes within `depth` outgoing hops of `root` (optionally only `kinds`), and edges among them.
+
+        At most `limit` nodes besides the root are returned, breadth first;
+        `offset` skips the root's first children, for paging through a bus
+        with thousands of functions. `collapsed` maps each included node to
+        its number of children not included, so the viewer can draw an
+        expand marker.
+        """
+        if root not in self.graph:
+            return None
+        wanted = set(kinds) if kinds else None
+        included: Dict[str, None] = {root: None}
+        queue = collections.deque([(root, 0)])
+        while queue:
+            node_id, level = queue.popleft()
+            if level >= depth:
+                continue
+            children = self.graph.children(node_id)
+            if node_id == root:
+                children = children[offset:]
+            for child in children:
+                if child.id in included or (wanted is not None and child.kind not in wanted):
+                    continue
+                if limit is not None and len(included) > limit:
+                    queue.clear()
+                    break
+                included[child.id] = None
+                queue.append((child.id, level + 1))
+        nodes = [self.graph.node(i).to_dict() for i in included]  # type: ignore[union-attr]
+        edges = [
+            e.to_dict()
+            for i in included
+            for e in self.graph.out_edges(i)
+            if e.target in included
+        ]
+        collapsed = {}
+        for i in included:
+            # Children skipped by `offset` are already with the caller
+            children = self.graph.children(i)[offset:] if i == root else self.graph.children(i)
+            hidden = sum(1 for c in children if c.id not in included)
+            if hidden:
+                collapsed[i] = hidden
+        return {"nodes": nodes, "edges": edges, "collapsed": collapsed}
+
+    def _search_text(self) -> List[tuple]:
+        with self._lock:
+            if self._text is None:
+                self._text = [
+                    (n.id, " ".join([n.id, n.label, n.kind, *(str(v) for v in (n.properties or {}).values())]).lower())
+                    for n in self.graph.nodes()
+                ]
+            return self._text
+
+    def search(self, query: str, limit: int = DEFAULT_SEARCH_LIMIT) -> List[Dict[str, Any]]:
+        """Nodes whose id, label, kind or property values contain every word of `query`."""
+        words = query.lower().split()
+        if not words:
+            return []
+        hits: List[Dict[str, Any]] = []
+        for node_id, text in self._search_text():
+            if all(w in text for w in words):
+                rec = self.graph.node(node_id)
+                hits.append({"id": node_id, "label": rec.label, "kind": rec.kind})  # type: ignore[union-attr]
+                if len(hits) >= limit:
+                    break
+        return hits
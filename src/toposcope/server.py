@@ -0,0 +1,643 @@
+from __future__ import annotations
+
+import collections
+import email.utils
+import gzip
+import hmac
+import ipaddress
+import json
+import logging
+import mimetypes
+import os
+import queue
+import threading
+from http import HTTPStatus
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from typing import Any, Callable, Deque, Dict, List, Optional, Set, Tuple
+from urllib.parse import parse_qs, unquote, urlsplit
+
+from .diff import GraphDelta, delta_is_empty, graph_delta
+from .formats import dump_graph, graph_format, load_graph
+from .model import Graph
+from .layout import LayoutCache
+from .query import DEFAULT_SEARCH_LIMIT, GraphIndex
+from .summarize import summarize_graph
+
+# Worth compressing; images and fonts are already compressed
+COMPRESSIBLE_TYPES = ("text/", "application/json", "application/x-ndjson", "application/javascript", "image/svg+xml")
+MIN_GZIP_BYTES = 1024
+# Larger files are streamed with sendfile instead of being held in memory
+MAX_MEMORY_BYTES = 4 << 20
+MAX_PUSH_BYTES = 256 << 20
+# Deltas kept for reconnecting viewers, and queued per viewer before it is
+# told to reload instead
+FEED_HISTORY = 64
+SUBSCRIBER_BACKLOG = 32
+SSE_PING_S = 15.0
+
+mimetypes.add_type("application/x-ndjson", ".ndjson")
+
+log = logging.getLogger(__name__)
+
+
+class Asset:
+    """One version of a served file: validators plus lazily built bodies.
+
+    Versions are keyed on (mtime_ns, size), so a rewritten graph file gets a
+    new ETag without hashing its content. The gzip body is compressed once
+    per version and shared by every request and viewer. An asset built from
+    `data` (a file transformed in memory) is keyed on the file's mtime and
+    the data's size and always served from memory.
+    """
+
+    __slots__ = ("path", "key", "content_type", "etag", "last_modified", "_body", "_gzip", "_lock", "_derived")
+
+    def __init__(self, path: Path, key: Tuple[int, int], content_type: str, data: Optional[bytes] = None) -> None:
+        self.path = path
+        self.key = key
+        self.content_type = content_type
+        self.etag = f'"{key[0]:x}-{key[1]:x}"'
+        self.last_modified = email.utils.formatdate(key[0] / 1e9, usegmt=True)
+        self._body: Optional[bytes] = data
+        self._gzip: Optional[bytes] = None
+        self._lock = threading.Lock()
+        self._derived = data is not None
+
+    @property
+    def size(self) -> int:
+        return self.key[1]
+
+    def compressible(self) -> bool:
+        return self.size >= MIN_GZIP_BYTES and self.content_type.startswith(COMPRESSIBLE_TYPES)
+
+    def body(self) -> Optional[bytes]:
+        """Identity body for small files; None means stream the file."""
+        if self.size > MAX_MEMORY_BYTES and not self._derived:
+            return None
+        with self._lock:
+            if self._body is None:
+                self._body = self.path.read_bytes()
+            return self._body
+
+    def gzip_body(self) -> bytes:
+        with self._lock:
+            if self._gzip is None and not self._derived:
+                # A prebuilt `<file>.gz` at least as new as the file wins
+                gz = self.path.with_name(self.path.name + ".gz")
+                try:
+                    if gz.stat().st_mtime_ns >= self.key[0]:
+                        self._gzip = gz.read_bytes()
+                except OSError:
+                    pass
+            if self._gzip is None:
+                data = self._body if self._derived else self.path.read_bytes()
+                self._gzip = gzip.compress(data, compresslevel=6, mtime=0)  # type: ignore[arg-type]
+            return self._gzip
+
+
+class GraphFeed:
+    """The served graph's current revision plus its stream of deltas.
+
+    `publish` diffs a new graph against the current one and queues the delta
+    for every subscribed viewer. A viewer that reconnects (SSE Last-Event-ID)
+    is replayed from recent history; one that fell further behind, or whose
+    queue overflowed, gets a "reload" instead. A `transform` (e.g.
+    summarize_graph) is applied to every graph before it is diffed.
+    """
+
+    def __init__(self, graph: Graph, transform: Optional[Callable[[Graph], Graph]] = None) -> None:
+        self._lock = threading.Lock()
+        self._transform = transform
+        self.graph = transform(graph) if transform is not None else graph
+        self.revision = 1
+        self._history: Deque[Tuple[int, GraphDelta]] = collections.deque(maxlen=FEED_HISTORY)
+        self._subscribers: Set["queue.Queue[Tuple[int, str, Any]]"] = set()
+
+    def publish(self, graph: Graph) -> Optional[int]:
+        """Make `graph` current; returns the new revision, or None if nothing changed."""
+        if self._transform is not None:
+            graph = self._transform(graph)
+        with self._lock:
+            delta = graph_delta(self.graph, graph)
+            if delta_is_empty(delta):
+                return None
+            self.graph = graph
+            self.revision += 1
+            self._history.append((self.revision, delta))
+            for sub in self._subscribers:
+                try:
+                    sub.put_nowait((self.revision, "delta", delta))
+                except queue.Full:
+                    _drain(sub)
+                    sub.put_nowait((self.revision, "reload", None))
+            return self.revision
+
+    def subscribe(self, last_seen: Optional[int]) -> Tuple["queue.Queue[Tuple[int, str, Any]]", List[Tuple[int, str, Any]]]:
+        """Register a viewer; returns its queue and the events it missed since `last_seen`."""
+        sub: "queue.Queue[Tuple[int, str, Any]]" = queue.Queue(maxsize=SUBSCRIBER_BACKLOG)
+        with self._lock:
+            self._subscribers.add(sub)
+            if last_seen is None or last_seen == self.revision:
+                return sub, []
+            missed = [(rev, "delta", d) for rev, d in self._history if rev > last_seen]
+            if not missed or missed[0][0] != last_seen + 1:
+                return sub, [(self.revision, "reload", None)]
+            return sub, missed
+
+    def unsubscribe(self, sub: "queue.Queue[Tuple[int, str, Any]]") -> None:
+        with self._lock:
+            self._subscribers.discard(sub)
+
+
+def _drain(q: "queue.Queue[Any]") -> None:
+    try:
+        while True:
+            q.get_nowait()
+    except queue.Empty:
+        pass
+
+
+def read_graph(path: Path) -> Optional[Graph]:
+    """The graph at `path` (any format), or None while it is missing or half-written."""
+    try:
+        return load_graph(path)
+    except (OSError, ValueError):
+        return None
+
+
+def write_graph_atomic(path: Path, graph: Graph) -> None:
+    """Replace the graph at `path`, keeping the file's format."""
+    try:
+        fmt = graph_format(path)
+    except OSError:
+        fmt = "json"
+    tmp = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    with tmp.open("wb") as f:
+        dump_graph(graph, f, fmt)
+    os.replace(tmp, path)
+
+
+class FileWatcher:
+    """Publishes the graph file to a feed whenever its (mtime, size) changes.
+
+    A graph that cannot be published (e.g. a malformed edge) is logged and
+    skipped; the watcher keeps following the file.
+    """
+
+    def __init__(self, path: Path, feed: GraphFeed, interval: float = 0.5) -> None:
+        self.path = path
+        self.feed = feed
+        self.interval = interval
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def _key(self) -> Optional[Tuple[int, int]]:
+        try:
+            st = self.path.stat()
+        except OSError:
+            return None
+        return (st.st_mtime_ns, st.st_size)
+
+    def start(self) -> None:
+        self._thread = threading.Thread(target=self._loop, name="toposcope-watch", daemon=True)
+        self._thread.start()
+
+    def _loop(self) -> None:
+        seen = self._key()
+        while not self._stop.wait(self.interval):
+            key = self._key()
+            if key is None or key == seen:
+                continue
+            graph = read_graph(self.path)
+            if graph is None:
+                continue  # retried on the next tick
+            seen = key
+            try:
+                self.feed.publish(graph)
+            except Exception:
+                log.exception("could not publish %s", self.path)
+
+    def stop(self) -> None:
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join(timeout=self.interval + 1.0)
+
+
+class ViewerServer(ThreadingHTTPServer):
+    """Serves the viewer assets and one graph file straight from disk.
+
+    `/graph.json` maps to `graph_path`; everything else resolves inside
+    `viewer_dir`. Each connection gets its own thread, so a slow download of
+    a large graph does not stall other viewers. With a `feed`, viewers can
+    follow graph changes on `/events` and graphs can be pushed to `/api/graph`:
+    from loopback always, from elsewhere only with `push_token`.
+    `/api/*` queries run against an index of the current graph, rebuilt only
+    when the graph changes; its layouts are computed once per structure and
+    kept in a LayoutCache across restarts. With `summarize`, `/graph.json`
+    and the index serve the graph with aggregate nodes (summarize_graph),
+    built once per graph file version. A binary graph file is served to the
+    viewer as JSON, likewise converted once per version.
+    """
+
+    allow_reuse_address = True  # avoid TIME_WAIT issues after Ctrl-C
+    daemon_threads = True
+
+    def __init__(
+        self,
+        address: Tuple[str, int],
+        viewer_dir: Path,
+        graph_path: Path,
+        feed: Optional[GraphFeed] = None,
+        summarize: bool = False,
+        push_token: Optional[str] = None,
+    ) -> None:
+        self.viewer_dir = viewer_dir.resolve()
+        self.graph_path = graph_path.resolve()
+        self.feed = feed
+        self.summarize = summarize
+        self.push_token = push_token
+        self.bind_host = address[0]
+        self._assets: Dict[Path, Asset] = {}
+        self._assets_lock = threading.Lock()
+        # Graph file version -> what /graph.json serves for it (None: the file)
+        self._converted: Optional[Tuple[Tuple[int, int], Optional[Asset]]] = None
+        self._index: Optional[Tuple[Any, GraphIndex]] = None
+        self._index_lock = threading.Lock()
+        self.layout_cache = LayoutCache()
+        super().__init__(address, ViewerHandler)
+
+    def warm(self) -> None:
+        """Build the index and layouts ahead of the first viewer request."""
+        index = self.index()
+        if index is not None:
+            index.layouts(self.layout_cache)
+
+    def index(self) -> Optional[GraphIndex]:
+        """Index of the served graph (the feed's, else the graph file's)."""
+        with self._index_lock:
+            if self.feed is not None:
+                key: Any = ("feed", self.feed.revision)
+            else:
+                asset = self.asset(self.graph_path)
+                if asset is None:
+                    return None
+                key = asset.key
+            if self._index is None or self._index[0] != key:
+                if self.feed is not None:
+                    graph = self.feed.graph  # already summarized by the feed's transform
+                else:
+                    graph = read_graph(self.graph_path)
+                    if graph is not None and self.summarize:
+                        graph = summarize_graph(graph)
+                if graph is None:
+                    return None
+                self._index = (key, GraphIndex(graph))
+            return self._index[1]
+
+    def resolve(self, url_path: str) -> Optional[Path]:
+        """Map a request path to a file, or None if it is outside the viewer."""
+        rel = unquote(url_path).lstrip("/") or "index.html"
+        if rel == "graph.json":
+            return self.graph_path
+        path = (self.viewer_dir / rel).resolve()
+        if path != self.viewer_dir and self.viewer_dir not in path.parents:
+            return None
+        return path
+
+    def asset(self, path: Path) -> Optional[Asset]:
+        """Current version of `path`, reusing cached bodies while it is unchanged."""
+        try:
+            st = path.stat()
+        except OSError:
+            return None
+        if not path.is_file():
+            return None
+        key = (st.st_mtime_ns, st.st_size)
+        with self._assets_lock:
+            asset = self._assets.get(path)
+            if asset is None or asset.key != key:
+                ctype = mimetypes.guess_type(path.name)[0] or "application/octet-stream"
+                if ctype.startswith("text/") or ctype in ("application/json", "application/x-ndjson", "application/javascript"):
+                    ctype += "; charset=utf-8"
+                asset = self._assets[path] = Asset(path, key, ctype)
+        if path == self.graph_path:
+            return self._graph_asset(asset)
+        return asset
+
+    def _graph_asset(self, source: Asset) -> Optional[Asset]:
+        """The graph file `source` as served: as JSON with aggregate nodes
+        under `summarize`, as JSON if it is binary, else as it is."""
+        with self._assets_lock:
+            cached = self._converted
+            if cached is not None and cached[0] == source.key:
+                return cached[1] or source
+        if not self.summarize:
+            try:
+                fmt = graph_format(source.path)
+            except OSError:
+                return None
+            if fmt != "binary":
+                with self._assets_lock:
+                    self._converted = (source.key, None)
+                return source
+        graph = read_graph(source.path)
+        if graph is None:
+            return None
+        if self.summarize:
+            graph = summarize_graph(graph)
+        data = json.dumps(graph, separators=(",", ":")).encode()
+        asset = Asset(source.path, (source.key[0], len(data)), "application/json; charset=utf-8", data)
+        with self._assets_lock:
+            self._converted = (source.key, asset)
+        return asset
+
+
+def _accepts_gzip(header: str) -> bool:
+    for part in header.split(","):
+        coding, _, params = part.strip().partition(";")
+        if coding.strip().lower() in ("gzip", "*"):
+            q = params.strip()
+            if not q.startswith("q="):
+                return True
+            try:
+                return float(q[2:]) > 0
+            except ValueError:
+                return False
+    return False
+
+
+class ViewerHandler(BaseHTTPRequestHandler):
+    """GET/HEAD with ETag/Last-Modified revalidation, gzip and keep-alive.
+
+    With a feed, also `GET /events` (Server-Sent Events: "delta" events with
+    the revision as event id, "reload" when deltas cannot catch a viewer up)
+    and `POST /api/graph` (a full graph as application/json, written to the
+    graph file; see `_push_allowed`). Queries:
+    `/api/summary`, `/api/layout`, `/api/node/<id>`,
+    `/api/subgraph?root=&depth=&kinds=&limit=&offset=`
+    and `/api/search?q=&limit=`.
+    """
+
+    protocol_version = "HTTP/1.1"
+    server: ViewerServer
+
+    def do_HEAD(self) -> None:
+        self._serve(head=True)
+
+    def do_GET(self) -> None:
+        url = urlsplit(self.path)
+        if url.path == "/events" and self.server.feed is not None:
+            self._events(self.server.feed)
+            return
+        if url.path.startswith("/api/"):
+            self._api(url.path[len("/api/"):], parse_qs(url.query))
+            return
+        self._serve(head=False)
+
+    def _api(self, route: str, params: Dict[str, List[str]]) -> None:
+        index = self.server.index()
+        if index is None:
+            self._error(HTTPStatus.SERVICE_UNAVAILABLE)
+            return
+
+        def param(name: str, default: str = "") -> str:
+            return (params.get(name) or [default])[0]
+
+        result: Any = None
+        try:
+            if route == "summary":
+                result = index.summary()
+            elif route == "layout":
+                result = index.layouts(self.server.layout_cache)
+            elif route.startswith("node/"):
+                result = index.node(unquote(route[len("node/"):]))
+            elif route == "subgraph":
+                kinds = [k for k in param("kinds").split(",") if k]
+                limit = param("limit")
+                result = index.subgraph(
+                    param("root", "root"),
+                    depth=int(param("depth", "1")),
+                    kinds=kinds or None,
+                    limit=int(limit) if limit else None,
+                    offset=int(param("offset", "0")),
+                )
+            elif route == "search":
+                result = {"results": index.search(param("q"), limit=int(param("limit", str(DEFAULT_SEARCH_LIMIT))))}
+            else:
+                self._error(HTTPStatus.NOT_FOUND)
+                return
+        except ValueError:
+            self._error(HTTPStatus.BAD_REQUEST)
+            return
+        if result is None:
+            self._error(HTTPStatus.NOT_FOUND)
+            return
+        self._json(result)
+
+    def do_POST(self) -> None:
+        if urlsplit(self.path).path != "/api/graph" or self.server.feed is None:
+            self._error(HTTPStatus.NOT_FOUND)
+            return
+        # A cross-site page can only send JSON after a CORS preflight, which
+        # is never granted, so requiring it rules out form-based CSRF
+        if self.headers.get_content_type() != "application/json":
+            self._error(HTTPStatus.UNSUPPORTED_MEDIA_TYPE)
+            return
+        status = self._push_allowed()
+        if status is not None:
+            self._error(status)
+            return
+        try:
+            length = int(self.headers.get("Content-Length", ""))
+        except ValueError:
+            self._error(HTTPStatus.LENGTH_REQUIRED)
+            return
+        if length > MAX_PUSH_BYTES:
+            self._error(HTTPStatus.REQUEST_ENTITY_TOO_LARGE)
+            return
+        try:
+            graph = json.loads(self.rfile.read(length))
+        except ValueError:
+            graph = None
+        if not isinstance(graph, dict) or not isinstance(graph.get("nodes"), list):
+            self._error(HTTPStatus.BAD_REQUEST)
+            return
+        try:
+            self.server.feed.publish(graph)
+        except (KeyError, TypeError, AttributeError):
+            self._error(HTTPStatus.BAD_REQUEST)  # e.g. an edge without source/target
+            return
+        # Written through so reloads and the file watcher agree with the push
+        write_graph_atomic(self.server.graph_path, graph)
+        self._json({"revision": self.server.feed.revision})
+
+    def _push_allowed(self) -> Optional[HTTPStatus]:
+        """None if this push may proceed, else the status to refuse it with.
+
+        Browsers send `Origin` on cross-site requests, so one naming another
+        host is refused. Loopback clients may push without a token only when
+        `Host` names a loopback address or the bind address, since a
+        DNS-rebinding page reaches 127.0.0.1 under its own hostname. Other
+        pushes need the server's push token as `Authorization: Bearer <token>`.
+        """
+        host = self.headers.get("Host") or ""
+        origin = self.headers.get("Origin")
+        if origin is not None and urlsplit(origin).netloc.lower() != host.lower():
+            return HTTPStatus.FORBIDDEN
+        try:
+            loopback = ipaddress.ip_address(self.client_address[0]).is_loopback
+        except ValueError:
+            loopback = False
+        if loopback and self._local_host(host):
+            return None
+        token = self.server.push_token
+        if not token:
+            return HTTPStatus.FORBIDDEN
+        scheme, _, given = (self.headers.get("Authorization") or "").partition(" ")
+        if scheme.lower() != "bearer" or not hmac.compare_digest(given.strip().encode(), token.encode()):
+            return HTTPStatus.UNAUTHORIZED
+        return None
+
+    def _local_host(self, host: str) -> bool:
+        """Whether a `Host` header names this machine: loopback or the bind address."""
+        name = urlsplit(f"//{host}").hostname or ""
+        if name == "localhost":
+            return True
+        if name and name == self.server.bind_host.lower():
+            return True
+        try:
+            return ipaddress.ip_address(name).is_loopback
+        except ValueError:
+            return False
+
+    def _json(self, data: Any) -> None:
+        body = json.dumps(data).encode()
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", "application/json; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def _events(self, feed: GraphFeed) -> None:
+        last_id = self.headers.get("Last-Event-ID", "")
+        sub, missed = feed.subscribe(int(last_id) if last_id.isdigit() else None)
+        # No length for an endless body, so the connection ends with the stream
+        self.close_connection = True
+        try:
+            self.send_response(HTTPStatus.OK)
+            self.send_header("Content-Type", "text/event-stream")
+            self.send_header("Cache-Control", "no-cache")
+            self.end_headers()
+            self.wfile.write(f"retry: 2000\nevent: hello\ndata: {json.dumps({'revision': feed.revision})}\n\n".encode())
+            self.wfile.flush()
+            for item in missed:
+                self._send_event(*item)
+            while True:
+                try:
+                    item = sub.get(timeout=SSE_PING_S)
+                except queue.Empty:
+                    # Comment line; also how a vanished viewer is noticed
+                    self.wfile.write(b": ping\n\n")
+                    self.wfile.flush()
+                    continue
+                self._send_event(*item)
+        except OSError:
+            pass
+        finally:
+            feed.unsubscribe(sub)
+
+    def _send_event(self, revision: int, kind: str, delta: Any) -> None:
+        data = json.dumps(delta if delta is not None else {"revision": revision}, separators=(",", ":"))
+        self.wfile.write(f"id: {revision}\nevent: {kind}\ndata: {data}\n\n".encode())
+        self.wfile.flush()
+
+    def _error(self, status: HTTPStatus) -> None:
+        body = f"{status.value} {status.phrase}\n".encode()
+        self.send_response(status)
+        self.send_header("Content-Type", "text/plain; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        if self.command != "HEAD":
+            self.wfile.write(body)
+
+    def _not_modified(self, asset: Asset) -> bool:
+        inm = self.headers.get("If-None-Match")
+        if inm is not None:
+            # Weak comparison; compressed and identity bodies share one validator
+            tags = [t.strip() for t in inm.split(",")]
+            tags = [t[2:] if t.startswith("W/") else t for t in tags]
+            return "*" in tags or asset.etag in tags
+        ims = self.headers.get("If-Modified-Since")
+        if ims:
+            try:
+                since = email.utils.parsedate_to_datetime(ims).timestamp()
+            except (TypeError, ValueError):
+                return False
+            return int(asset.key[0] / 1e9) <= since
+        return False
+
+    def _serve(self, head: bool) -> None:
+        path = self.server.resolve(urlsplit(self.path).path)
+        if path is None:
+            self._error(HTTPStatus.FORBIDDEN)
+            return
+        asset = self.server.asset(path)
+        if asset is None:
+            self._error(HTTPStatus.NOT_FOUND)
+            return
+        if self._not_modified(asset):
+            self.send_response(HTTPStatus.NOT_MODIFIED)
+            self._validators(asset)
+            self.end_headers()
+            return
+
+        body: Optional[bytes] = None
+        stream = None
+        gzipped = asset.compressible() and _accepts_gzip(self.headers.get("Accept-Encoding", ""))
+        if gzipped:
+            body = asset.gzip_body()
+            length = len(body)
+        else:
+            length = asset.size
+            if not head:
+                body = asset.body()
+                if body is None:
+                    stream = open(asset.path, "rb")
+                    st = os.fstat(stream.fileno())
+                    # Rewritten since stat(): describe the file actually opened
+                    length = st.st_size
+        self.send_response(HTTPStatus.OK)
+        self.send_header("Content-Type", asset.content_type)
+        self.send_header("Content-Length", str(length))
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self._validators(asset)
+        self.end_headers()
+        if stream is not None:
+            # Large identity bodies go from the page cache to the socket (sendfile)
+            self.wfile.flush()
+            with stream:
+                self.connection.sendfile(stream, 0, length)
+        elif body is not None and not head:
+            self.wfile.write(body)
+
+    def _validators(self, asset: Asset) -> None:
+        self.send_header("ETag", asset.etag)
+        self.send_header("Last-Modified", asset.last_modified)
+        # Always revalidate: the graph file may be rewritten at any time
+        self.send_header("Cache-Control", "no-cache")
+        if asset.compressible():
+            self.send_header("Vary", "Accept-Encoding")
+
+
+def make_server(
+    viewer_dir: Path,
+    graph_path: Path,
+    host: str = "127.0.0.1",
+    port: int = 8080,
+    feed: Optional[GraphFeed] = None,
+    summarize: bool = False,
+    push_token: Optional[str] = None,
+) -> ViewerServer:
+    return ViewerServer((host, port), viewer_dir, graph_path, feed, summarize, push_token)
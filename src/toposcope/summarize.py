@@ -0,0 +1,186 @@
+from __future__ import annotations
+
+import hashlib
+import re
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+
+from .model import EdgeRecord, Graph, HardwareGraph, Node, NodeRecord
+
+# Fewer near-identical siblings than this are left as they are
+DEFAULT_MIN_GROUP = 8
+
+# Per kind, the properties siblings must share to be folded together. Only
+# these kinds are folded; GPUs and anything with children stay individual.
+GROUP_KEYS: Dict[str, Tuple[str, ...]] = {
+    "pci-device": ("vendor_id", "device_id", "driver"),
+    "usb-device": ("vendor_id", "product_id"),
+    "net-interface": ("driver",),
+    "disk-device": ("model", "size"),
+    "nvme-device": ("model", "size_gb"),
+    "dimm": ("size_gb", "type", "speed", "manufacturer", "part_number"),
+}
+# Interfaces and disks also group by name stem (veth, loop, ...), so e.g.
+# bridges and veths without a driver stay apart
+_STEM_KINDS = ("net-interface", "disk-device")
+_STEM = re.compile(r"[A-Za-z_-]*")
+# sda, sdab, vdb, xvdc: the letters after the prefix are the index
+_LETTERED_DISK = re.compile(r"(sd|vd|xvd|hd)[a-z]+$")
+
+GroupKey = Tuple[Any, ...]
+
+
+def _stem(node_id: str) -> str:
+    name = node_id.split(":", 1)[-1]
+    lettered = _LETTERED_DISK.match(name)
+    if lettered:
+        return lettered.group(1)
+    stem = _STEM.match(name).group(0)  # type: ignore[union-attr]
+    # veth names end in hex (veth3fa01c2): drop hex letters that ran into the stem
+    trimmed = stem.rstrip("abcdef")
+    return trimmed if len(trimmed) >= 3 else stem
+
+
+def _group_key(g: HardwareGraph, node: NodeRecord) -> Optional[GroupKey]:
+    """(parent, kind, edge kind/label, stem, key properties), or None if `node` is not foldable.
+
+    Foldable nodes are leaves with a single conventional edge (`e:<parent>-><id>`)
+    from an existing parent, so an aggregate can rebuild them exactly.
+    """
+    fields = GROUP_KEYS.get(node.kind)
+    if fields is None or (node.extra and "members" in node.extra) or g.out_edges(node.id):
+        return None
+    incoming = g.in_edges(node.id)
+    if len(incoming) != 1:
+        return None
+    edge = incoming[0]
+    if edge.id != f"e:{edge.source}->{node.id}" or edge.extra or edge.source not in g:
+        return None
+    props = node.properties or {}
+    stem = _stem(node.id) if node.kind in _STEM_KINDS else ""
+    return (edge.source, node.kind, edge.kind, edge.label, stem, *(props.get(f, "") for f in fields))
+
+
+def _common_label(labels: List[str], stem: str, kind: str) -> str:
+    if len(set(labels)) == 1:
+        return labels[0]
+    if stem:
+        return f"{stem}*"
+    lo, hi = min(labels), max(labels)
+    n = 0
+    while n < min(len(lo), len(hi)) and lo[n] == hi[n]:
+        n += 1
+    return lo[:n].rstrip(" ([{-_:/") or kind
+
+
+def _aggregate(key: GroupKey, members: List[NodeRecord]) -> Tuple[Node, Dict[str, Any]]:
+    """The aggregate node for one group, and the edge from the parent to it."""
+    parent, kind, edge_kind, edge_label, stem = key[:5]
+    dicts = [m.to_dict() for m in members]
+    shared: Dict[str, Any] = dict(dicts[0].get("properties") or {})
+    for d in dicts[1:]:
+        props = d.get("properties") or {}
+        shared = {k: v for k, v in shared.items() if k in props and props[k] == v}
+
+    listed: List[Dict[str, Any]] = []
+    for d in dicts:
+        entry = {k: v for k, v in d.items() if k != "kind"}
+        if "properties" in d:
+            entry["properties"] = {k: v for k, v in d["properties"].items() if k not in shared}
+        listed.append(entry)
+
+    digest = hashlib.sha1(repr(key).encode()).hexdigest()[:10]
+    agg_id = f"agg:{kind}:{digest}"
+    label = _common_label([m.label for m in members], stem, kind)
+    node: Node = {
+        "id": agg_id,
+        "kind": kind,
+        "label": f"{label} ({len(members)})",
+        "properties": {**shared, "count": str(len(members))},
+    }
+    node["members"] = listed  # type: ignore[typeddict-unknown-key]
+    edge: Dict[str, Any] = {"id": f"e:{parent}->{agg_id}", "source": parent, "target": agg_id}
+    if edge_kind is not None:
+        edge["kind"] = edge_kind
+    if edge_label is not None:
+        edge["label"] = edge_label
+    return node, edge
+
+
+def summarize_graph(graph: Graph, min_group: int = DEFAULT_MIN_GROUP) -> Graph:
+    """Fold runs of near-identical sibling leaves into aggregate nodes.
+
+    Siblings under one parent that share a kind and its GROUP_KEYS properties
+    (SR-IOV VFs, loop devices, veths, identical DIMMs) become one node with
+    the shared properties, a `count` and a `members` list holding each
+    member's id, label and remaining properties. Groups smaller than
+    `min_group` are kept. Nothing is lost: `expand_aggregates` restores the
+    original nodes and edges. Embedded layouts are dropped, as the structure
+    changes.
+    """
+    g = HardwareGraph.from_dict(graph)
+    groups: Dict[GroupKey, List[NodeRecord]] = {}
+    for node in g.nodes():
+        key = _group_key(g, node)
+        if key is not None:
+            groups.setdefault(key, []).append(node)
+
+    folded: Dict[str, Tuple[Node, Dict[str, Any]]] = {}
+    for key, members in groups.items():
+        if len(members) < min_group:
+            continue
+        agg = _aggregate(key, members)
+        for m in members:
+            folded[m.id] = agg
+
+    if not folded:
+        return g.to_dict()
+    # Aggregates take the place of their first member, in node and edge order
+    nodes: List[Node] = []
+    edges: List[Any] = []
+    placed = set()
+    for n in g.nodes():
+        agg = folded.get(n.id)
+        if agg is None:
+            nodes.append(n.to_dict())
+        elif agg[0]["id"] not in placed:
+            placed.add(agg[0]["id"])
+            nodes.append(agg[0])
+    placed.clear()
+    for e in g.edges():
+        agg = folded.get(e.target)
+        if agg is None:
+            edges.append(e.to_dict())
+        elif agg[1]["id"] not in placed:
+            placed.add(agg[1]["id"])
+            edges.append(agg[1])
+    return {"nodes": nodes, "edges": edges}
+
+
+def expand_aggregates(graph: Graph, ids: Optional[Iterable[str]] = None) -> Graph:
+    """Replace aggregate nodes (all, or those in `ids`) by their members; inverse of summarize_graph."""
+    wanted = set(ids) if ids is not None else None
+    g = HardwareGraph.from_dict(graph)
+    nodes: List[Node] = []
+    edges: List[Any] = []
+    expanded: Dict[str, List[str]] = {}
+    for n in g.nodes():
+        members = (n.extra or {}).get("members")
+        if not isinstance(members, list) or (wanted is not None and n.id not in wanted):
+            nodes.append(n.to_dict())
+            continue
+        shared = {k: v for k, v in (n.properties or {}).items() if k != "count"}
+        for m in members:
+            member = dict(m)
+            member["kind"] = n.kind
+            if "properties" in m:
+                member["properties"] = {**shared, **m["properties"]}
+            nodes.append(member)  # type: ignore[arg-type]
+        expanded[n.id] = [m["id"] for m in members]
+    for e in g.edges():
+        if e.target not in expanded:
+            edges.append(e.to_dict())
+            continue
+        for member_id in expanded[e.target]:
+            edge = EdgeRecord(f"e:{e.source}->{member_id}", e.source, member_id, e.kind, e.label)
+            edges.append(edge.to_dict())
+    return {"nodes": nodes, "edges": edges}
@@ -0,0 +1,42 @@
+from toposcope.collect.agent import FakeEventSource, GraphAgent, UEvent
+from toposcope.collect.engine import Collector
+
+DISK = {
+    "nodes": [{"id": "block:nvme0n1", "kind": "disk", "label": "nvme0n1"}],
+    "edges": [{"source": "root", "target": "block:nvme0n1", "kind": "contains"}],
+}
+
+
+def _agent(collectors):
+    agent = GraphAgent()
+    agent._collectors = {c.name: c for c in collectors}
+    agent.build()
+    return agent
+
+
+def _fail():
+    raise OSError("lsblk: device busy")
+
+
+def test_failed_refresh_keeps_section_nodes():
+    agent = _agent([Collector("nvme", lambda: None), Collector("lsblk", lambda: DISK)])
+    assert agent.graph.node("block:nvme0n1") is not None
+    agent._collectors["lsblk"] = Collector("lsblk", _fail)
+    source = FakeEventSource([UEvent("change", "/devices/virtual/block/nvme0n1", "block")])
+    source.close()
+    changes = []
+    agent.run(source, on_change=changes.append, debounce=0.0)
+    assert agent.graph.node("block:nvme0n1") is not None
+    assert agent.graph.edge("e:root->block:nvme0n1") is not None
+    assert [c["removed"] for c in changes] == [[]]
+    root = agent.graph.node("root")
+    assert root.properties["collector_lsblk"] == "error"
+    assert root.properties["scan_status"] == "partial"
+
+
+def test_successful_refresh_removes_gone_nodes():
+    agent = _agent([Collector("nvme", lambda: None), Collector("lsblk", lambda: DISK)])
+    agent._collectors["lsblk"] = Collector("lsblk", lambda: {"nodes": [], "edges": []})
+    change = agent.refresh(["block"])
+    assert change is not None and change["removed"] == ["block:nvme0n1"]
+    assert agent.graph.node("block:nvme0n1") is None
@@ -0,0 +1,76 @@
+import json
+import zlib
+
+import pytest
+
+from toposcope.binary import BINARY_VERSION, dumps_binary, loads_binary
+from toposcope.demo import generate_demo_graph
+
+GRAPH = {
+    "nodes": [
+        {"id": "root", "kind": "host", "label": "host", "properties": {"os": "Linux"}},
+        {"label": "cpu0", "id": "cpu:0", "kind": "cpu", "properties": {"cores": 64, "ghz": 3.5, "smt": True, "numa": None}},
+        {"id": "disk:0", "kind": "disk", "label": "💾 nvme0n1 — naïve", "telemetry": {"temperature_c": "41"}},
+        {"id": "disk:1", "kind": "disk", "label": "nvme1n1\x00\xff", "properties": {"flags": [False, 0, -1, 2**40, 1e-300]}},
+    ],
+    "edges": [
+        {"id": "e:root->cpu:0", "source": "root", "target": "cpu:0", "kind": "contains"},
+        {"id": "link-7", "source": "cpu:0", "target": "disk:0", "kind": "pcie"},
+        {"source": "cpu:0", "target": "disk:1", "id": "e:cpu:0->disk:1"},
+        {"id": "e:cpu:0->disk:0", "source": "disk:1", "target": "disk:0"},
+    ],
+    "layouts": {"radial": {"root": [0.0, 0.0], "cpu:0": [1.5, -2]}},
+}
+
+
+def _exact(graph):
+    # json.dumps keeps key order and tells True from 1 and 1.0 from 1
+    return json.dumps(graph, ensure_ascii=False)
+
+
+@pytest.mark.parametrize("graph", [GRAPH, generate_demo_graph()], ids=["mixed", "demo"])
+def test_round_trip_is_exact(graph):
+    assert _exact(loads_binary(dumps_binary(graph))) == _exact(graph)
+
+
+def test_unconventional_edge_ids_survive():
+    edges = loads_binary(dumps_binary(GRAPH))["edges"]
+    assert [e["id"] for e in edges] == ["e:root->cpu:0", "link-7", "e:cpu:0->disk:1", "e:cpu:0->disk:0"]
+    assert list(edges[2]) == ["source", "target", "id"]
+
+
+def test_damaged_input_raises_value_error():
+    data = dumps_binary(GRAPH)
+    for cut in (3, 6, len(data) // 2, len(data) - 1):
+        with pytest.raises(ValueError):
+            loads_binary(data[:cut])
+    for pos in range(6, len(data)):
+        flipped = bytearray(data)
+        flipped[pos] ^= 0x10
+        # A flip in bits deflate ignores decodes to the same graph; any
+        # other flip fails zlib's checksum
+        try:
+            assert _exact(loads_binary(bytes(flipped))) == _exact(GRAPH)
+        except ValueError:
+            pass
+    wrong_version = bytearray(data)
+    wrong_version[4] = BINARY_VERSION + 1
+    with pytest.raises(ValueError, match="version"):
+        loads_binary(bytes(wrong_version))
+    with pytest.raises(ValueError):
+        loads_binary(b"")
+
+
+def test_damaged_payload_raises_only_value_error():
+    # Damage behind a valid checksum, as a buggy writer would produce: the
+    # loader may decode a different graph, but must not fail any other way
+    data = dumps_binary(GRAPH)
+    header, payload = data[:6], zlib.decompress(data[6:])
+    for pos in range(len(payload)):
+        for bit in (0x01, 0x80):
+            damaged = bytearray(payload)
+            damaged[pos] ^= bit
+            try:
+                loads_binary(header + zlib.compress(bytes(damaged)))
+            except ValueError:
+                pass
@@ -0,0 +1,12 @@
+from toposcope.diff import apply_delta, graph_delta
+
+NODES = [{"id": "root"}, {"id": "cpu:0"}, {"id": "cpu:1"}]
+
+
+def test_graph_delta_keys_edges_without_ids():
+    old = {"nodes": NODES, "edges": [{"source": "root", "target": "cpu:0"}]}
+    new = {"nodes": NODES, "edges": [{"source": "root", "target": "cpu:1"}]}
+    delta = graph_delta(old, new)
+    assert delta["edges"]["removed"] == ["e:root->cpu:0"]
+    assert [e["id"] for e in delta["edges"]["added"]] == ["e:root->cpu:1"]
+    assert [e["id"] for e in apply_delta(old, delta)["edges"]] == ["e:root->cpu:1"]
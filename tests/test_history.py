@@ -0,0 +1,68 @@
+import time
+
+from toposcope.history import HistoryStore
+
+
+def _graph(disk_size="1T", temperature="40"):
+    return {
+        "nodes": [
+            {"id": "root", "kind": "host", "label": "node1"},
+            {"id": "gpu:0", "kind": "gpu", "label": "GPU 0", "telemetry": {"temperature_c": temperature}},
+            {"id": "disk:0", "kind": "disk-device", "label": "sda", "properties": {"size": disk_size}},
+        ],
+        "edges": [
+            {"id": "e:root->gpu:0", "source": "root", "target": "gpu:0"},
+            {"source": "root", "target": "disk:0"},
+        ],
+        "layouts": {"radial": {"root": [0, 0]}},
+    }
+
+
+def test_add_deduplicates_unchanged_inventory(tmp_path):
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        first = store.add(_graph(), taken_at=100.0)
+        # Only telemetry changed: nothing new to store
+        second = store.add(_graph(temperature="75"), taken_at=200.0)
+        third = store.add(_graph(disk_size="2T"), taken_at=300.0)
+        assert first["new_bytes"] > 0
+        assert second["new_bytes"] == 0
+        assert second["hash"] == first["hash"]
+        assert 0 < third["new_bytes"] < first["new_bytes"]
+        assert [s["id"] for s in store.list()] == [third["id"], second["id"], first["id"]]
+        assert first["host"] == "node1" and (first["nodes"], first["edges"]) == (3, 2)
+
+
+def test_get_round_trips_inventory(tmp_path):
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        snap = store.add(_graph())
+        graph = store.get(snap["id"])
+        assert store.get(snap["id"] + 1) is None
+    assert sorted(graph["nodes"], key=lambda n: n["id"]) == [
+        {"id": "disk:0", "kind": "disk-device", "label": "sda", "properties": {"size": "1T"}},
+        {"id": "gpu:0", "kind": "gpu", "label": "GPU 0"},
+        {"id": "root", "kind": "host", "label": "node1"},
+    ]
+    assert sorted(e["id"] for e in graph["edges"]) == ["e:root->disk:0", "e:root->gpu:0"]
+    assert "layouts" not in graph
+
+
+def test_prune_collects_unused_sections(tmp_path):
+    with HistoryStore(str(tmp_path / "history.sqlite")) as store:
+        now = time.time()
+        old = store.add(_graph(disk_size="1T"), taken_at=now - 3600)
+        mid = store.add(_graph(disk_size="2T"), taken_at=now - 60)
+        new = store.add(_graph(disk_size="2T"), taken_at=now)
+
+        def count(table):
+            return store._db.execute(f"SELECT COUNT(*) FROM {table}").fetchone()[0]
+
+        blobs, sections = count("blobs"), count("sections")
+        # Only the 1T disk section is unique to the oldest snapshot
+        assert store.prune(older_than=600) == (1, 1)
+        assert store.info(old["id"]) is None and store.get(mid["id"]) is not None
+        assert (count("blobs"), count("sections")) == (blobs - 1, sections - 3)
+        # The remaining sections are shared, so no blob goes with `mid`
+        assert store.prune(keep_last=1) == (1, 0)
+        assert [s["id"] for s in store.list()] == [new["id"]]
+        disk = next(n for n in store.get(new["id"])["nodes"] if n["id"] == "disk:0")
+        assert disk["properties"] == {"size": "2T"}
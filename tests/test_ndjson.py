@@ -0,0 +1,40 @@
+import io
+
+import pytest
+
+from toposcope.ndjson import read_ndjson, write_ndjson
+
+GRAPH = {
+    "nodes": [{"id": "root", "kind": "host", "label": "host"}, {"id": "cpu:0", "kind": "cpu", "label": "cpu0"}],
+    "edges": [{"id": "e:root->cpu:0", "source": "root", "target": "cpu:0"}],
+}
+
+
+def _lines():
+    f = io.StringIO()
+    write_ndjson(GRAPH, f)
+    return f.getvalue().splitlines(keepends=True)
+
+
+def test_round_trip():
+    assert read_ndjson(io.StringIO("".join(_lines()))) == GRAPH
+
+
+@pytest.mark.parametrize(
+    "damage",
+    [
+        lambda lines: lines[:-1],  # no trailer
+        lambda lines: lines[:2] + lines[3:],  # a record missing
+        lambda lines: [lines[-1]],  # no header
+        lambda lines: lines[:-1] + ['{"end":3}\n'],
+        lambda lines: lines[:-1] + ['{"end":null}\n'],
+        lambda lines: lines[:1] + ['{"node":"cpu:0"}\n'] + lines[1:],
+        lambda lines: lines[:1] + ['{"cpu":{}}\n'] + lines[1:],
+        lambda lines: lines[:2] + [lines[2].replace("cpu0", "cpu1")] + lines[3:],  # checksum
+        lambda lines: lines[:-1] + [lines[-1][: len(lines[-1]) // 2]],  # cut mid-line
+        lambda lines: [],
+    ],
+)
+def test_damaged_stream_raises_value_error(damage):
+    with pytest.raises(ValueError):
+        read_ndjson(io.StringIO("".join(damage(_lines()))))
@@ -0,0 +1,17 @@
+from toposcope.query import GraphIndex
+
+GRAPH = {
+    "nodes": [
+        {"id": "root", "kind": "host", "label": "host"},
+        {"id": "a", "kind": "cpu", "label": "cpu0", "properties": {"cores": 3, "smt": True}},
+        {"id": "b", "kind": "disk", "label": "nvme0n1"},
+    ],
+    "edges": [],
+}
+
+
+def test_search_numeric_property_and_no_properties():
+    index = GraphIndex(GRAPH)
+    assert [hit["id"] for hit in index.search("cpu 3")] == ["a"]
+    assert [hit["id"] for hit in index.search("true")] == ["a"]
+    assert index.search("nvme") == [{"id": "b", "label": "nvme0n1", "kind": "disk"}]
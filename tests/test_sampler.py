@@ -0,0 +1,53 @@
+import sys
+import textwrap
+import time
+
+from toposcope.collect.sampler import NvidiaSmiSampler, SampleStore
+
+# Prints one sample in nvidia-smi's CSV format, then exits like a crashed stream
+STUB = textwrap.dedent(
+    """
+    print("00000000:3B:00.0, 45, 120.5, 30", flush=True)
+    """
+)
+
+
+def _wait_for(predicate, timeout=5.0):
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        if predicate():
+            return True
+        time.sleep(0.02)
+    return False
+
+
+def test_sampler_reads_stub_and_restarts(tmp_path):
+    stub = tmp_path / "nvidia-smi"
+    stub.write_text(STUB)
+    store = SampleStore(capacity=10)
+    sampler = NvidiaSmiSampler(store, interval_ms=100, command=[sys.executable, str(stub)], backoff=0.05)
+    assert sampler.start()
+    try:
+        assert _wait_for(lambda: sampler.restarts >= 2)
+        summary = store.summary()
+        assert summary["pci:0000:3b:00.0"]["temperature_c"] == "45"
+        assert int(summary["pci:0000:3b:00.0"]["samples"]) >= 2
+        assert sampler.running()
+    finally:
+        sampler.stop()
+    assert not sampler.running()
+
+
+def test_sampler_start_fails_without_tool(tmp_path):
+    sampler = NvidiaSmiSampler(SampleStore(), command=[str(tmp_path / "missing")])
+    assert not sampler.start()
+
+
+def test_store_marks_stale_then_expires():
+    store = SampleStore(capacity=10, stale_after=0.05, expire_after=0.2)
+    store.add("pci:0000:3b:00.0", {"temperature_c": "45"})
+    assert "stale" not in store.summary()["pci:0000:3b:00.0"]
+    time.sleep(0.1)
+    assert store.summary()["pci:0000:3b:00.0"]["stale"] == "true"
+    time.sleep(0.15)
+    assert store.summary() == {}
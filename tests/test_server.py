@@ -0,0 +1,97 @@
+import json
+import threading
+import time
+import urllib.error
+import urllib.request
+
+import pytest
+
+from toposcope.server import FileWatcher, GraphFeed, make_server
+
+GRAPH = {"nodes": [{"id": "root", "kind": "host", "label": "host"}], "edges": []}
+
+
+@pytest.fixture
+def server(tmp_path):
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text(json.dumps(GRAPH))
+    httpd = make_server(tmp_path, graph_path, port=0, feed=GraphFeed(GRAPH))
+    thread = threading.Thread(target=httpd.serve_forever, daemon=True)
+    thread.start()
+    yield httpd
+    httpd.shutdown()
+    httpd.server_close()
+
+
+def _push(httpd, headers):
+    port = httpd.server_address[1]
+    graph = {**GRAPH, "nodes": GRAPH["nodes"] + [{"id": "cpu:0", "kind": "cpu", "label": "cpu0"}]}
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/graph", data=json.dumps(graph).encode(), headers=headers, method="POST"
+    )
+    try:
+        with urllib.request.urlopen(req, timeout=5) as res:
+            return res.status
+    except urllib.error.HTTPError as ex:
+        return ex.code
+
+
+def test_push_from_loopback(server):
+    assert _push(server, {"Content-Type": "application/json"}) == 200
+    assert server.feed.revision == 2
+
+
+def test_push_requires_json(server):
+    assert _push(server, {"Content-Type": "text/plain"}) == 415
+    assert server.feed.revision == 1
+
+
+def test_push_rejects_foreign_origin(server):
+    port = server.server_address[1]
+    headers = {"Content-Type": "application/json", "Origin": "http://evil.example"}
+    assert _push(server, headers) == 403
+    headers["Origin"] = f"http://127.0.0.1:{port}"
+    assert _push(server, headers) == 200
+
+
+def test_push_rejects_rebound_host(server):
+    # A DNS-rebinding page: its own hostname, resolving to 127.0.0.1
+    headers = {"Content-Type": "application/json", "Host": "evil.example", "Origin": "http://evil.example"}
+    assert _push(server, headers) == 403
+    assert server.feed.revision == 1
+    headers = {"Content-Type": "application/json", "Host": f"localhost:{server.server_address[1]}"}
+    assert _push(server, headers) == 200
+
+
+def test_push_rejects_malformed_edges(server):
+    port = server.server_address[1]
+    graph = {**GRAPH, "edges": [{"target": "root"}]}
+    req = urllib.request.Request(
+        f"http://127.0.0.1:{port}/api/graph",
+        data=json.dumps(graph).encode(),
+        headers={"Content-Type": "application/json"},
+        method="POST",
+    )
+    with pytest.raises(urllib.error.HTTPError) as ex:
+        urllib.request.urlopen(req, timeout=5)
+    assert ex.value.code == 400
+    assert json.loads(server.graph_path.read_text()) == GRAPH
+
+
+def test_watcher_survives_unpublishable_graph(tmp_path):
+    graph_path = tmp_path / "graph.json"
+    graph_path.write_text(json.dumps(GRAPH))
+    feed = GraphFeed(GRAPH)
+    watcher = FileWatcher(graph_path, feed, interval=0.02)
+    watcher.start()
+    try:
+        graph_path.write_text(json.dumps({**GRAPH, "edges": [{"target": "root"}]}))
+        time.sleep(0.2)
+        assert feed.revision == 1
+        graph_path.write_text(json.dumps({"nodes": GRAPH["nodes"] + [{"id": "cpu:0"}], "edges": []}))
+        deadline = time.monotonic() + 5
+        while feed.revision == 1 and time.monotonic() < deadline:
+            time.sleep(0.02)
+        assert feed.revision == 2
+    finally:
+        watcher.stop()
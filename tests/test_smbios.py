@@ -0,0 +1,168 @@
+import struct
+from typing import Dict, List, Optional
+
+from toposcope.collect.engine import ScanContext, use_scan
+from toposcope.collect.hostio import HostIO
+from toposcope.collect.linux import _collect_memory, _collect_system, _cpu_firmware_fields
+from toposcope.collect.smbios import (
+    SMBIOS_ENTRY_POINT_PATH,
+    SMBIOS_TABLE_PATH,
+    decode_memory_devices,
+    decode_processors,
+    decode_system,
+    parse_table,
+    read_smbios,
+)
+
+ENTRY_POINT = b"_SM3_" + bytes([0x00, 0x18, 3, 4]) + bytes(15)
+
+
+def structure(stype: int, handle: int, length: int, fields: Dict[int, tuple], strings: List[str] = ()) -> bytes:
+    """One SMBIOS structure: formatted area with `fields` ({offset: (fmt, value)}) and its string set."""
+    data = bytearray(length)
+    struct.pack_into("<BBH", data, 0, stype, length, handle)
+    for offset, (fmt, value) in fields.items():
+        struct.pack_into("<" + fmt, data, offset, value)
+    if not strings:
+        return bytes(data) + b"\x00\x00"
+    return bytes(data) + b"\x00".join(s.encode() for s in strings) + b"\x00\x00"
+
+
+SYSTEM = structure(1, 0x0100, 0x1B, {0x04: ("B", 1), 0x05: ("B", 2), 0x07: ("B", 3)}, ["Acme", "Rack 9000", "SYS-123"])
+# Listed first so a decoder that does not skip it would take its speed
+EMPTY_SOCKET = structure(4, 0x0400, 0x30, {0x04: ("B", 1), 0x14: ("H", 9999), 0x18: ("B", 0x00)}, ["CPU0"])
+PROCESSOR = structure(
+    4,
+    0x0401,
+    0x30,
+    {
+        0x04: ("B", 1),
+        0x07: ("B", 2),
+        0x10: ("B", 3),
+        0x14: ("H", 3500),
+        0x16: ("H", 2100),
+        0x18: ("B", 0x41),  # populated, enabled
+        0x20: ("B", 4),
+        0x22: ("B", 5),
+        0x23: ("B", 0xFF),  # more than 255 cores: see the word at 0x2A
+        0x25: ("B", 0xFF),
+        0x2A: ("H", 256),
+        0x2E: ("H", 512),
+    },
+    ["CPU1", "Acme Silicon", "Acme X1", "CPU-SN-1", "X1-PN"],
+)
+ARRAY = structure(16, 0x1000, 0x17, {0x06: ("B", 0x06), 0x07: ("I", 0x2000000), 0x0D: ("H", 2)})
+DIMM = structure(
+    17,
+    0x1100,
+    0x28,
+    {
+        0x0C: ("H", 16384),
+        0x10: ("B", 1),
+        0x11: ("B", 2),
+        0x12: ("B", 0x22),
+        0x15: ("H", 5600),
+        0x17: ("B", 3),
+        0x18: ("B", 4),
+        0x1A: ("B", 5),
+        0x20: ("H", 4800),
+    },
+    ["DIMM_A1", "BANK 0", "Hynix", "DIMM-SN", "HMCG78"],
+)
+LARGE_DIMM = structure(
+    17, 0x1101, 0x28, {0x0C: ("H", 0x7FFF), 0x1C: ("I", 262144), 0x10: ("B", 1), 0x12: ("B", 0x22)}, ["DIMM_B1"]
+)
+EMPTY_SLOT = structure(17, 0x1102, 0x28, {0x0C: ("H", 0), 0x10: ("B", 1), 0x12: ("B", 0x02)}, ["DIMM_C1"])
+END = structure(127, 0xFEFF, 4, {})
+TABLE = SYSTEM + EMPTY_SOCKET + PROCESSOR + ARRAY + DIMM + LARGE_DIMM + EMPTY_SLOT + END
+
+
+class FirmwareIO(HostIO):
+    """A host with the given firmware table files and dmidecode output, and nothing else."""
+
+    def __init__(self, files: Dict[str, bytes], dmidecode: Optional[Dict[str, str]] = None) -> None:
+        self.files = files
+        self.dmidecode = dmidecode
+
+    def read_bytes(self, path: str) -> Optional[bytes]:
+        return self.files.get(path)
+
+    def which(self, cmd: str) -> bool:
+        return cmd == "dmidecode" and self.dmidecode is not None
+
+    def run(self, cmd, spawn) -> str:
+        if cmd[0] == "dmidecode" and self.dmidecode is not None:
+            return self.dmidecode.get(cmd[-1], "")
+        return ""
+
+
+def test_parse_table_splits_strings_and_stops_at_end():
+    structs = parse_table(TABLE + b"trailing garbage")
+    assert [s.type for s in structs] == [1, 4, 4, 16, 17, 17, 17, 127]
+    assert structs[0].strings == ["Acme", "Rack 9000", "SYS-123"]
+    assert structs[3].strings == []  # no strings: the formatted area ends in a double NUL
+    assert structs[0].string(0x06) == ""  # unset reference
+
+
+def test_decode_system_and_processors():
+    structs = parse_table(TABLE)
+    assert decode_system(structs) == {"system_vendor": "Acme", "system_product": "Rack 9000", "system_serial": "SYS-123"}
+    empty, proc = decode_processors(structs)
+    assert empty["Populated"] == "no"
+    assert proc == {
+        "Socket Designation": "CPU1",
+        "Manufacturer": "Acme Silicon",
+        "Version": "Acme X1",
+        "Max Speed": "3500 MHz",
+        "Current Speed": "2100 MHz",
+        "Populated": "yes",
+        "Serial Number": "CPU-SN-1",
+        "Part Number": "X1-PN",
+        "Core Count": "256",
+        "Thread Count": "512",
+    }
+
+
+def test_decode_memory_devices():
+    devices = decode_memory_devices(parse_table(TABLE))
+    assert devices[0] == {
+        "Size": "16384 MB",
+        "Locator": "DIMM_A1",
+        "Bank Locator": "BANK 0",
+        "Type": "DDR5",
+        "Speed": "5600 MT/s",
+        "Configured Memory Speed": "4800 MT/s",
+        "Manufacturer": "Hynix",
+        "Serial Number": "DIMM-SN",
+        "Part Number": "HMCG78",
+    }
+    assert devices[1]["Size"] == "262144 MB"  # extended size
+    assert devices[2]["Size"] == "No Module Installed"
+
+
+def test_read_smbios_validates_entry_point():
+    assert len(read_smbios(FirmwareIO({SMBIOS_TABLE_PATH: TABLE, SMBIOS_ENTRY_POINT_PATH: ENTRY_POINT}))) == 8
+    assert read_smbios(FirmwareIO({SMBIOS_TABLE_PATH: TABLE, SMBIOS_ENTRY_POINT_PATH: b"garbage"})) is None
+    assert read_smbios(FirmwareIO({})) is None
+
+
+def test_collectors_use_smbios_table():
+    io = FirmwareIO({SMBIOS_TABLE_PATH: TABLE, SMBIOS_ENTRY_POINT_PATH: ENTRY_POINT})
+    with use_scan(ScanContext(io=io)):
+        assert _cpu_firmware_fields() == ("3500", "CPU-SN-1")
+        memory = _collect_memory()
+        system = _collect_system()
+    props = {n["id"]: n["properties"] for n in memory["nodes"]}
+    assert props["bus:memory"] == {"total_gb": "272.0", "ecc": "Multi-bit ECC", "slots": "2"}
+    assert props["dimm:DIMM_A1"]["size_gb"] == "16.0"
+    assert props["dimm:DIMM_A1"]["speed"] == "4800 MT/s"
+    assert "dimm:DIMM_C1" not in props  # empty slot
+    assert system["system_serial"] == "SYS-123"
+
+
+def test_cpu_fields_fall_back_to_dmidecode():
+    processor = "Processor Information\n\tMax Speed: 3200 MHz\n\tCurrent Speed: 2000 MHz\n\tSerial Number: DMI-SN\n"
+    with use_scan(ScanContext(io=FirmwareIO({}, dmidecode={"processor": processor}))):
+        assert _cpu_firmware_fields() == ("3200", "DMI-SN")
+    with use_scan(ScanContext(io=FirmwareIO({}))):
+        assert _cpu_firmware_fields() == (None, None)
@@ -0,0 +1,64 @@
+import pytest
+
+from toposcope.summarize import expand_aggregates, summarize_graph
+
+
+def _node(node_id, kind, **props):
+    node = {"id": node_id, "kind": kind, "label": node_id.split(":", 1)[-1]}
+    if props:
+        node["properties"] = props
+    return node
+
+
+def _edge(source, target, edge_id=None):
+    return {"id": edge_id or f"e:{source}->{target}", "source": source, "target": target, "kind": "contains"}
+
+
+def _graph():
+    nodes = [_node("root", "host"), _node("bus:net", "bus"), _node("bus:block", "bus")]
+    edges = [_edge("root", "bus:net"), _edge("root", "bus:block")]
+    for i in range(9):
+        nodes.append(_node(f"net:veth{i:02x}c{i}f1", "net-interface", driver="veth", mtu="1500", mac=f"02:00:00:00:00:0{i}"))
+        edges.append(_edge("bus:net", nodes[-1]["id"]))
+    # Bridges share the (empty) driver but not the stem
+    for i in range(8):
+        nodes.append(_node(f"net:br{i}", "net-interface"))
+        edges.append(_edge("bus:net", nodes[-1]["id"]))
+    # Loop devices without properties, one reached by a non-conventional edge id
+    for i in range(9):
+        nodes.append(_node(f"block:loop{i}", "disk-device"))
+        edges.append(_edge("bus:block", nodes[-1]["id"], "link-loop0" if i == 0 else None))
+    return {"nodes": nodes, "edges": edges}
+
+
+def _canonical(graph):
+    return (
+        sorted(graph["nodes"], key=lambda n: n["id"]),
+        sorted(graph["edges"], key=lambda e: e["id"]),
+    )
+
+
+def test_summarize_folds_by_stem_and_skips_unconventional_edges():
+    summary = summarize_graph(_graph())
+    aggregates = {n["label"]: n for n in summary["nodes"] if "members" in n}
+    assert sorted(aggregates) == ["br* (8)", "loop* (8)", "veth* (9)"]
+    assert aggregates["veth* (9)"]["properties"] == {"driver": "veth", "mtu": "1500", "count": "9"}
+    assert "block:loop0" in {n["id"] for n in summary["nodes"]}
+    assert "link-loop0" in {e["id"] for e in summary["edges"]}
+
+
+@pytest.mark.parametrize("min_group", [2, 8, 9, 10])
+def test_expand_restores_summarized_graph(min_group):
+    graph = _graph()
+    summary = summarize_graph(graph, min_group=min_group)
+    folded = sum(1 for n in summary["nodes"] if "members" in n)
+    assert folded == {2: 3, 8: 3, 9: 1, 10: 0}[min_group]
+    assert _canonical(expand_aggregates(summary)) == _canonical(graph)
+
+
+def test_expand_selected_aggregates_only():
+    summary = summarize_graph(_graph())
+    veth = next(n["id"] for n in summary["nodes"] if n["label"] == "veth* (9)")
+    partial = expand_aggregates(summary, ids=[veth])
+    assert sum(1 for n in partial["nodes"] if "members" in n) == 2
+    assert sum(1 for n in partial["nodes"] if n["id"].startswith("net:veth")) == 9
@@ -0,0 +1,190 @@
+// Graph helpers shared by the page (index.html) and the loader worker
+// (worker.js): card labels, element building, the structure hash and the
+// in-browser layout options.
+
+const CYTOSCAPE_URL = 'https://cdn.jsdelivr.net/npm/cytoscape@3.28.1/dist/cytoscape.umd.min.js';
+
+function summarizeProperties(kind, props) {
+  if (!props) return '';
+  const pick = (keys) => keys.filter(k => props[k] !== undefined && props[k] !== '')
+                             .map(k => `${k}: ${props[k]}`);
+  let lines = [];
+  switch (kind) {
+    case 'memory':
+      lines = pick(['total_gb']);
+      break;
+    case 'dimm': {
+      const add = (k, label = k) => { if (props[k]) lines.push(`${label}: ${props[k]}`); };
+      add('manufacturer', 'manufacturer');
+      add('serial', 'serial');
+      add('size_gb', 'size_gb');
+      add('type', 'type');
+      add('speed', 'speed');
+      return lines.slice(0, 4).join('\n');
+    }
+    case 'pci-device':
+      lines = pick(['class', 'address', 'pcie_speed', 'pcie_width']);
+      break;
+    case 'gpu-device': {
+      // Prefer static details; omit temperature/power (telemetry)
+      const add = (k, label = k) => { if (props[k]) lines.push(`${label}: ${props[k]}`); };
+      add('driver', 'driver');
+      add('driver_version', 'driver_version');
+      add('vbios_version', 'vbios_version');
+      add('vram_mb', 'vram_mb');
+      add('serial', 'serial');
+      add('uuid', 'uuid');
+      add('pcie_speed', 'pcie_speed');
+      add('pcie_width', 'pcie_width');
+      // Include up to two firmware items like fw_smc, fw_sdma, etc.
+      const fwKeys = Object.keys(props).filter(k => k.startsWith('fw_')).sort();
+      for (const k of fwKeys.slice(0, 2)) {
+        lines.push(`${k}: ${props[k]}`);
+      }
+      // Always include basic PCI fallback at end
+      add('class', 'class');
+      add('address', 'address');
+      return lines.slice(0, 6).join('\n');
+    }
+    case 'nvme-device':
+      lines = pick(['model', 'size_gb', 'firmware']);
+      break;
+    case 'disk-device':
+      lines = pick(['model', 'size', 'media', 'tran']);
+      break;
+    case 'net-interface':
+      lines = pick(['driver', 'speed_mbps', 'mac', 'bus_info']);
+      break;
+    case 'usb-device':
+      lines = pick(['bus', 'device', 'vendor_id', 'product_id']);
+      break;
+    case 'cpu': {
+      const add = (k, label = k) => { if (props[k]) lines.push(`${label}: ${props[k]}`); };
+      // Show static speeds only (no point-in-time current freq)
+      add('min_mhz', 'min_mhz');
+      add('max_mhz', 'max_mhz');
+      add('base_mhz', 'base_mhz');
+      add('serial', 'serial');
+      add('sockets', 'sockets');
+      add('cores_per_socket', 'cores_per_socket');
+      add('threads_per_core', 'threads_per_core');
+      add('virtualization', 'virtualization');
+      add('hypervisor', 'hypervisor');
+      add('address_sizes', 'address_sizes');
+      return lines.slice(0, 5).join('\n');
+    }
+    case 'system':
+      // Collector status markers (collector_*) stay out of the card
+      lines = pick(['system_vendor', 'system_product', 'os', 'scan_status']);
+      return lines.slice(0, 4).join('\n');
+    case 'bus':
+      lines = pick(['type']);
+      break;
+    default:
+      lines = Object.entries(props).slice(0, 3).map(([k, v]) => `${k}: ${v}`);
+  }
+  return lines.slice(0, 3).join('\n');
+}
+
+function nodeData(n, collapsed = 0) {
+  const props = n.properties || {};
+  const details = summarizeProperties(n.kind, props);
+  let label = details ? `${n.label}\n${details}` : n.label;
+  if (collapsed) label += `\n[+${collapsed}]`;
+  // Aggregate nodes (toposcope.summarize) carry their members for expanding
+  if (n.members) label += `\n[${n.members.length} members]`;
+  // Telemetry stays off the card text; it is kept on the element for inspection
+  return { id: n.id, label, name: n.label, kind: n.kind, properties: props, telemetry: n.telemetry || {}, collapsed, members: n.members };
+}
+
+// The schema node back from element data (to rebuild its card)
+function dataNode(data) {
+  return { id: data.id, kind: data.kind, label: data.name, properties: data.properties, telemetry: data.telemetry, members: data.members };
+}
+
+// An aggregate's member nodes and their edges from the aggregate's parent,
+// as summarize.expand_aggregates rebuilds them
+function aggregateMembers(agg, parentEdge) {
+  const shared = Object.assign({}, agg.properties);
+  delete shared.count;
+  const nodes = agg.members.map(m => Object.assign({}, m, {
+    kind: agg.kind,
+    properties: Object.assign({}, shared, m.properties),
+  }));
+  const edges = parentEdge ? nodes.map(n => ({
+    id: `e:${parentEdge.source}->${n.id}`, source: parentEdge.source, target: n.id,
+    kind: parentEdge.kind, label: parentEdge.label,
+  })) : [];
+  return { nodes, edges };
+}
+
+function edgeData(e) {
+  return { id: e.id, source: e.source, target: e.target, label: e.label || '', kind: e.kind || '' };
+}
+
+function graphToElements(graph, positions) {
+  const elements = [];
+  const collapsed = graph.collapsed || {};
+  for (const n of graph.nodes) {
+    const p = positions && positions[n.id];
+    elements.push(p ? { data: nodeData(n, collapsed[n.id] || 0), position: { x: p[0], y: p[1] } }
+                    : { data: nodeData(n, collapsed[n.id] || 0) });
+  }
+  for (const e of graph.edges) elements.push({ data: edgeData(e) });
+  return elements;
+}
+
+// Tiny FNV-1a hash for a stable graph identifier
+function fnv1a(str) {
+  let h = 0x811c9dc5;
+  for (let i = 0; i < str.length; i++) {
+    h ^= str.charCodeAt(i);
+    h = (h >>> 0) * 0x01000193;
+    h >>>= 0;
+  }
+  return (h >>> 0).toString(16);
+}
+
+function hashGraph(graph) {
+  const ids = {
+    n: (graph.nodes || []).map(n => n.id).sort(),
+    e: (graph.edges || []).map(e => `${e.source}->${e.target}`).sort(),
+  };
+  return fnv1a(JSON.stringify(ids));
+}
+
+// Concentric weight: system in the centre, then buses and memory, then devices
+function radialWeight(kind) {
+  if (kind === 'system') return 3;
+  if (kind === 'bus' || kind === 'memory') return 2;
+  return 1;
+}
+
+// Cytoscape options for the toolbar layouts when no precomputed positions exist:
+// Radial => 'concentric', Compact => 'cose', Hierarchy => 'breadthfirst'
+function layoutOptions(name) {
+  switch (name) {
+    case 'compact':
+      return { name: 'cose', animate: false, padding: 30 };
+    case 'hierarchy':
+      // Increase spacing and include label sizes to reduce overlap
+      return {
+        name: 'breadthfirst',
+        directed: true,
+        roots: ['root'],
+        spacingFactor: 1.5,
+        padding: 40,
+        nodeDimensionsIncludeLabels: true,
+        animate: false,
+      };
+    default:
+      return {
+        name: 'concentric',
+        concentric: n => radialWeight(n.data('kind')),
+        levelWidth: () => 1,
+        minNodeSpacing: 20,
+        padding: 30,
+        animate: false,
+      };
+  }
+}
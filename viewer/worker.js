@@ -0,0 +1,241 @@
+// Loads the graph off the UI thread: download, JSON.parse, card labels and,
+// when no precomputed positions exist, the layout (headless Cytoscape).
+// Elements go back in batches so the page can render progressively. NDJSON
+// graphs ('toposcope scan --format ndjson') are parsed line by line as they
+// download; with a matching layout up front, batches go out before the
+// download finishes.
+//
+// page -> worker: { type: 'load', url }
+//                 { type: 'layout', name, nodes: [[id, kind]], edges: [[id, source, target]] }
+// worker -> page: { type: 'progress', phase, done, total }
+//                 { type: 'graph', hash, layouts, positioned, nodes, edges }
+//                 (sent again, unpositioned, if a streamed graph turns out not
+//                 to match its layout)
+//                 { type: 'elements', batch, done, total }
+//                 { type: 'done' } | { type: 'error', message }
+//                 { type: 'positions', name, ids, xy } | { type: 'positions', name, error }
+//                 (xy: Float64Array of x, y pairs, transferred)
+importScripts('graph.js');
+
+const BATCH = 2000;
+
+function progress(phase, done, total) {
+  postMessage({ type: 'progress', phase, done, total });
+}
+
+// NDJSON graphs open with their header record
+const NDJSON_HEADER = /^\s*\{"toposcope"/;
+
+// Decoded text as it arrives
+async function* download(url) {
+  const res = await fetch(url);
+  if (!res.ok) throw new Error(`${url}: HTTP ${res.status}`);
+  const total = Number(res.headers.get('Content-Length')) || 0;
+  if (!res.body || !total) {
+    yield await res.text();
+    return;
+  }
+  // Content-Length counts compressed bytes when gzipped; progress is clamped
+  const reader = res.body.getReader();
+  const decoder = new TextDecoder();
+  let done = 0;
+  for (;;) {
+    const { value, done: finished } = await reader.read();
+    if (finished) break;
+    done += value.length;
+    yield decoder.decode(value, { stream: true });
+    progress('download', Math.min(done, total), total);
+  }
+  yield decoder.decode();
+}
+
+// Assembles an NDJSON graph from chunks of text. While the header's structure
+// hash matches the layouts record, elements are posted as they are parsed.
+function ndjsonReader() {
+  const graph = { nodes: [], edges: [] };
+  let header = null;
+  let ended = false;
+  let rest = '';
+  let positions = null;
+  let pending = [];
+  let sent = 0;
+  let total = 0;
+
+  const flush = () => {
+    if (!pending.length) return;
+    sent += pending.length;
+    postMessage({ type: 'elements', batch: pending, done: sent, total });
+    pending = [];
+  };
+  const element = (el) => {
+    pending.push(el);
+    if (pending.length >= BATCH) flush();
+  };
+  const record = (line) => {
+    if (!line.trim()) return;
+    if (ended) throw new Error('data after the end of the graph');
+    const rec = JSON.parse(line);
+    if (!header) {
+      if (rec.toposcope !== 'graph' || rec.version !== 1) throw new Error('unsupported NDJSON graph');
+      header = rec;
+      return;
+    }
+    if (rec.node) {
+      graph.nodes.push(rec.node);
+      if (!positions) return;
+      const p = positions[rec.node.id];
+      element(p ? { data: nodeData(rec.node, 0), position: { x: p[0], y: p[1] } } : { data: nodeData(rec.node, 0) });
+    } else if (rec.edge) {
+      graph.edges.push(rec.edge);
+      // Nodes precede edges in the file, so edges always find their endpoints
+      if (positions) element({ data: edgeData(rec.edge) });
+    } else if (rec.layouts) {
+      graph.layouts = rec.layouts;
+      if (header.structure && rec.layouts.hash === header.structure && rec.layouts.radial
+          && header.nodes != null && header.edges != null && !graph.nodes.length) {
+        positions = rec.layouts.radial;
+        total = header.nodes + header.edges;
+        postMessage({ type: 'graph', hash: header.structure, layouts: rec.layouts, positioned: true,
+                      nodes: header.nodes, edges: header.edges });
+      }
+    } else if (rec.end) {
+      if (rec.end.nodes !== graph.nodes.length || rec.end.edges !== graph.edges.length) {
+        throw new Error('graph trailer does not match the records read');
+      }
+      ended = true;
+    }
+  };
+
+  return {
+    push(chunk) {
+      const lines = (rest + chunk).split('\n');
+      rest = lines.pop();
+      lines.forEach(record);
+      progress('parse', graph.nodes.length + graph.edges.length, (header && header.nodes + header.edges) || 0);
+    },
+    // The whole graph, and whether its elements were already posted
+    end() {
+      record(rest);
+      if (!ended) throw new Error('incomplete graph (download cut short?)');
+      flush();
+      if (!positions) return { graph, streamed: false };
+      const hash = hashGraph(graph);
+      if (hash !== header.structure) {
+        // The header promised a structure it did not deliver: drop the positions
+        graph.layouts = null;
+        postMessage({ type: 'graph', hash, layouts: null, positioned: false,
+                      nodes: graph.nodes.length, edges: graph.edges.length });
+      }
+      return { graph, streamed: true };
+    },
+  };
+}
+
+function computeLayout(name, nodes, edges) {
+  if (typeof cytoscape === 'undefined') importScripts(CYTOSCAPE_URL);
+  // Headless: no renderer to measure labels, so cards get a typical size
+  const cy = cytoscape({
+    headless: true,
+    styleEnabled: true,
+    style: [{ selector: 'node', style: { width: 260, height: 110 } }],
+    elements: nodes.map(([id, kind]) => ({ group: 'nodes', data: { id, kind } }))
+      .concat(edges.map(([id, source, target]) => ({ group: 'edges', data: { id, source, target } }))),
+  });
+  cy.layout(Object.assign(layoutOptions(name), { fit: false })).run();
+  const ids = [];
+  const xy = new Float64Array(cy.nodes().length * 2);
+  cy.nodes().forEach((n, i) => {
+    const p = n.position();
+    ids.push(n.id());
+    xy[2 * i] = p.x;
+    xy[2 * i + 1] = p.y;
+  });
+  cy.destroy();
+  return { ids, xy };
+}
+
+async function load(url) {
+  progress('download', 0, 0);
+  let text = '';
+  let ndjson = null;
+  let sniffed = false;
+  for await (const chunk of download(url)) {
+    if (ndjson) {
+      ndjson.push(chunk);
+      continue;
+    }
+    text += chunk;
+    if (sniffed || (text.length < 12 && !text.includes('\n'))) continue;
+    sniffed = true;
+    if (NDJSON_HEADER.test(text)) {
+      ndjson = ndjsonReader();
+      ndjson.push(text);
+      text = '';
+    }
+  }
+  if (!ndjson && NDJSON_HEADER.test(text)) {
+    // Smaller than the sniffing window
+    ndjson = ndjsonReader();
+    ndjson.push(text);
+  }
+  if (ndjson) {
+    const { graph, streamed } = ndjson.end();
+    if (!streamed) await finish(graph);
+  } else {
+    progress('parse', 0, 0);
+    await finish(JSON.parse(text));
+  }
+  postMessage({ type: 'done' });
+}
+
+// Resolves positions for a fully parsed graph and posts it in batches
+async function finish(graph) {
+  const hash = hashGraph(graph);
+  let layouts = graph.layouts && graph.layouts.hash === hash ? graph.layouts : null;
+  if (!layouts) {
+    try {
+      const res = await fetch('api/layout');
+      const served = res.ok ? await res.json() : null;
+      if (served && served.hash === hash) layouts = served;
+    } catch (e) {
+      // Not served by 'toposcope serve'; lay out here
+    }
+  }
+  let positions = layouts && layouts.radial;
+  if (!positions) {
+    progress('layout', 0, 0);
+    try {
+      const { ids, xy } = computeLayout(
+        'radial',
+        graph.nodes.map(n => [n.id, n.kind]),
+        graph.edges.map(e => [e.id, e.source, e.target]),
+      );
+      positions = {};
+      ids.forEach((id, i) => { positions[id] = [xy[2 * i], xy[2 * i + 1]]; });
+    } catch (e) {
+      // Cytoscape could not be loaded here (offline); the page lays out instead
+      positions = null;
+    }
+  }
+  postMessage({ type: 'graph', hash, layouts, positioned: !!positions, nodes: graph.nodes.length, edges: graph.edges.length });
+  // Nodes precede edges in graphToElements, so every batch's edges find their endpoints
+  const elements = graphToElements(graph, positions);
+  for (let i = 0; i < elements.length; i += BATCH) {
+    const batch = elements.slice(i, i + BATCH);
+    postMessage({ type: 'elements', batch, done: i + batch.length, total: elements.length });
+  }
+}
+
+onmessage = (ev) => {
+  const msg = ev.data;
+  if (msg.type === 'load') {
+    load(msg.url).catch(err => postMessage({ type: 'error', message: String(err && err.message || err) }));
+  } else if (msg.type === 'layout') {
+    try {
+      const { ids, xy } = computeLayout(msg.name, msg.nodes, msg.edges);
+      postMessage({ type: 'positions', name: msg.name, ids, xy }, [xy.buffer]);
+    } catch (err) {
+      postMessage({ type: 'positions', name: msg.name, error: String(err && err.message || err) });
+    }
+  }
+};